@@ -0,0 +1,99 @@
+"""
+Cross section lookups for a particle bank in random order and sorted by
+material and energy. Run as a script to print the speedup of sorted
+lookups over a range of grid and bank sizes.
+"""
+from timeit import repeat
+
+import numpy as np
+import pytest
+
+from igmc.bank import ParticleBank
+from igmc.majorant import Majorant
+from igmc.xs import CEXS
+
+from synthetic import synthetic_xs
+
+N_MATERIALS = 3
+
+
+def tables(n_points):
+    curves = [synthetic_xs(n_points, seed=i) for i in range(N_MATERIALS)]
+    majorant = Majorant()
+    for e_grid, xs in curves:
+        majorant.update(e_grid, xs)
+    return majorant, [CEXS(*curve) for curve in curves]
+
+
+def random_bank(n_particles, seed=0):
+    rng = np.random.default_rng(seed)
+    return ParticleBank(10.0**rng.uniform(-5.0, 7.0, n_particles),
+                        rng.integers(0, N_MATERIALS, n_particles))
+
+
+def lookup(bank, majorant, xs_tables, sort):
+    if sort:
+        bank.sort()
+    return bank.majorant_xs(majorant), bank.material_xs(xs_tables)
+
+
+@pytest.fixture(scope='module', params=[10**3, 10**5, 10**6],
+                ids=lambda n: 'grid={}'.format(n))
+def grid_tables(request):
+    return tables(request.param)
+
+
+@pytest.mark.parametrize('n_particles', [10**3, 10**4, 10**5],
+                         ids=lambda n: 'bank={}'.format(n))
+@pytest.mark.parametrize('sort', [False, True], ids=['random', 'sorted'])
+def bench_bank_lookup(benchmark, grid_tables, n_particles, sort):
+    majorant, xs_tables = grid_tables
+    # each round sorts a bank in random order
+    benchmark.pedantic(lookup, setup=lambda: ((random_bank(n_particles),
+                                               majorant, xs_tables, sort), {}),
+                       rounds=10)
+
+
+def speedups(grid_sizes=(10**3, 10**4, 10**5, 10**6),
+             bank_sizes=(10**3, 10**4, 10**5, 10**6)):
+    """
+    Time the lookups of random and sorted banks
+
+    Returns
+    -------
+    list of tuple
+        Grid size, bank size, random lookup time, sort time and sorted
+        lookup time (s)
+    """
+    results = []
+    for n_points in grid_sizes:
+        majorant, xs_tables = tables(n_points)
+        for n_particles in bank_sizes:
+            bank = random_bank(n_particles)
+            number = max(1, 10**5 // n_particles)
+
+            def best(stmt):
+                return min(repeat(stmt, number=number, repeat=5)) / number
+
+            t_random = best(lambda: lookup(bank, majorant, xs_tables, False))
+            t_sort = best(lambda: random_bank(n_particles).sort()) - \
+                best(lambda: random_bank(n_particles))
+            bank.sort()
+            t_sorted = best(lambda: lookup(bank, majorant, xs_tables, False))
+            results.append((n_points, n_particles, t_random, t_sort, t_sorted))
+    return results
+
+
+def main():
+    print("{:>8} {:>8} {:>12} {:>10} {:>12} {:>9} {:>11}".format(
+        "Grid", "Bank", "Random (ms)", "Sort (ms)", "Sorted (ms)",
+        "Speedup", "incl. sort"))
+    for n_points, n_particles, t_random, t_sort, t_sorted in speedups():
+        print("{:>8} {:>8} {:>12.3f} {:>10.3f} {:>12.3f} {:>8.2f}x {:>10.2f}x".format(
+            n_points, n_particles, 1E3 * t_random, 1E3 * t_sort,
+            1E3 * t_sorted, t_random / t_sorted,
+            t_random / (t_sort + t_sorted)))
+
+
+if __name__ == '__main__':
+    main()
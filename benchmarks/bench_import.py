@@ -0,0 +1,71 @@
+"""
+Import-time benchmarks. Run as a script for a ``python -X importtime``
+report of the slowest modules imported by a statement::
+
+    python benchmarks/bench_import.py "import igmc.majorant"
+"""
+import subprocess
+import sys
+
+import pytest
+
+# dependencies that should only be loaded on first use
+HEAVY = ('openmc', 'matplotlib', 'h5py')
+
+
+def import_times(statement):
+    """
+    Import times of the modules loaded by a statement in a fresh
+    interpreter, as reported by ``python -X importtime``
+
+    Parameters
+    ----------
+    statement : str
+        Python statement to run
+
+    Returns
+    -------
+    dict
+        Dictionary with module names as keys and (self, cumulative)
+        import times (s) as values
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                          capture_output=True, text=True, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us) * 1E-6, int(cumulative_us) * 1E-6)
+    return times
+
+
+def run(statement):
+    subprocess.run([sys.executable, '-c', statement], check=True)
+
+
+@pytest.mark.parametrize('statement', ['import igmc',
+                                       'from igmc import Majorant, delta_tracking',
+                                       'import igmc.majorant_funcs'])
+def bench_import(benchmark, statement):
+    benchmark.pedantic(run, (statement,), rounds=5)
+
+    times = import_times(statement)
+    loaded = {name.split('.')[0] for name in times}
+    benchmark.extra_info['modules'] = len(times)
+    benchmark.extra_info['igmc_self_time'] = sum(
+        t[0] for name, t in times.items() if name.startswith('igmc'))
+    assert not loaded & set(HEAVY)
+
+
+def main(statement='import igmc', n=15):
+    times = import_times(statement)
+    print("{:<40} {:>12} {:>14}".format("Module", "Self (ms)", "Cumulative (ms)"))
+    for name, (self_time, cumulative) in sorted(
+            times.items(), key=lambda t: -t[1][1])[:n]:
+        print("{:<40} {:>12.2f} {:>14.2f}".format(name, 1E3 * self_time,
+                                                  1E3 * cumulative))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from igmc.binary_search import binary_search
+from igmc.majorant import Majorant
+from igmc.xs import CEXS
+
+from synthetic import synthetic_xs
+
+
+@pytest.fixture(scope='module')
+def curve():
+    return synthetic_xs(10**5, seed=1)
+
+
+@pytest.fixture(scope='module')
+def energies():
+    return 10.0**np.random.default_rng(0).uniform(-5.0, 7.0, 10**5)
+
+
+def bench_majorant_scalar(benchmark, curve):
+    majorant = Majorant()
+    majorant.update(*curve)
+    benchmark(majorant.calculate_xs, 1234.5)
+
+
+def bench_cexs_scalar(benchmark, curve):
+    xs = CEXS(*curve)
+    benchmark(xs.calculate_xs, 1234.5)
+
+
+def bench_binary_search(benchmark, curve):
+    benchmark(binary_search, curve[0], 1234.5)
+
+
+@pytest.mark.parametrize('out', [False, True], ids=['alloc', 'out'])
+def bench_majorant_batched(benchmark, curve, energies, out):
+    majorant = Majorant()
+    majorant.update(*curve)
+    buffer = np.empty_like(energies) if out else None
+    result = benchmark(majorant.calculate_xs, energies, buffer)
+    assert result.shape == energies.shape
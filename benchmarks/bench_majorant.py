@@ -0,0 +1,55 @@
+import copy
+
+import numpy as np
+import pytest
+
+from igmc.majorant import Max2D
+from igmc.majorant_funcs import setup_energy_grid
+
+from synthetic import synthetic_xs
+
+SIZES = [10**3, 10**4, 10**5, 10**6]
+
+
+def rounds(n_points):
+    return max(1, 10**5 // n_points)
+
+
+@pytest.mark.parametrize('n_points', SIZES)
+def bench_envelope_merge(benchmark, n_points):
+    curve_a = synthetic_xs(n_points, seed=1)
+    curve_b = synthetic_xs(n_points, seed=2)
+
+    def setup():
+        envelope = Max2D()
+        envelope.update(*curve_a)
+        return (envelope,) + curve_b, {}
+
+    benchmark.pedantic(lambda envelope, x, y: envelope.update(x, y),
+                       setup=setup, rounds=rounds(n_points))
+
+
+@pytest.mark.parametrize('n_points', SIZES)
+def bench_update_grid(benchmark, n_points):
+    curve = Max2D()
+    curve.update(*synthetic_xs(n_points, seed=1))
+    fine_grid = np.union1d(curve.x_values, synthetic_xs(n_points, seed=2)[0])
+
+    def setup():
+        return (copy.copy(curve),), {}
+
+    benchmark.pedantic(lambda c: c.update_grid(fine_grid), setup=setup,
+                       rounds=rounds(n_points))
+
+
+class Nuclide:
+    def __init__(self, e_grid):
+        self.e_grid = e_grid
+
+
+@pytest.mark.parametrize('n_nuclides', [10, 100])
+def bench_union_grid(benchmark, n_nuclides):
+    nuclides = {i: Nuclide(synthetic_xs(10**4, seed=i)[0])
+                for i in range(n_nuclides)}
+    grid = benchmark(setup_energy_grid, nuclides)
+    assert np.all(np.diff(grid) > 0.0)
@@ -0,0 +1,96 @@
+"""
+Majorant lookups with float64 and float32 tables. Run as a script to
+print the memory, lookup times and conservative inflation of float32
+majorants over a range of grid sizes.
+"""
+from timeit import repeat
+
+import numpy as np
+import pytest
+
+from igmc.majorant import Majorant
+from igmc.verify import verify_majorant
+
+from synthetic import synthetic_xs
+
+N_LOOKUPS = 10**5
+
+
+def majorants(n_points):
+    majorant = Majorant()
+    majorant.update(*synthetic_xs(n_points, seed=1))
+    return majorant, majorant.astype(np.float32)
+
+
+def random_energies(n=N_LOOKUPS, seed=0):
+    return 10.0**np.random.default_rng(seed).uniform(-5.0, 7.0, n)
+
+
+@pytest.fixture(scope='module', params=[10**4, 10**6],
+                ids=lambda n: 'grid={}'.format(n))
+def grid_majorants(request):
+    return majorants(request.param)
+
+
+@pytest.mark.parametrize('sort', [False, True], ids=['random', 'sorted'])
+@pytest.mark.parametrize('dtype', ['float64', 'float32'])
+def bench_majorant_precision(benchmark, grid_majorants, dtype, sort):
+    majorant = grid_majorants[dtype == 'float32']
+    energies = random_energies()
+    if sort:
+        energies.sort()
+    out = np.empty_like(energies)
+    benchmark(majorant.calculate_xs, energies, out, sort)
+    benchmark.extra_info['table_bytes'] = \
+        majorant.x_values.nbytes + majorant.y_values.nbytes
+
+
+def comparison(grid_sizes=(10**4, 10**5, 10**6, 10**7)):
+    """
+    Compare float64 and float32 majorants
+
+    Returns
+    -------
+    list of tuple
+        Grid size, float64 and float32 table sizes (bytes), float64 and
+        float32 lookup times (s) of random and sorted energies, mean
+        relative inflation of the float32 majorant and whether it passed
+        verification against the float64 majorant
+    """
+    results = []
+    energies = random_energies()
+    sorted_energies = np.sort(energies)
+    out = np.empty_like(energies)
+    for n_points in grid_sizes:
+        double, single = majorants(n_points)
+        passed = bool(verify_majorant(single, [double], record=False))
+        inflation = np.mean(single.calculate_xs(sorted_energies) /
+                            double.calculate_xs(sorted_energies)) - 1.0
+
+        def best(majorant, e, sort):
+            return min(repeat(lambda: majorant.calculate_xs(e, out, sort),
+                              number=5, repeat=5)) / 5
+
+        row = [n_points]
+        row += [m.x_values.nbytes + m.y_values.nbytes for m in (double, single)]
+        row += [best(m, e, sort) for e, sort in ((energies, False),
+                                                 (sorted_energies, True))
+                for m in (double, single)]
+        results.append(tuple(row) + (inflation, passed))
+    return results
+
+
+def main():
+    print("{:>9} {:>10} {:>10} {:>17} {:>17} {:>10} {:>8}".format(
+        "Grid", "f64 (MB)", "f32 (MB)", "Random f64/f32", "Sorted f64/f32",
+        "Inflation", "Verified"))
+    for (n_points, b64, b32, r64, r32, s64, s32, inflation,
+         passed) in comparison():
+        print("{:>9} {:>10.2f} {:>10.2f} {:>7.2f}/{:<6.2f}ms {:>7.2f}/{:<6.2f}ms "
+              "{:>10.2e} {:>8}".format(n_points, b64 / 1E6, b32 / 1E6,
+                                       1E3 * r64, 1E3 * r32, 1E3 * s64,
+                                       1E3 * s32, inflation, str(passed)))
+
+
+if __name__ == '__main__':
+    main()
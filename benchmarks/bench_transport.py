@@ -0,0 +1,74 @@
+"""
+Transport throughput on the synthetic pincell. ``bench_pincell_histories``
+times a minimal copy of the history loop in ``simulate.run_histories``
+that runs without OpenMC; ``bench_simulate_histories`` times the driver
+itself, with and without its tallies and history buffer, and is skipped
+when OpenMC is not installed.
+"""
+import numpy as np
+import pytest
+
+from igmc.particle_gen import ParticleGenerator
+from igmc.results import HistoryBuffer
+from igmc.transport import delta_tracking, weighted_delta_tracking
+
+from synthetic import Pincell, pincell_tables
+
+N_HISTORIES = 1000
+
+
+@pytest.fixture(scope='module')
+def tables():
+    return pincell_tables()
+
+
+def run_histories(transport, geometry, majorant, xs_dict):
+    # copy of the loop in simulate.run_histories, without its tallies,
+    # progress reporting and recording hooks
+    source = ParticleGenerator()
+    events = 0
+    for _ in range(N_HISTORIES):
+        bank = [source()]
+        while bank:
+            p = bank.pop()
+            bank += transport(p, geometry, majorant, xs_dict)
+            events += p.n_events
+    return events
+
+
+def record_rates(benchmark, events):
+    # stats are not collected under --benchmark-disable
+    if benchmark.enabled:
+        benchmark.extra_info['histories_per_second'] = \
+            N_HISTORIES / benchmark.stats.stats.mean
+    benchmark.extra_info['events_per_history'] = events / N_HISTORIES
+
+
+@pytest.mark.parametrize('transport', [delta_tracking, weighted_delta_tracking],
+                         ids=['analog', 'weighted'])
+def bench_pincell_histories(benchmark, tables, transport):
+    np.random.seed(1)
+    majorant, xs_dict = tables
+    events = benchmark.pedantic(run_histories,
+                                (transport, Pincell(), majorant, xs_dict),
+                                rounds=5)
+    record_rates(benchmark, events)
+
+
+@pytest.mark.parametrize('hooks', [False, True], ids=['bare', 'recorded'])
+def bench_simulate_histories(benchmark, tables, hooks):
+    pytest.importorskip('openmc')
+    from simulate import pincell_tallies, run_histories as simulate_histories
+
+    def run():
+        kwargs = {}
+        if hooks:
+            kwargs = {'tallies': pincell_tallies((4, 4, 4), 10),
+                      'recorder': HistoryBuffer()}
+        _, events = simulate_histories(N_HISTORIES, delta_tracking, Pincell(),
+                                       *tables, progress=False, **kwargs)
+        return events.sum()
+
+    np.random.seed(1)
+    events = benchmark.pedantic(run, rounds=5)
+    record_rates(benchmark, events)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from igmc import checkvalue as cv
+from igmc.majorant import data2D
+from igmc.particle import Particle
+from igmc.transport import delta_tracking
+
+from bench_transport import run_histories
+from synthetic import Pincell, pincell_tables
+
+LEVELS = list(cv.VALIDATION_LEVELS)
+
+
+@pytest.fixture(params=LEVELS)
+def level(request):
+    with cv.validation_level(request.param):
+        yield request.param
+
+
+def update_state(p, n=1000):
+    for i in range(n):
+        p.r = (0.1, 0.2, 0.3)
+        p.u = (0.0, 0.0, 1.0)
+        p.e = 1.0E+06
+        p.wgt = 1.0
+
+
+def bench_particle_updates(benchmark, level):
+    benchmark(update_state, Particle())
+
+
+def bench_data2D_from_list(benchmark, level):
+    x = list(np.linspace(1.0, 2.0, 10**5))
+    benchmark.pedantic(data2D, (x, x), rounds=10)
+
+
+def bench_histories(benchmark, level):
+    np.random.seed(1)
+    majorant, xs_dict = pincell_tables()
+    benchmark.pedantic(run_histories,
+                       (delta_tracking, Pincell(), majorant, xs_dict),
+                       rounds=5)
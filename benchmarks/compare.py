@@ -0,0 +1,84 @@
+"""
+Compare two pytest-benchmark JSON files and report regressions.
+
+Usage::
+
+    python benchmarks/compare.py baseline.json current.json --threshold 0.1
+
+Exits with status 1 if any benchmark present in both files is slower
+than the baseline by more than the threshold (relative).
+"""
+import argparse
+import json
+import sys
+
+
+def load(path, stat):
+    with open(path) as f:
+        data = json.load(f)
+    return {b['fullname']: b['stats'][stat] for b in data['benchmarks']}
+
+
+def compare(baseline, current, threshold):
+    """
+    Relative change of each benchmark present in both runs
+
+    Parameters
+    ----------
+    baseline : dict
+        Benchmark statistic of the baseline run, keyed by name
+    current : dict
+        Benchmark statistic of the current run, keyed by name
+    threshold : float
+        Relative slowdown above which a benchmark is a regression
+
+    Returns
+    -------
+    list of tuple
+        (name, baseline, current, relative change, regression) for each
+        benchmark
+    """
+    rows = []
+    for name in sorted(set(baseline) & set(current)):
+        change = current[name] / baseline[name] - 1.0
+        rows.append((name, baseline[name], current[name], change,
+                     change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('baseline', help='pytest-benchmark JSON of the baseline')
+    parser.add_argument('current', help='pytest-benchmark JSON to check')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown reported as a regression')
+    parser.add_argument('--stat', default='mean',
+                        choices=['min', 'max', 'mean', 'median'],
+                        help='benchmark statistic compared')
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline, args.stat)
+    current = load(args.current, args.stat)
+    rows = compare(baseline, current, args.threshold)
+
+    width = max([len(row[0]) for row in rows] + [9])
+    print("{:<{w}} {:>14} {:>14} {:>9}".format(
+          "Benchmark", "Baseline (s)", "Current (s)", "Change", w=width))
+    for name, old, new, change, regression in rows:
+        print("{:<{w}} {:>14.6g} {:>14.6g} {:>+8.1%}{}".format(
+              name, old, new, change, "  REGRESSION" if regression else "",
+              w=width))
+    for name in sorted(set(baseline) ^ set(current)):
+        print("{:<{w}} only in {}".format(
+              name, 'baseline' if name in baseline else 'current', w=width))
+
+    n_regressions = sum(row[4] for row in rows)
+    if n_regressions:
+        print("{} benchmark(s) regressed by more than {:.0%}".format(
+              n_regressions, args.threshold))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
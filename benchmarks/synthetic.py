@@ -0,0 +1,88 @@
+"""
+Synthetic cross sections from :class:`igmc.providers.SyntheticProvider`
+and a pincell geometry stand-in so that the benchmarks run without OpenMC
+nuclear data
+"""
+import numpy as np
+
+from igmc.majorant import Majorant
+from igmc.providers import SyntheticProvider
+from igmc.xs import CEXS
+
+# nuclide and number density (atom/b-cm) standing in for each pincell fill
+PINCELL_FILLS = {'fuel': ('U238', 0.022), 'clad': ('Zr90', 0.043),
+                 'water': ('H1', 0.067)}
+
+
+def synthetic_xs(n_points, nuclide='U238', seed=0, scale=1.0):
+    """
+    Cross section of a nuclide from :class:`igmc.providers.SyntheticProvider`
+    at 294 K
+
+    Parameters
+    ----------
+    n_points : int
+        Approximate number of energy points
+    nuclide : str
+        Name of the nuclide
+    seed : int
+        Seed of the provider
+    scale : float
+        Multiplier applied to the cross section, e.g. a number density
+        (atom/b-cm) for a macroscopic cross section
+
+    Returns
+    -------
+    e_grid : numpy.ndarray
+        Energy values (eV)
+    xs : numpy.ndarray
+        Cross section values
+    """
+    e_grid, xs = SyntheticProvider(n_points, seed=seed).nuclide_xs(nuclide, 294.0)
+    return e_grid, scale * xs
+
+
+class Cell:
+    def __init__(self, cell_id, fill, r_max):
+        self.id = cell_id
+        self.fill = fill
+        self.r_max = r_max
+
+
+class Pincell:
+    """
+    Geometry stand-in with the cylinders of simulate.pincell
+    """
+    cells = [Cell(1, 'fuel', 1.5), Cell(2, 'clad', 1.7), Cell(3, 'water', 2.0)]
+
+    def find(self, r):
+        rho = np.hypot(r[0], r[1])
+        for cell in self.cells:
+            if rho < cell.r_max:
+                return [cell]
+        return []
+
+    def get_all_cells(self):
+        return {cell.id: cell for cell in self.cells}
+
+
+def pincell_tables(n_points=20000):
+    """
+    Synthetic material cross sections and majorant for :class:`Pincell`
+
+    Returns
+    -------
+    majorant : Majorant
+        Majorant of the material cross sections
+    xs_dict : dict
+        Dictionary with cell fills as keys and CEXS instances as values
+    """
+    xs_dict = {}
+    for fill, (nuclide, density) in PINCELL_FILLS.items():
+        xs_dict[fill] = CEXS(*synthetic_xs(n_points, nuclide, scale=density))
+
+    majorant = Majorant()
+    for xs in xs_dict.values():
+        majorant.update(xs.e_grid, xs.xs_vals)
+
+    return majorant, xs_dict
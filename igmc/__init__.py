@@ -1,6 +1,62 @@
+import importlib
 
-from .particle import *
-from .particle_gen import *
-from .majorant import *
-from .majorant_funcs import *
-from .xs import *
+# public names of the package by defining submodule. Submodules are only
+# imported when one of their names is first accessed, so that importing
+# the package stays cheap and heavy dependencies (OpenMC, matplotlib) are
+# loaded on first use.
+_exports = {
+    'particle': ['Termination', 'Particle'],
+    'particle_gen': ['ParticleGenerator'],
+    'majorant': ['VERSION_MAJORANT', 'material_key', 'round_up', 'data2D',
+                 'Max2D',
+                 'MicroMajorant', 'bracketing_temperatures',
+                 'TemperatureRangeMajorant', 'MaterialMajorant', 'Majorant'],
+    'majorant_funcs': ['WINDOW_BYTES_PER_POINT', 'setup_energy_grid',
+                       'energy_windows', 'majorants_from_model',
+                       'material_temperatures', 'MajorantBuilder',
+                       'majorants_from_geometry', 'majorant_from_geometry',
+                       'plot_majorant'],
+    'xs': ['CEXS'],
+    'providers': ['library_fingerprint', 'library_temperatures',
+                  'atom_densities', 'XSProvider',
+                  'OpenMCProvider', 'SyntheticProvider'],
+    'transport': ['MAJORANT_RTOL', 'check_majorant', 'delta_tracking',
+                  'weighted_delta_tracking', 'russian_roulette', 'split',
+                  'majorant_ratios', 'surface_tracking_cells',
+                  'hybrid_tracking'],
+    'surface': ['TINY_BIT', 'quadric_coeffs', 'distance_to_surface',
+                'distance_to_boundary'],
+    'verify': ['MajorantVerification', 'verify_majorant', 'is_verified'],
+    'csg': ['CompiledGeometry', 'compile_region', 'compile_geometry'],
+    'shared': ['ALIGNMENT', 'SharedHandle', 'attach', 'SharedTables'],
+    'tally': ['RegularMesh', 'EnergyFilter', 'Tally', 'reduce_tallies',
+              'score_collision', 'score_track'],
+    'run_control': ['StopReason', 'RunController'],
+    'results': ['HISTORY_DTYPE', 'HistoryBuffer', 'HistoryWriter',
+                'read_histories'],
+    'bank': ['ParticleBank'],
+    'tracks': ['TrackEvent', 'TRACK_DTYPE', 'TrackRecorder', 'read_tracks'],
+    'checkpoint': ['VERSION_CHECKPOINT', 'table_fingerprint', 'Checkpoint'],
+    'progress': ['ProgressReporter', 'QueueReporter'],
+    'profiling': ['HOT_PATHS', 'VALIDATORS', 'Profiler', 'active_profiler',
+                  'timer', 'count'],
+}
+
+_origins = {name: module for module, names in _exports.items()
+            for name in names}
+
+__all__ = list(_origins)
+
+
+def __getattr__(name):
+    module = _origins.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute "
+                             "{!r}".format(__name__, name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_origins))
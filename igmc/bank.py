@@ -0,0 +1,179 @@
+from collections.abc import Sequence
+from numbers import Integral
+
+import numpy as np
+
+from . import checkvalue as cv
+
+
+class ParticleBank:
+    """
+    Particles of an event-based transport stage stored as arrays, with
+    cross section lookups batched over the whole bank.
+
+    Lookups at scattered energies and for interleaved materials access
+    the cross section tables at random. Sorting the bank by material and
+    then energy turns the lookups of each material into one lookup of
+    sorted energies, which visits the energy grid in order. The bank is
+    sorted every `sort_every` events as energies change at collisions.
+
+    Parameters
+    ----------
+    e : Iterable of float
+        Particle energies (eV)
+    material : Iterable of int
+        Index of the material of each particle in the cross section
+        tables passed to :meth:`material_xs`
+    sort_every : int
+        Number of events between sorts
+    **arrays
+        Other per-particle arrays (e.g. position, direction, weight),
+        reordered along with the energies
+
+    Attributes
+    ----------
+    e : numpy.ndarray
+        Particle energies (eV)
+    material : numpy.ndarray
+        Material index of each particle
+    arrays : dict
+        Other per-particle arrays
+    is_sorted : bool
+        Whether the bank is sorted by material and energy
+    events : int
+        Number of events ended with :meth:`end_event`
+    """
+
+    def __init__(self, e, material, sort_every=1, **arrays):
+        self.e = np.ascontiguousarray(e, dtype=np.float64)
+        self.material = np.ascontiguousarray(material, dtype=np.intp)
+        cv.check_type('sort_every', sort_every, Integral)
+        cv.check_greater_than('sort_every', sort_every, 0)
+        if self.e.ndim != 1 or self.material.shape != self.e.shape:
+            raise ValueError('Energies and materials must be 1D arrays '
+                             'of the same length')
+        for name, values in arrays.items():
+            if len(values) != len(self.e):
+                raise ValueError('Array {} does not have an entry per '
+                                 'particle'.format(name))
+
+        self.sort_every = sort_every
+        self.arrays = {name: np.asarray(values)
+                       for name, values in arrays.items()}
+        self.is_sorted = False
+        self.events = 0
+        self._segments = None
+
+    def __len__(self):
+        return len(self.e)
+
+    def __repr__(self):
+        return "ParticleBank(particles={}, sorted={})".format(
+            len(self), self.is_sorted)
+
+    def sort(self):
+        """
+        Sort the particles by material and then energy
+
+        Returns
+        -------
+        numpy.ndarray
+            Indices of the particles in their previous order
+        """
+        # a stable sort of the materials keeps the energy order and is a
+        # radix sort for small integers; much faster than np.lexsort
+        order = np.argsort(self.e)
+        material = self.material[order]
+        if len(self) and 0 <= material.min() and material.max() < 2**16:
+            material = material.astype(np.uint16)
+        order = order[np.argsort(material, kind='stable')]
+
+        self.e = self.e[order]
+        self.material = self.material[order]
+        for name, values in self.arrays.items():
+            self.arrays[name] = values[order]
+
+        # bounds of the run of particles in each material
+        starts = np.flatnonzero(np.diff(self.material)) + 1
+        bounds = np.concatenate(([0], starts, [len(self)]))
+        self._segments = [(int(self.material[i]), slice(i, j))
+                          for i, j in zip(bounds[:-1], bounds[1:])]
+        self.is_sorted = True
+        return order
+
+    def end_event(self):
+        """
+        Mark the end of an event that may have changed the energies,
+        sorting the bank if `sort_every` events have passed
+        """
+        self.events += 1
+        self.is_sorted = False
+        if self.events % self.sort_every == 0:
+            self.sort()
+
+    def segments(self):
+        """
+        Runs of particles in the same material
+
+        Returns
+        -------
+        list of tuple
+            Material index and slice of the bank for each run. The
+            energies of a run are sorted if the bank is sorted.
+        """
+        if self.is_sorted:
+            return self._segments
+        return [(int(m), np.flatnonzero(self.material == m))
+                for m in np.unique(self.material)]
+
+    def majorant_xs(self, majorant, out=None):
+        """
+        Majorant cross section at the energy of each particle
+
+        Parameters
+        ----------
+        majorant : Majorant
+            Majorant cross section
+        out : numpy.ndarray, optional
+            Array of the bank's length in which to place the result
+
+        Returns
+        -------
+        numpy.ndarray
+            Majorant cross section of each particle
+        """
+        if out is None:
+            out = np.empty(len(self))
+        if not self.is_sorted:
+            return majorant.calculate_xs(self.e, out)
+        # energies are sorted within each material
+        for _, run in self._segments:
+            majorant.calculate_xs(self.e[run], out[run], assume_sorted=True)
+        return out
+
+    def material_xs(self, tables, out=None):
+        """
+        Total cross section of each particle's material at its energy
+
+        Parameters
+        ----------
+        tables : Sequence of CEXS
+            Cross sections indexed by material index
+        out : numpy.ndarray, optional
+            Array of the bank's length in which to place the result
+
+        Returns
+        -------
+        numpy.ndarray
+            Total cross section of each particle
+        """
+        cv.check_type('tables', tables, Sequence)
+        if out is None:
+            out = np.empty(len(self))
+        for m, run in self.segments():
+            if self.is_sorted:
+                tables[m].calculate_xs(self.e[run], out[run],
+                                       assume_sorted=True)
+            else:
+                out[run] = tables[m].calculate_xs(self.e[run])
+        return out
@@ -1,15 +1,5 @@
+from bisect import bisect_right
 
-def find_index(elements, val):
-    first = 0
-    last = len(elements) -1
-    middle = (first + last) // 2
-
-    if elements[middle] >= val:
-        first = middle
-    else:
-        last = middle - 1
-
-    return first, last
 
 def binary_search(elements, val):
     """
@@ -24,14 +14,15 @@ def binary_search(elements, val):
 
     val : Iterable type
         Query value
+
+    Returns
+    -------
+    int or None
+        Index of the lower bound of the interval containing the value.
+        None if the value lies outside of the elements.
     """
 
-    if val < elements[0] and val > elements[-1]:
+    if val < elements[0] or val > elements[-1]:
         return None
 
-    i, j = find_index(elements, val)
-
-    while (j - i) > 1:
-        i, j = find_index(elements[i:j], val)
-
-    return i
+    return min(bisect_right(elements, val), len(elements) - 1) - 1
@@ -0,0 +1,301 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .mixin import next_auto_id, set_auto_id
+from .particle import Particle
+from .run_control import RunController
+from . import checkvalue as cv
+
+# file type version of checkpoints
+VERSION_CHECKPOINT = (1, 1)
+
+
+def table_fingerprint(majorant, xs_dict):
+    """
+    Fingerprint of the majorant and material cross section tables of a
+    run. Checkpoints record the fingerprint rather than the tables
+    themselves so that a resumed run can verify it rebuilt the same
+    tables.
+
+    Parameters
+    ----------
+    majorant : Majorant
+        Majorant cross section
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+
+    Returns
+    -------
+    str
+        SHA-1 digest of the table data
+    """
+    sha = hashlib.sha1()
+    for vals in (majorant.x_values, majorant.y_values):
+        sha.update(np.ascontiguousarray(vals, dtype=np.float64))
+    for material in sorted(xs_dict, key=lambda m: m.id):
+        xs = xs_dict[material]
+        sha.update(str(material.id).encode())
+        sha.update(np.ascontiguousarray(xs.e_grid, dtype=np.float64))
+        sha.update(np.ascontiguousarray(xs.xs_vals, dtype=np.float64))
+    return sha.hexdigest()
+
+
+class Checkpoint:
+    """
+    State of a run at a batch boundary, from which the run can be
+    resumed with results identical to an uninterrupted run
+
+    Parameters
+    ----------
+    settings : dict
+        Run settings. A run can only be resumed with the same settings.
+    fingerprint : str
+        Fingerprint of the majorant and cross section tables (see
+        :func:`table_fingerprint`)
+    run_state : dict
+        Progress of the run (see :meth:`RunController.get_state`)
+    rng_state : tuple
+        State of NumPy's global random number generator
+    tallies : list of dict, optional
+        Name, estimator, number of batches and sums of each tally
+    counts : dict, optional
+        Per-cell event counts of hybrid tracking
+    next_id : int, optional
+        ID of the next particle created by the run
+
+    Attributes
+    ----------
+    settings : dict
+        Run settings
+    fingerprint : str
+        Fingerprint of the majorant and cross section tables
+    run_state : dict
+        Progress of the run
+    rng_state : tuple
+        State of NumPy's global random number generator
+    tallies : list of dict
+        Accumulated tally results
+    counts : dict
+        Per-cell event counts of hybrid tracking
+    next_id : int or None
+        ID of the next particle created by the run. None for checkpoints
+        written before particle IDs were saved.
+    """
+
+    def __init__(self, settings, fingerprint, run_state, rng_state,
+                 tallies=None, counts=None, next_id=None):
+        self.settings = settings
+        self.fingerprint = fingerprint
+        self.run_state = run_state
+        self.rng_state = rng_state
+        self.tallies = [] if tallies is None else tallies
+        self.counts = {} if counts is None else counts
+        self.next_id = next_id
+
+    def __repr__(self):
+        return "Checkpoint(batches={}, particles={})".format(
+            self.run_state['n_batches'], self.run_state['n_particles'])
+
+    @classmethod
+    def from_run(cls, settings, fingerprint, controller, tallies=None,
+                 counts=None):
+        """
+        Capture the state of a run after a completed batch
+
+        Parameters
+        ----------
+        settings : dict
+            Run settings
+        fingerprint : str
+            Fingerprint of the majorant and cross section tables
+        controller : RunController
+            Controller of the run
+        tallies : Iterable of Tally, optional
+            Tallies of the run
+        counts : defaultdict of Counter, optional
+            Per-cell event counts of hybrid tracking
+
+        Returns
+        -------
+        Checkpoint
+        """
+        cv.check_type('controller', controller, RunController)
+        tally_states = []
+        for tally in tallies or []:
+            tally.flush()
+            tally_states.append({'name': tally.name,
+                                 'estimator': tally.estimator,
+                                 'n_batches': tally.n_batches,
+                                 'sum': tally.sum.copy(),
+                                 'sum_sq': tally.sum_sq.copy()})
+        counts = {cell_id: dict(c) for cell_id, c in (counts or {}).items()}
+        return cls(settings, fingerprint, controller.get_state(),
+                   np.random.get_state(), tally_states, counts,
+                   next_auto_id(Particle))
+
+    def check(self, settings, fingerprint):
+        """
+        Ensure a run can be resumed from this checkpoint
+
+        Parameters
+        ----------
+        settings : dict
+            Settings of the run being resumed
+        fingerprint : str
+            Fingerprint of the tables of the run being resumed
+        """
+        # compare in the form the settings are stored in
+        settings = json.loads(json.dumps(settings))
+        changed = sorted(key for key in set(settings) | set(self.settings)
+                         if settings.get(key) != self.settings.get(key))
+        if changed:
+            raise ValueError('Run settings differ from the checkpoint: '
+                             '{}'.format(', '.join(changed)))
+        if fingerprint != self.fingerprint:
+            raise ValueError('Majorant or cross section tables differ from '
+                             'those of the checkpointed run')
+
+    def restore(self, controller, tallies=None, counts=None):
+        """
+        Restore the state of a run
+
+        Parameters
+        ----------
+        controller : RunController
+            Controller of the resumed run
+        tallies : Iterable of Tally, optional
+            Tallies of the resumed run, in the checkpointed order
+        counts : defaultdict of Counter, optional
+            Per-cell event counts of the resumed run
+        """
+        tallies = [] if tallies is None else list(tallies)
+        if len(tallies) != len(self.tallies):
+            raise ValueError('Checkpoint holds {} tallies, {} were '
+                             'provided'.format(len(self.tallies), len(tallies)))
+        for tally, state in zip(tallies, self.tallies):
+            if tally.estimator != state['estimator'] or \
+               tally.shape != state['sum'].shape:
+                raise ValueError('Tally {!r} does not match the checkpointed '
+                                 'tally {!r}'.format(tally.name, state['name']))
+            tally.reset()
+            tally.n_batches = state['n_batches']
+            tally.sum[...] = state['sum']
+            tally.sum_sq[...] = state['sum_sq']
+
+        # tallies must be restored first as they are tracked by the controller
+        controller.set_state(self.run_state)
+        np.random.set_state(self.rng_state)
+        # particles are numbered on from where the checkpointed run stopped
+        if self.next_id is not None:
+            set_auto_id(self.next_id)
+
+        if counts is not None:
+            counts.clear()
+            for cell_id, cell_counts in self.counts.items():
+                counts[cell_id].update(cell_counts)
+
+    def to_file(self, path):
+        """
+        Write the checkpoint to an HDF5 file. The file is replaced
+        atomically so that an interrupted write leaves the previous
+        checkpoint intact.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to write
+        """
+        import h5py
+
+        tmp_path = path + '.tmp'
+        with h5py.File(tmp_path, 'w') as f:
+            f.attrs['filetype'] = np.bytes_('checkpoint')
+            f.attrs['version'] = np.array(VERSION_CHECKPOINT)
+            f.attrs['settings'] = np.bytes_(json.dumps(self.settings))
+            f.attrs['fingerprint'] = np.bytes_(self.fingerprint)
+            f.attrs['counts'] = np.bytes_(json.dumps(
+                {str(cell_id): c for cell_id, c in self.counts.items()}))
+            if self.next_id is not None:
+                f.attrs['next_id'] = self.next_id
+
+            run = f.create_group('run')
+            for key in ('n_batches', 'n_particles', 'elapsed'):
+                run.attrs[key] = self.run_state[key]
+            run.create_dataset('leakage', data=self.run_state['leakage'])
+            run.create_dataset('events', data=self.run_state['events'])
+            means = run.create_group('batch_means')
+            for quantity, vals in self.run_state['batch_means'].items():
+                means.create_dataset(quantity, data=vals)
+
+            name, keys, pos, has_gauss, cached_gaussian = self.rng_state
+            rng = f.create_group('rng')
+            rng.attrs['name'] = np.bytes_(name)
+            rng.attrs['pos'] = pos
+            rng.attrs['has_gauss'] = has_gauss
+            rng.attrs['cached_gaussian'] = cached_gaussian
+            rng.create_dataset('keys', data=keys)
+
+            tallies = f.create_group('tallies')
+            for i, state in enumerate(self.tallies):
+                group = tallies.create_group(str(i))
+                group.attrs['name'] = np.bytes_(state['name'])
+                group.attrs['estimator'] = np.bytes_(state['estimator'])
+                group.attrs['n_batches'] = state['n_batches']
+                group.create_dataset('sum', data=state['sum'])
+                group.create_dataset('sum_sq', data=state['sum_sq'])
+
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load a checkpoint written by :meth:`to_file`
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to read
+
+        Returns
+        -------
+        Checkpoint
+        """
+        import h5py
+
+        with h5py.File(path, 'r') as f:
+            cv.check_filetype_version(f, 'checkpoint', VERSION_CHECKPOINT[0])
+
+            settings = json.loads(f.attrs['settings'].decode())
+            fingerprint = f.attrs['fingerprint'].decode()
+            counts = {int(cell_id): c for cell_id, c
+                      in json.loads(f.attrs['counts'].decode()).items()}
+            next_id = int(f.attrs['next_id']) if 'next_id' in f.attrs else None
+
+            run = f['run']
+            run_state = {'n_batches': int(run.attrs['n_batches']),
+                         'n_particles': int(run.attrs['n_particles']),
+                         'elapsed': float(run.attrs['elapsed']),
+                         'leakage': run['leakage'][()],
+                         'events': run['events'][()],
+                         'batch_means': {quantity: dset[()] for quantity, dset
+                                         in run['batch_means'].items()}}
+
+            rng = f['rng']
+            rng_state = (rng.attrs['name'].decode(), rng['keys'][()],
+                         int(rng.attrs['pos']), int(rng.attrs['has_gauss']),
+                         float(rng.attrs['cached_gaussian']))
+
+            tallies = []
+            for i in range(len(f['tallies'])):
+                group = f['tallies'][str(i)]
+                tallies.append({'name': group.attrs['name'].decode(),
+                                'estimator': group.attrs['estimator'].decode(),
+                                'n_batches': int(group.attrs['n_batches']),
+                                'sum': group['sum'][()],
+                                'sum_sq': group['sum_sq'][()]})
+
+        return cls(settings, fingerprint, run_state, rng_state, tallies, counts,
+                   next_id)
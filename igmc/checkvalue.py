@@ -1,8 +1,84 @@
 import copy
 from collections.abc import Iterable
+from contextlib import contextmanager
+import os
+import warnings
 
 import numpy as np
 
+# Validation levels. 'full' runs every check, 'boundary' skips the checks
+# of internal call sites on hot paths (particle state updates, merging of
+# majorant data) and only validates arguments at public entry points, and
+# 'off' disables value checks altogether. The initial level is read from
+# the IGMC_VALIDATION environment variable.
+VALIDATION_LEVELS = ('full', 'boundary', 'off')
+
+# whether internal call sites validate, consulted as ``if cv.full_checks:``
+full_checks = True
+_level = 'full'
+_enabled = True
+
+
+def get_validation_level():
+    """Current validation level
+
+    Returns
+    -------
+    str
+        One of 'full', 'boundary' or 'off'
+
+    """
+    return _level
+
+
+def set_validation_level(level):
+    """Set the package-wide validation level
+
+    Parameters
+    ----------
+    level : {'full', 'boundary', 'off'}
+        Validation level. 'full' runs every check, 'boundary' only checks
+        arguments at public entry points and 'off' disables value checks.
+
+    """
+    global full_checks, _level, _enabled
+    if level not in VALIDATION_LEVELS:
+        raise ValueError('Unable to set "validation level" to "{}" since it '
+                         'is not in "{}"'.format(level, VALIDATION_LEVELS))
+    _level = level
+    full_checks = level == 'full'
+    _enabled = level != 'off'
+
+
+@contextmanager
+def validation_level(level):
+    """Temporarily change the validation level
+
+    Parameters
+    ----------
+    level : {'full', 'boundary', 'off'}
+        Validation level within the context
+
+    """
+    previous = _level
+    set_validation_level(level)
+    try:
+        yield
+    finally:
+        set_validation_level(previous)
+
+
+def _level_from_env():
+    level = os.environ.get('IGMC_VALIDATION', 'full').strip().lower()
+    if level not in VALIDATION_LEVELS:
+        warnings.warn('Ignoring IGMC_VALIDATION={!r}, expected one of '
+                      '{}'.format(level, ', '.join(VALIDATION_LEVELS)))
+        level = 'full'
+    return level
+
+
+set_validation_level(_level_from_env())
+
 
 def check_type(name, value, expected_type, expected_iter_type=None, *, none_ok=False):
     """Ensure that an object is of an expected type. Optionally, if the object is
@@ -23,7 +99,7 @@ def check_type(name, value, expected_type, expected_iter_type=None, *, none_ok=F
         Whether None is allowed as a value
 
     """
-    if none_ok and value is None:
+    if not _enabled or (none_ok and value is None):
         return
 
     if not isinstance(value, expected_type):
@@ -79,6 +155,9 @@ def check_iterable_type(name, value, expected_type, min_depth=1, max_depth=1):
         The maximum number of layers of nested iterables there should be before
         reaching the ultimately contained items
     """
+    if not _enabled:
+        return
+
     # Initialize the tree at the very first item.
     tree = [value]
     index = [0]
@@ -153,6 +232,8 @@ def check_length(name, value, length_min, length_max=None):
         length length_min.
 
     """
+    if not _enabled:
+        return
 
     if length_max is None:
         if len(value) < length_min:
@@ -183,6 +264,8 @@ def check_value(name, value, accepted_values):
         Container of acceptable values
 
     """
+    if not _enabled:
+        return
 
     if value not in accepted_values:
         msg = 'Unable to set "{0}" to "{1}" since it is not in "{2}"'.format(
@@ -205,6 +288,8 @@ def check_less_than(name, value, maximum, equality=False):
         Whether equality is allowed. Defaults to False.
 
     """
+    if not _enabled:
+        return
 
     if equality:
         if value > maximum:
@@ -233,6 +318,8 @@ def check_greater_than(name, value, minimum, equality=False):
         Whether equality is allowed. Defaults to False.
 
     """
+    if not _enabled:
+        return
 
     if equality:
         if value < minimum:
@@ -0,0 +1,209 @@
+import weakref
+
+import numpy as np
+
+from .surface import quadric_coeffs
+
+# compiled form of each geometry, released with the geometry
+_compiled = weakref.WeakKeyDictionary()
+
+
+def compile_region(region, surfaces):
+    """
+    Compile a region into a predicate evaluated on the senses of its
+    surfaces for many points at once
+
+    Parameters
+    ----------
+    region : openmc.Region
+        Region built from half-spaces of quadric surfaces with
+        intersection, union and complement operators
+    surfaces : dict
+        Surfaces by ID whose senses are passed to the predicate, in row
+        order. Surfaces of the region not yet present are added.
+
+    Returns
+    -------
+    Callable
+        Function taking an array of shape (n_surfaces, N) that is True
+        where points lie on the positive side of each surface, and
+        returning a boolean array of shape (N,) that is True for the
+        points inside the region
+    """
+    import openmc
+
+    if isinstance(region, openmc.Halfspace):
+        surfaces.setdefault(region.surface.id, region.surface)
+        i = list(surfaces).index(region.surface.id)
+        if region.side == '+':
+            return lambda positive: positive[i]
+        return lambda positive: ~positive[i]
+
+    if isinstance(region, openmc.Complement):
+        node = compile_region(region.node, surfaces)
+        return lambda positive: ~node(positive)
+
+    if isinstance(region, (openmc.Intersection, openmc.Union)):
+        nodes = [compile_region(node, surfaces) for node in region]
+        combine = np.logical_and if isinstance(region, openmc.Intersection) \
+            else np.logical_or
+        empty = isinstance(region, openmc.Intersection)
+
+        def evaluate(positive):
+            if not nodes:
+                return np.full(positive.shape[1], empty)
+            out = nodes[0](positive).copy()
+            for node in nodes[1:]:
+                combine(out, node(positive), out=out)
+            return out
+
+        return evaluate
+
+    raise NotImplementedError('Regions of type {} cannot be '
+                              'compiled'.format(type(region).__name__))
+
+
+class CompiledGeometry:
+    """
+    Cells of a geometry compiled into predicates that locate many points
+    at once, as an alternative to openmc.Geometry.find evaluating one
+    point at a time.
+
+    The senses of all surfaces are computed together as the product of
+    the quadric coefficients with the monomials of the positions, and
+    each cell region is evaluated on the senses with boolean operations.
+    As with openmc.Geometry.find, a point belongs to the first cell of
+    the root universe containing it. Only cells filled with a material or
+    void are supported.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to compile
+
+    Attributes
+    ----------
+    cells : list of openmc.Cell
+        Cells of the root universe, in search order
+    surfaces : list of openmc.Surface
+        Surfaces bounding the cells
+    coeffs : numpy.ndarray
+        Quadric coefficients of the surfaces, of shape (n_surfaces, 10)
+    """
+
+    def __init__(self, geometry):
+        import openmc
+
+        self.cells = list(geometry.root_universe.cells.values())
+        for cell in self.cells:
+            if cell.fill is not None and not isinstance(cell.fill, openmc.Material):
+                raise NotImplementedError('Cell {} is not filled with a '
+                                          'material'.format(cell.id))
+
+        surfaces = {}
+        self._predicates = [None if cell.region is None else
+                            compile_region(cell.region, surfaces)
+                            for cell in self.cells]
+        self.surfaces = list(surfaces.values())
+        self.coeffs = np.array([quadric_coeffs(s) for s in self.surfaces],
+                               dtype=np.float64).reshape(-1, 10)
+
+    def __repr__(self):
+        return "CompiledGeometry(cells={}, surfaces={})".format(
+            len(self.cells), len(self.surfaces))
+
+    def senses(self, r):
+        """
+        Sides of the surfaces on which points lie
+
+        Parameters
+        ----------
+        r : numpy.ndarray
+            Positions, of shape (N, 3)
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array of shape (n_surfaces, N), True where a point lies
+            on the positive side of a surface (or on the surface)
+        """
+        r = np.asarray(r, dtype=np.float64).reshape(-1, 3)
+        x, y, z = r.T
+        monomials = np.stack((x*x, y*y, z*z, x*y, y*z, x*z,
+                              x, y, z, np.ones_like(x)))
+        return self.coeffs @ monomials >= 0.0
+
+    def locate(self, r):
+        """
+        Cells containing a batch of points
+
+        Parameters
+        ----------
+        r : numpy.ndarray
+            Positions, of shape (N, 3)
+
+        Returns
+        -------
+        numpy.ndarray
+            Index in :attr:`cells` of the cell containing each point, -1
+            for points outside of the geometry
+        """
+        positive = self.senses(r)
+        n = positive.shape[1]
+        index = np.full(n, -1, dtype=np.intp)
+        unassigned = np.ones(n, dtype=bool)
+        for i, predicate in enumerate(self._predicates):
+            inside = unassigned if predicate is None else \
+                predicate(positive) & unassigned
+            index[inside] = i
+            unassigned &= ~inside
+            if not unassigned.any():
+                break
+        return index
+
+    def fill_indices(self, r, fills):
+        """
+        Materials at a batch of points, e.g. for the material index of a
+        ParticleBank
+
+        Parameters
+        ----------
+        r : numpy.ndarray
+            Positions, of shape (N, 3)
+        fills : Sequence of openmc.Material
+            Materials to index
+
+        Returns
+        -------
+        numpy.ndarray
+            Index in `fills` of the material at each point, -1 for points
+            outside of the geometry or in cells whose fill is not listed
+        """
+        position = {id(fill): i for i, fill in enumerate(fills)}
+        # the last entry maps points outside of the geometry
+        table = np.array([position.get(id(cell.fill), -1) for cell in self.cells]
+                         + [-1], dtype=np.intp)
+        return table[self.locate(r)]
+
+
+def compile_geometry(geometry):
+    """
+    Compile a geometry for batched point location. The compiled form is
+    cached for the lifetime of the geometry object, so cells or regions
+    changed after the first call are not seen.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to compile
+
+    Returns
+    -------
+    CompiledGeometry
+        Compiled form of the geometry
+    """
+    compiled = _compiled.get(geometry)
+    if compiled is None:
+        compiled = CompiledGeometry(geometry)
+        _compiled[geometry] = compiled
+    return compiled
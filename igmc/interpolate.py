@@ -0,0 +1,152 @@
+from bisect import bisect_right
+
+import numpy as np
+
+# number of values per data point from which sorted values are located by
+# merging them with the data rather than by binary search
+MERGE_RATIO = 4
+
+
+def interpolate(x, y, e, out=None):
+    """
+    Linearly interpolate point-wise data at one or more values.
+
+    Values outside of the data range are held at the first and last
+    points. Repeated x values (discontinuities) are supported; a value
+    lying exactly on a repeated point takes the last of the repeated
+    y values.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Sorted x values of the data (contiguous float64 or float32)
+    y : numpy.ndarray
+        y values of the data (contiguous float64 or float32)
+    e : float or Iterable of float
+        Value(s) at which to interpolate
+    out : numpy.ndarray, optional
+        Array with the shape of `e` in which to place the result
+
+    Returns
+    -------
+    float or numpy.ndarray
+        Interpolated value(s)
+    """
+    if out is None and (isinstance(e, float) or np.ndim(e) == 0):
+        return _interpolate_scalar(x, y, float(e))
+
+    e = np.asarray(e, dtype=np.float64)
+    n = len(x)
+    if out is None:
+        out = np.empty(e.shape)
+
+    if n == 1:
+        out[...] = y[0]
+        return out
+
+    # index of the lower point of the interval containing each value
+    idx = np.searchsorted(x, _search_values(x, e), side='right')
+    idx -= 1
+    return _interpolate_intervals(x, y, e, idx, out)
+
+
+def interpolate_sorted(x, y, e, out=None):
+    """
+    Linearly interpolate point-wise data at sorted values, with the
+    same results as :func:`interpolate`.
+
+    Intervals are found with a merge of the values and the data points
+    when there are many more values than points, and with a binary
+    search of each value otherwise, which is faster for sorted values
+    as consecutive searches stay within the same part of the data.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Sorted x values of the data (contiguous float64 or float32)
+    y : numpy.ndarray
+        y values of the data (contiguous float64 or float32)
+    e : numpy.ndarray
+        Sorted values at which to interpolate
+    out : numpy.ndarray, optional
+        Array with the shape of `e` in which to place the result
+
+    Returns
+    -------
+    numpy.ndarray
+        Interpolated values
+    """
+    e = np.asarray(e, dtype=np.float64)
+    n = len(x)
+    if out is None:
+        out = np.empty(e.shape)
+
+    if n == 1:
+        out[...] = y[0]
+        return out
+
+    e_search = _search_values(x, e)
+    if len(e) < MERGE_RATIO * n:
+        idx = np.searchsorted(x, e_search, side='right')
+    else:
+        # number of points at or below each value, counted from the
+        # number of values below each point
+        below = np.searchsorted(e_search, x, side='left')
+        idx = np.bincount(below, minlength=len(e) + 1)[:len(e)].cumsum()
+    idx -= 1
+    return _interpolate_intervals(x, y, e, idx, out)
+
+
+def _search_values(x, e):
+    # searching reduced precision data with float64 values converts the
+    # data on every search. Values rounded down to the type of the data
+    # compare the same with every data point and are converted instead.
+    if x.dtype == e.dtype:
+        return e
+    e_low = e.astype(x.dtype)
+    np.nextafter(e_low, np.array(-np.inf, dtype=x.dtype), out=e_low,
+                 where=e_low > e)
+    return e_low
+
+
+def _interpolate_intervals(x, y, e, idx, out):
+    n = len(x)
+    np.clip(idx, 0, n - 2, out=idx)
+
+    # differences are taken in float64 for reduced precision data
+    x0 = x[idx]
+    dx = x[idx + 1].astype(np.float64, copy=False)
+    dx -= x0
+
+    # interpolation factor, limited to [0, 1] outside the data range
+    f = np.subtract(e, x0)
+    flat = dx == 0.0
+    np.divide(f, dx, out=f, where=~flat)
+    if flat.any():
+        np.copyto(f, np.greater_equal(e, x0), where=flat)
+    np.clip(f, 0.0, 1.0, out=f)
+
+    y0 = y[idx]
+    dy = y[idx + 1].astype(np.float64, copy=False)
+    dy -= y0
+    np.multiply(f, dy, out=out)
+    out += y0
+
+    return out
+
+
+def _interpolate_scalar(x, y, e):
+    x = memoryview(x)
+    y = memoryview(y)
+    n = len(x)
+
+    i = bisect_right(x, e) - 1
+    if i < 0:
+        return y[0]
+    if i >= n - 1:
+        return y[n - 1]
+
+    # x[i] <= e < x[i + 1] so the interval has non-zero width
+    x0 = x[i]
+    y0 = y[i]
+    return y0 + (e - x0) / (x[i + 1] - x0) * (y[i + 1] - y0)
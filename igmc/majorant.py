@@ -1,14 +1,152 @@
 from collections.abc import Iterable
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 from numbers import Real
+import hashlib
+import json
 import sys
+import warnings
 
-from .binary_search import binary_search
+from .interpolate import interpolate, interpolate_sorted
+from .providers import OpenMCProvider, atom_densities
 from . import checkvalue as cv
+from . import profiling
 
 import numpy as np
-import openmc
-from openmc.plotter import calculate_cexs
+
+# file type version of serialized majorants
+VERSION_MAJORANT = (1, 0)
+
+
+def _material_to_dict(material):
+    return {'id': material.id,
+            'name': material.name,
+            'temperature': material.temperature,
+            'density': material.density,
+            'density_units': material.density_units,
+            'nuclides': [[name, percent, percent_type]
+                         for name, percent, percent_type in material.nuclides]}
+
+
+def _material_from_dict(data):
+    import openmc
+
+    material = openmc.Material(name=data['name'],
+                               temperature=data['temperature'])
+    material.set_density(data['density_units'], data['density'])
+    for name, percent, percent_type in data['nuclides']:
+        material.add_nuclide(name, percent, percent_type)
+    return material
+
+
+def material_key(material):
+    """
+    Compute a hash of a material's composition. Materials with the same
+    nuclides, fractions and density have the same key and share a
+    majorant cross section.
+
+    Parameters
+    ----------
+    material : openmc.Material
+        Material to compute the key for
+
+    Returns
+    -------
+    str
+        Hexadecimal digest of the material composition
+    """
+    composition = sorted((name, float(percent), percent_type)
+                         for name, percent, percent_type in material.nuclides)
+    data = repr((composition, material.density_units, material.density))
+    return hashlib.sha1(data.encode()).hexdigest()
+
+
+def round_up(x, y, dtype=np.float32, others=()):
+    """
+    Round point-wise data to a lower precision such that the rounded data
+    bounds the original data from above everywhere.
+
+    Energies are rounded to the nearest value of `dtype`, merging points
+    that round to the same value. Values at the rounded energies start
+    from the largest of the original and other data, are raised wherever
+    a point of the original or other data lies above the rounded segment
+    containing it (e.g. points that were merged or shifted by rounding)
+    and are rounded toward +inf. Between consecutive original and rounded
+    points all data sets are linear, so the rounded data, interpolated in float64
+    arithmetic as by :func:`igmc.interpolate.interpolate`, is at least
+    the original data. Values are held beyond the end points.
+
+    Parameters
+    ----------
+    x : Iterable of float
+        Sorted x values of the data
+    y : Iterable of float
+        y values of the data
+    dtype : numpy.dtype
+        Floating point type of the rounded data
+    others : Iterable of tuple, optional
+        Sorted x values and y values of other data the rounded data
+        must also bound, which may include discontinuities
+
+    Returns
+    -------
+    x : numpy.ndarray
+        Rounded x values, strictly increasing
+    y : numpy.ndarray
+        Rounded y values
+    """
+    x = np.ascontiguousarray(x, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    x_out = np.unique(x.astype(dtype))
+    grid = x_out.astype(np.float64)
+    curves = [(x, y)] + [(np.ascontiguousarray(x_pts, dtype=np.float64),
+                          np.ascontiguousarray(y_pts, dtype=np.float64))
+                         for x_pts, y_pts in others]
+    values = interpolate_sorted(x, y, grid)
+    for x_pts, y_pts in curves[1:]:
+        np.maximum(values, interpolate_sorted(x_pts, y_pts, grid), out=values)
+    n = len(grid)
+
+    # excess of each point over the rounded segments, removed by raising
+    # the end of the segment nearer to the point, which carries at least
+    # half of its interpolation weight. Raising either end only raises
+    # the rounded data, so the largest raise of each value is applied.
+    raised = np.zeros(n)
+    for x_pts, y_pts in curves:
+        excess = y_pts - interpolate_sorted(grid, values, x_pts)
+        np.maximum(excess, 0.0, out=excess)
+        lower = np.clip(np.searchsorted(grid, x_pts, side='right') - 1,
+                        0, max(n - 2, 0))
+        weight = np.zeros_like(x_pts)
+        if n > 1:
+            weight = np.clip((x_pts - grid[lower]) /
+                             (grid[lower + 1] - grid[lower]), 0.0, 1.0)
+        nearer = np.where(weight > 0.5, lower + 1, lower)
+        np.maximum(weight, 1.0 - weight, out=weight)
+        np.maximum.at(raised, nearer, excess / weight)
+    values += raised
+
+    y_out = values.astype(dtype)
+    low = y_out < values
+    y_out[low] = np.nextafter(y_out[low], np.array(np.inf, dtype=dtype))
+    return x_out, y_out
+
+
+def _read_dataset(dset, path, mmap):
+    """
+    Read an HDF5 dataset, memory-mapping it when the data is stored
+    contiguously in the file
+    """
+    offset = dset.id.get_offset() if mmap else None
+    if offset is None:
+        return dset[()]
+    # HDF5 reports an explicit byte order ('<f8'), which memoryviews of the
+    # array cannot index; a native byte order is used where it matches
+    dtype = dset.dtype
+    if dtype.isnative:
+        dtype = dtype.newbyteorder('=')
+    return np.memmap(path, dtype=dtype, mode='r',
+                     offset=offset, shape=dset.shape)
+
 
 class data2D:
     """
@@ -24,9 +162,9 @@ class data2D:
 
     Attributes
     ----------
-    x_vals : Iterable of floats
+    x_vals : numpy.ndarray
         Interal storage of the data x values
-    y_vals : Iterable of floats
+    y_vals : numpy.ndarray
         Internal storage of the data y values
     idx : int
         Current index into the data. Used to track
@@ -34,11 +172,12 @@ class data2D:
     """
 
     def __init__(self, x_vals, y_vals):
-        cv.check_type('x_vals', x_vals, Iterable, Real)
-        cv.check_type('y_vals', y_vals, Iterable, Real)
-        assert(len(x_vals) == len(y_vals))
-        self.x_vals = x_vals
-        self.y_vals = y_vals
+        if cv.full_checks:
+            cv.check_type('x_vals', x_vals, Iterable, Real)
+            cv.check_type('y_vals', y_vals, Iterable, Real)
+            assert(len(x_vals) == len(y_vals))
+        self.x_vals = np.asarray(x_vals, dtype=np.float64)
+        self.y_vals = np.asarray(y_vals, dtype=np.float64)
         self.idx = 0
 
     def __iadd__(self, val):
@@ -49,12 +188,15 @@ class data2D:
         self.idx += val
         return self
 
+    def __len__(self):
+        return self.x_vals.size
+
     def complete(self):
         """
         Check to see if the index has gone
         beyond the size of the data.
         """
-        return self.idx >= len(self.x_vals)
+        return self.idx >= self.x_vals.size
 
     def __iter__(self):
         return self
@@ -67,13 +209,19 @@ class data2D:
         self.idx += 1
         return out
 
+    def _check_index(self, i):
+        if i >= self.x_vals.size:
+            raise IndexError("Cannot return value at index {} "
+                            "for data with size {}".format(i, self.x_vals.size))
+
     def get_x(self, i=None):
         """
         Return the x value for the current index
         """
         if i is None:
             i = self.idx
-        return self.get(i)[0]
+        self._check_index(i)
+        return self.x_vals[i]
 
     def get_y(self, i=None):
         """
@@ -81,7 +229,8 @@ class data2D:
         """
         if i is None:
             i = self.idx
-        return self.get(i)[1]
+        self._check_index(i)
+        return self.y_vals[i]
 
     def get(self, i=None):
         """
@@ -89,11 +238,7 @@ class data2D:
         """
         if i is None:
             i = self.idx
-
-        if i >= len(self.x_vals):
-            raise IndexError("Cannot return value at index {} "
-                            "for data with size {}".format(i, len(self.x_vals)))
-
+        self._check_index(i)
         return (self.x_vals[i], self.y_vals[i])
 
     def pop(self):
@@ -116,10 +261,10 @@ class data2D:
             X value to advance the internal index
             to.
         """
-        x = self.get()[0]
-        while(x <= x_val):
-            self += 1
-            x = self.get()[0]
+        self._check_index(self.idx)
+        if self.x_vals[self.idx] <= x_val:
+            self.idx += int(np.searchsorted(self.x_vals[self.idx:], x_val, side='right'))
+            self._check_index(self.idx)
 
     def prev(self):
         """
@@ -132,24 +277,48 @@ class Max2D:
     Storage of 2D data that can be updated, creating a new
     pointwise dataset representing the maximum of both datasets.
 
+    Data is held in contiguous float64 arrays, or float32 arrays for
+    majorants reduced with :meth:`Majorant.astype`.
+
     Attributes
     ----------
-    x_values : Iterable of floats
-        x data
-    y_values : Iterable of floats
-        y data
+    x_values : numpy.ndarray
+        x data (read-only view)
+    y_values : numpy.ndarray
+        y data (read-only view)
+    metadata : dict
+        Information recorded when the data was written to file (data
+        library fingerprint, materials, temperatures and verification)
+    verified : bool
+        Whether the data has been verified to bound a set of cross
+        sections (see :func:`igmc.verify.verify_majorant`). Reset when
+        the data is updated.
+    missed_intersections : int
+        Number of times merging found the other data above the current
+        segment and nearer in energy without finding their intersection
     """
     def __init__(self):
         self._x_values = None
         self._y_values = None
+        self.metadata = {}
+        self.verified = False
+        self.missed_intersections = 0
+
+    @staticmethod
+    def _readonly(vals):
+        if vals is None:
+            return None
+        view = vals.view()
+        view.flags.writeable = False
+        return view
 
     @property
     def x_values(self):
-        return self._x_values
+        return self._readonly(self._x_values)
 
     @property
     def y_values(self):
-        return self._y_values
+        return self._readonly(self._y_values)
 
     def __iter__(self):
         yield self.x_values
@@ -170,170 +339,182 @@ class Max2D:
         other_y : Iterable of float
             y values of the other dataset
         """
+        other_x = np.array(other_x, dtype=np.float64)
+        other_y = np.array(other_y, dtype=np.float64)
+        assert(other_x.shape == other_y.shape)
+        self.verified = False
+
         # early exit if there is no current data
         if self._x_values is None:
             self._x_values = other_x
             self._y_values = other_y
             return
 
-        xs_a = data2D(self._x_values, self._y_values)
-        xs_b = data2D(other_x, other_y)
-
-        # some variables to track xs information
-        current_xs = None
-        other_xs = None
+        # memoryviews provide fast scalar access to the array data
+        x_a = memoryview(np.ascontiguousarray(self._x_values, dtype=np.float64))
+        y_a = memoryview(np.ascontiguousarray(self._y_values, dtype=np.float64))
+        x_b = memoryview(other_x)
+        y_b = memoryview(other_y)
+        n_a = len(x_a)
+        n_b = len(x_b)
 
         # output values
-        xs_out = []
-        mask = [True]
-
-        # select the first point along the energy axis
-        if xs_a.get_x() < xs_b.get_x():
-            xs_out.append(xs_a.pop())
-            current_xs = xs_a
-            other_xs = xs_b
-        elif xs_a.get_x() > xs_b.get_x():
-            xs_out.append(xs_b.pop())
-            current_xs = xs_b
-            other_xs = xs_a
+        capacity = 2 * (n_a + n_b)
+        x_out = np.empty(capacity)
+        y_out = np.empty(capacity)
+        mask = np.empty(capacity, dtype=bool)
+        x_mv, y_mv, mask_mv = memoryview(x_out), memoryview(y_out), memoryview(mask)
+
+        # select the first point along the energy axis,
+        # choosing the larger xs value if the energies are the same
+        if x_a[0] < x_b[0] or (x_a[0] == x_b[0] and y_a[0] > y_b[0]):
+            a_is_current = True
         else:
-            # starting energy values are the same
-            # choose the larger xs vale
-            if xs_a.get_y() > xs_b.get_y():
-                xs_out.append(xs_a.pop())
-                current_xs = xs_a
-                other_xs = xs_b
-            else:
-                xs_out.append(xs_b.pop())
-                current_xs = xs_b
-                other_xs = xs_a
-
-        while(True):
-            # get next value for current
-            try:
-                current_next = current_xs.get()
-                other_next = other_xs.get()
-                last_pnt = xs_out[-1]
-            except IndexError:
-                break
+            a_is_current = False
 
-            above = self.is_above(last_pnt, current_next, other_next)
-            nearer = other_next[0] < current_next[0]
-
-            # for clarity
-            below = not above
-            farther = not nearer
+        if a_is_current:
+            cx, cy, cn, oxs, oys, on = x_a, y_a, n_a, x_b, y_b, n_b
+        else:
+            cx, cy, cn, oxs, oys, on = x_b, y_b, n_b, x_a, y_a, n_a
+        ci = 1
+        oi = 0
+
+        # last point in the output
+        lx = cx[0]
+        ly = cy[0]
+        x_mv[0] = lx
+        y_mv[0] = ly
+        mask_mv[0] = True
+        n = 1
+        misses = 0
+
+        while ci < cn and oi < on:
+            if n == capacity:
+                capacity *= 2
+                x_out = np.resize(x_out, capacity)
+                y_out = np.resize(y_out, capacity)
+                mask = np.resize(mask, capacity)
+                x_mv, y_mv, mask_mv = memoryview(x_out), memoryview(y_out), memoryview(mask)
+
+            # next values for current and other
+            cnx = cx[ci]
+            cny = cy[ci]
+            onx = oxs[oi]
+            ony = oys[oi]
+
+            above = self._above(lx, ly, cnx, cny, onx, ony)
+            nearer = onx < cnx
 
             # if the next point in the other cross section is
             # above our current value, check for an intersection
             if above:
-                p1 = last_pnt
-                p2 = current_next
-                p3 = other_xs.prev()
-                p4 = other_next
-
-                intersection = self.intersect_2d(p1, p2, p3, p4)
+                p = oi - 1 if oi > 0 else on - 1
+                intersection = self._intersect(lx, ly, cnx, cny,
+                                               oxs[p], oys[p], onx, ony)
 
-                mask.append(True)
+                mask_mv[n] = True
                 if intersection:
-                    xs_out.append(intersection)
+                    lx, ly = intersection
                     # switch the cross sections
                     # if there is an intersection
-                    temp = other_xs
-                    other_xs = current_xs
-                    current_xs = temp
+                    a_is_current = not a_is_current
+                    cx, cy, cn, oxs, oys, on = oxs, oys, on, cx, cy, cn
+                    ci, oi = oi, ci
                 else:
                     if nearer:
-                        print("Warning: No intersection found for above, nearer")
-                    xs_out.append(current_next)
+                        misses += 1
+                    lx, ly = cnx, cny
             # if the next point in the other cross section is
             # below our current value and nearer in energy than
             # the next point in our current cross section,
             # insert a point along the segment of our current
             # cross section
-            elif below and nearer:
-                # compute y value
-                m = (current_next[1] - last_pnt[1]) / (current_next[0] - last_pnt[0])
-                d = (other_next[0] - last_pnt[0])
-                xs_out.append((other_next[0], last_pnt[1] + d * m))
-                mask.append(False)
+            elif nearer:
+                m = (cny - ly) / (cnx - lx)
+                ly = ly + (onx - lx) * m
+                lx = onx
+                mask_mv[n] = False
             # if the next point in the other cross section is below
             # this segment and farther out, insert the next point
             # in the current cross section
-            elif below and farther:
-                xs_out.append(current_next)
-                mask.append(True)
+            else:
+                lx, ly = cnx, cny
+                mask_mv[n] = True
+            x_mv[n] = lx
+            y_mv[n] = ly
+            n += 1
+
             # advance the cross section indices past
             # the energy of the last value in the output
-            # cross section
-            try:
-                current_xs.advance(xs_out[-1][0])
-                other_xs.advance(xs_out[-1][0])
-            except:
+            # cross section. Both are advanced before stopping so
+            # that points of the other cross section at the last
+            # energy are not appended below the output.
+            while ci < cn and cx[ci] <= lx:
+                ci += 1
+            while oi < on and oxs[oi] <= lx:
+                oi += 1
+            if ci == cn:
                 break
 
-        # one or both of the cross sections should be complete
-        assert(xs_b.complete() or xs_a.complete())
+        i_a, i_b = (ci, oi) if a_is_current else (oi, ci)
+        self.missed_intersections += misses
 
-        energy = [pnt[0] for m, pnt in zip(mask, xs_out) if m]
-        xs = [pnt[1] for m, pnt in zip(mask, xs_out) if m]
+        # one or both of the cross sections should be complete
+        assert(i_a >= n_a or i_b >= n_b)
 
         # add any additional data
-        for pnt in xs_a:
-            energy.append(pnt[0])
-            xs.append(pnt[1])
-
-        for pnt in xs_b:
-            energy.append(pnt[0])
-            xs.append(pnt[1])
-
-        self._x_values = energy
-        self._y_values = xs
+        keep = mask[:n]
+        self._x_values = np.concatenate((x_out[:n][keep], x_a[i_a:], x_b[i_b:]))
+        self._y_values = np.concatenate((y_out[:n][keep], y_a[i_a:], y_b[i_b:]))
 
     def update_grid(self, fine_grid):
         """
         Update the current data using a new set of x-values
-        (new grid must be more refined than the previous grid)
+        (new grid must be more refined than the previous grid).
+        Values outside of the current x range are held at
+        the values of the first and last points.
 
         Parameters
         ----------
         fine_grid : Iterable of float
             x values of the new x grid
         """
-        assert(len(fine_grid) >= len(self.x_values))
-
-        y_new = np.full_like(fine_grid, 0.0)
+        fine_grid = np.asarray(fine_grid, dtype=np.float64)
+        assert(len(fine_grid) >= len(self._x_values))
+        self.verified = False
 
-        fine_idx = 0
-        x_idx = 0
-
-        while True:
-
-            if fine_idx >= len(fine_grid):
-                break
-
-            if x_idx >= len(self.x_values) - 2:
-                break
+        self._y_values = np.interp(fine_grid, self._x_values, self._y_values)
+        self._x_values = fine_grid
 
-            # current value we're calculating for
-            fine_e = fine_grid[fine_idx]
+    @staticmethod
+    def _above(x1, y1, x2, y2, x3, y3):
+        """
+        Scalar version of is_above
+        """
+        if x2 == x1:
+            return y3 > max(y1, y2)
+        return y1 + (y2 - y1) / (x2 - x1) * (x3 - x1) < y3
 
-            # make sure we're at the right place in the
-            # original data
-            while fine_e > self.x_values[x_idx + 1]:
-                x_idx += 1
+    @staticmethod
+    def _intersect(x1, y1, x2, y2, x3, y3, x4, y4):
+        """
+        Scalar version of intersect_2d
+        """
+        denominator = (x4 - x3) * (y1 - y2) - (x1 - x2) * (y4 - y3)
+        numerator = (y3 - y4) * (x1 - x3) + (x4 - x3) * (y1 - y3)
 
-            # calculate the cross section value for the fine grid point
-            m = (self.y_values[x_idx + 1] - self.y_values[x_idx]) / \
-                (self.x_values[x_idx + 1] - self.x_values[x_idx])
-            de = fine_e - self.x_values[x_idx]
-            val = self.y_values[x_idx] + m * de
-            y_new[fine_idx] = val
+        if denominator == 0.0:
+            return None
 
-            fine_idx += 1
+        t = numerator / denominator
 
-        self._x_values = fine_grid
-        self._y_values = y_new
+        if 0.0 <= t and t <= 1.0:
+            x = x1 + (x2 - x1) * t
+            if x2 == x1:
+                return x, y1 + (y2 - y1) * t
+            m = (y2 - y1) / (x2 - x1)
+            y = y1 + (x - x1) * m
+            return x, y
 
     @staticmethod
     def is_above(pnt1, pnt2, pnt3):
@@ -394,6 +575,104 @@ class Max2D:
             y = pnt1[1] + (x - pnt1[0]) * m
             return x, y
 
+    def to_file(self, path, materials=None, temperatures=None, provider=None):
+        """
+        Write the data to an HDF5 file. Arrays are stored contiguously
+        and uncompressed so that they can be memory-mapped on loading.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to write
+        materials : Iterable of openmc.Material, optional
+            Materials represented by the data
+        temperatures : dict, optional
+            Dictionary with nuclide names as keys and lists of
+            temperatures (K) as values
+        provider : XSProvider, optional
+            Provider of the cross sections the data was computed from.
+            Defaults to the OpenMC data library.
+        """
+        import h5py
+
+        with h5py.File(path, 'w') as f:
+            self._write_header(f, materials, temperatures, provider)
+            self._write_data(f)
+
+    def _write_header(self, f, materials=None, temperatures=None,
+                      provider=None):
+        if provider is None:
+            provider = OpenMCProvider()
+        if materials is not None:
+            materials = [_material_to_dict(m) for m in materials]
+        metadata = dict(self.metadata)
+        metadata.update({'library': provider.fingerprint(),
+                         'materials': materials,
+                         'temperatures': temperatures})
+
+        f.attrs['filetype'] = np.bytes_('majorant')
+        f.attrs['version'] = np.array(VERSION_MAJORANT)
+        f.attrs['class'] = np.bytes_(type(self).__name__)
+        f.attrs['metadata'] = np.bytes_(json.dumps(metadata))
+
+    def _write_data(self, f):
+        # reduced precision data keeps its type
+        f.create_dataset('energy', data=np.asarray(self.x_values))
+        f.create_dataset('values', data=np.asarray(self.y_values))
+
+    def _read_data(self, f, path, mmap):
+        self._x_values = _read_dataset(f['energy'], path, mmap)
+        self._y_values = _read_dataset(f['values'], path, mmap)
+
+    @classmethod
+    def from_file(cls, path, mmap=True, provider=None):
+        """
+        Load data written by :meth:`to_file`. A warning is issued if the
+        data was computed from different cross sections than those of
+        `provider`.
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to read
+        mmap : bool
+            Memory-map the arrays rather than reading them into memory
+        provider : XSProvider, optional
+            Provider of the cross sections in use. Defaults to the
+            OpenMC data library.
+
+        Returns
+        -------
+        Max2D
+            Instance of the class that wrote the file
+        """
+        import h5py
+
+        with h5py.File(path, 'r') as f:
+            cv.check_filetype_version(f, 'majorant', VERSION_MAJORANT[0])
+
+            class_name = f.attrs['class'].decode()
+            classes = {c.__name__: c for c in _subclasses(Max2D)}
+            klass = classes.get(class_name)
+            if klass is None or not issubclass(klass, cls):
+                raise IOError('{} does not contain a {} (found {})'.format(
+                    path, cls.__name__, class_name))
+
+            out = klass.__new__(klass)
+            Max2D.__init__(out)
+            out.metadata = json.loads(f.attrs['metadata'].decode())
+            out._read_data(f, path, mmap)
+
+        if provider is None:
+            provider = OpenMCProvider()
+        fingerprint = provider.fingerprint()
+        if out.metadata['library'] and fingerprint and \
+           out.metadata['library'] != fingerprint:
+            warnings.warn('{} was generated with a different cross section '
+                          'library than the current one'.format(path))
+
+        return out
+
     @classmethod
     def from_others(cls, others):
         """
@@ -418,6 +697,9 @@ class MicroMajorant(Max2D):
         Name of the nuclide in GND format
     temperatures : Iterable of float
         List of temperatures over which to compute the majorant
+    provider : XSProvider, optional
+        Provider of the nuclide cross sections. Defaults to the OpenMC
+        data library.
 
     Attributes
     ----------
@@ -425,25 +707,61 @@ class MicroMajorant(Max2D):
         Name of the nuclide
     temperatures : Iterable of float
         List of temperatures represented in the majorant
+    provider : XSProvider
+        Provider of the nuclide cross sections
     e_grid : Iterable of float
         Energy values of the pointwise data
     xs : Iterable of float
         Cross section values corresponding to the energy grid
     """
-    def __init__(self, nuclide, temperatures):
+    def __init__(self, nuclide, temperatures, provider=None):
         super().__init__()
         self._nuclide = nuclide
-        self._temperatures = temperatures
+        self._temperatures = []
+        self._provider = provider
 
+        self.add_temperatures(temperatures)
+
+    def add_temperatures(self, temperatures):
+        """
+        Extend the majorant to cover additional temperatures
+
+        Parameters
+        ----------
+        temperatures : Iterable of float
+            Temperatures to include in the majorant. Temperatures already
+            represented in the majorant are skipped.
+        """
         for temperature in temperatures:
-                e_grid, xs = calculate_cexs(nuclide, 'nuclide', ('total',), temperature=temperature)
-                xs.shape = (xs.size,)
+            if temperature in self._temperatures:
+                continue
+            with profiling.timer('majorant.load'):
+                e_grid, xs = self.provider.nuclide_xs(self.nuclide, temperature)
+            with profiling.timer('majorant.merge'):
                 self.update(e_grid, xs)
+            self._temperatures.append(temperature)
+
+    def _write_data(self, f):
+        super()._write_data(f)
+        f.attrs['nuclide'] = np.bytes_(self.nuclide)
+        f.attrs['temperatures'] = np.array(self.temperatures, dtype=float)
+
+    def _read_data(self, f, path, mmap):
+        super()._read_data(f, path, mmap)
+        self._nuclide = f.attrs['nuclide'].decode()
+        self._temperatures = f.attrs['temperatures'].tolist()
 
     @property
     def nuclide(self):
         return self._nuclide
 
+    @property
+    def provider(self):
+        # majorants loaded from a file have no provider until extended
+        if getattr(self, '_provider', None) is None:
+            self._provider = OpenMCProvider()
+        return self._provider
+
     @property
     def temperatures(self):
         return self._temperatures
@@ -457,10 +775,144 @@ class MicroMajorant(Max2D):
         return self._y_values
 
 
+def bracketing_temperatures(temperatures, t_min, t_max):
+    """
+    Select the library temperatures needed to bound cross sections
+    anywhere in the interval [t_min, t_max]. This includes the nearest
+    library temperature at or below t_min, the nearest at or above t_max
+    and every temperature in between. Intervals extending beyond the
+    library are bounded by the closest library temperature.
+
+    Parameters
+    ----------
+    temperatures : Iterable of float
+        Available library temperatures
+    t_min : float
+        Lower bound of the temperature interval
+    t_max : float
+        Upper bound of the temperature interval
+
+    Returns
+    -------
+    list of float
+        Sorted library temperatures bracketing the interval
+    """
+    cv.check_less_than('minimum temperature', t_min, t_max, equality=True)
+    temperatures = sorted(temperatures)
+
+    lower = max((t for t in temperatures if t <= t_min), default=temperatures[0])
+    upper = min((t for t in temperatures if t >= t_max), default=temperatures[-1])
+
+    return [t for t in temperatures if lower <= t <= upper]
+
+
+class TemperatureRangeMajorant(MicroMajorant):
+    """
+    Generates a majorant cross section for a nuclide that is valid for
+    any temperature in the interval [t_min, t_max].
+
+    The majorant is the envelope of the library temperatures bracketing
+    the interval. Cross sections interpolated linearly in temperature
+    between two library temperatures never exceed the larger of the two
+    at a given energy, so the envelope also bounds interpolated data.
+
+    Envelopes are cached by cross section data, nuclide and bracketing
+    library temperatures, so repeated constructions for the same or
+    slightly shifted intervals (e.g. between multiphysics iterations)
+    reuse the previous result. The cache is shared by all instances and
+    keeps the :attr:`cache_size` most recently used envelopes as
+    read-only arrays. It is emptied by :meth:`clear_cache`.
+
+    Parameters
+    ----------
+    nuclide : str
+        Name of the nuclide in GND format
+    t_min : float
+        Lower bound of the temperature interval (K)
+    t_max : float
+        Upper bound of the temperature interval (K)
+    library_temps : Iterable of float, optional
+        Temperatures available in the cross section library. Taken from
+        the provider if not provided.
+    provider : XSProvider, optional
+        Provider of the nuclide cross sections. Defaults to the OpenMC
+        data library.
+
+    Attributes
+    ----------
+    t_min : float
+        Lower bound of the temperature interval (K)
+    t_max : float
+        Upper bound of the temperature interval (K)
+    temperatures : list of float
+        Library temperatures represented in the majorant
+    cache_size : int
+        Maximum number of envelopes kept in the cache
+    """
+
+    cache_size = 256
+    _cache = OrderedDict()
+
+    def __init__(self, nuclide, t_min, t_max, library_temps=None,
+                 provider=None):
+        super().__init__(nuclide, [], provider)
+        self._t_min = t_min
+        self._t_max = t_max
+
+        if library_temps is None:
+            library_temps = self.provider.temperatures(nuclide)
+        temperatures = bracketing_temperatures(library_temps, t_min, t_max)
+
+        key = (self.provider.fingerprint(), nuclide, tuple(temperatures))
+        cached = self._cache.get(key)
+        if cached is None:
+            self.add_temperatures(temperatures)
+            # instances share the cached arrays
+            cached = (np.asarray(self._x_values), np.asarray(self._y_values))
+            for values in cached:
+                values.flags.writeable = False
+            self._cache[key] = cached
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+            self._temperatures = list(temperatures)
+        self._x_values, self._y_values = cached
+
+    @property
+    def t_min(self):
+        return self._t_min
+
+    @property
+    def t_max(self):
+        return self._t_max
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Remove all cached temperature envelopes
+        """
+        cls._cache.clear()
+
+
 class MaterialMajorant(Max2D):
     """
     Majorant cross section for a material
 
+    The cross section is the sum of the nuclide majorants weighted by
+    the nuclide atom densities (atom/b-cm) OpenMC computes for the
+    material, which account for weight percents. These are the densities
+    material cross sections are evaluated with, so the majorant bounds
+    them.
+
+    Number densities of the material's nuclides are computed once and
+    evaluated cross sections are cached per energy grid. Only read-only
+    numpy arrays (e.g. a builder's common grid) are cached, identified
+    by object; other grids are evaluated on every call. Cached values
+    are discarded when the material or the nuclide majorants are set,
+    and by :meth:`clear_cache`, which must be called after modifying
+    the material in place.
+
     Parameters
     ----------
     material : openmc.Material
@@ -471,30 +923,80 @@ class MaterialMajorant(Max2D):
 
     Attributes
     ----------
+    material : openmc.Material
+        Material definition used to generate the majorant
     nuclide_majorants : defaultdict
         Dictionary with nuclide names as keys and MicroMajorant
         instances as values
     e_grid : Iterable of float
         Energy values of the pointwise data
-    xs : Iterable of float
-        Cross section values corresponding to the energy grid
+    number_densities : dict
+        Dictionary with nuclide names as keys and atom densities
+        (atom/b-cm) as values
+    cache_size : int
+        Maximum number of energy grids for which evaluated cross
+        sections are kept
     """
+
+    cache_size = 8
+
     def __init__(self, material, nuclide_majorants=None):
         super().__init__()
-        cv.check_type('material', material, openmc.Material)
-        self._material = material
         self._nuc_majorants = None
         self._e_grid = None
+        self.material = material
 
         if nuclide_majorants:
-            cv.check_type('nuclide majorants', nuclide_majorants, defaultdict)
-            self._nuc_majorants = nuclide_majorants
-            self._e_grid = list(nuclide_majorants.values())[0].e_grid
+            self.nuclide_majorants = nuclide_majorants
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_densities'] = None
+        state['_xs_cache'] = OrderedDict()
+        return state
+
+    def _write_data(self, f):
+        f.attrs['material'] = np.bytes_(json.dumps(_material_to_dict(self.material)))
+        if self.nuclide_majorants is None:
+            return
+        f.create_dataset('energy', data=np.asarray(self.e_grid, dtype=float))
+        nuclides = f.create_group('nuclides')
+        for name, majorant in self.nuclide_majorants.items():
+            group = nuclides.create_group(name)
+            group.create_dataset('values', data=np.asarray(majorant.xs, dtype=float))
+            group.attrs['temperatures'] = np.array(majorant.temperatures, dtype=float)
+
+    def _read_data(self, f, path, mmap):
+        self._nuc_majorants = None
+        self._e_grid = None
+        self.material = _material_from_dict(json.loads(f.attrs['material'].decode()))
+        if 'nuclides' not in f:
+            return
+
+        e_grid = _read_dataset(f['energy'], path, mmap)
+        nuclide_majorants = defaultdict(MicroMajorant)
+        for name, group in f['nuclides'].items():
+            majorant = MicroMajorant.__new__(MicroMajorant)
+            Max2D.__init__(majorant)
+            majorant._nuclide = name
+            majorant._temperatures = group.attrs['temperatures'].tolist()
+            majorant._x_values = e_grid
+            majorant._y_values = _read_dataset(group['values'], path, mmap)
+            nuclide_majorants[name] = majorant
+        self.nuclide_majorants = nuclide_majorants
 
     @property
     def material(self):
         return self._material
 
+    @material.setter
+    def material(self, material):
+        import openmc
+
+        cv.check_type('material', material, openmc.Material)
+        self._material = material
+        self.clear_cache()
+
     @property
     def nuclide_majorants(self):
         return self._nuc_majorants
@@ -504,52 +1006,153 @@ class MaterialMajorant(Max2D):
         cv.check_type('new_majorants', new_majorants, defaultdict)
         self._nuc_majorants = new_majorants
         self._e_grid = list(new_majorants.values())[0].e_grid
+        self.clear_cache()
 
     @property
     def e_grid(self):
         return self._e_grid
 
+    @property
+    def number_densities(self):
+        if self._densities is None:
+            self._densities = atom_densities(self.material)
+        return self._densities
+
+    def clear_cache(self):
+        """
+        Discard the number densities and evaluated cross sections
+        """
+        self._densities = None
+        self._xs_cache = OrderedDict()
+
+    @staticmethod
+    def _grid_key(e_grid):
+        # only grids that cannot change are identified, by object; hashing
+        # the content of other grids costs about as much as evaluating
+        if isinstance(e_grid, np.ndarray) and not e_grid.flags.writeable:
+            return (id(e_grid), e_grid.shape)
+        return None
+
     def xs(self, e_grid):
         """
         Compute the cross section value of the majorant xs for
         the material at this energy
-        """
-        barns_to_cm_sq = 10e-24
 
-        awr_inv = 1.0 / self.material.average_molar_mass # mol / g
-
-        av = openmc.data.AVOGADRO
+        Parameters
+        ----------
+        e_grid : Iterable of float
+            Energy values (eV)
 
-        density = self.material.density
+        Returns
+        -------
+        numpy.ndarray
+            Read-only majorant cross section values on the energy grid,
+            cached if the grid is a read-only array
+        """
+        densities = self.number_densities
+
+        key = self._grid_key(e_grid)
+        entry = self._xs_cache.get(key) if key is not None else None
+        if entry is not None:
+            self._xs_cache.move_to_end(key)
+            return entry[1]
+
+        e_vals = np.asarray(e_grid, dtype=np.float64)
+        on_grid = self.e_grid is not None and \
+            (e_vals is self.e_grid or np.array_equal(e_vals, self.e_grid))
+
+        xs_out = np.zeros_like(e_vals)
+        buffer = np.empty_like(e_vals)
+        for nuclide, density in densities.items():
+            majorant = self.nuclide_majorants[nuclide]
+            if on_grid:
+                nuc_xs = majorant.y_values
+            else:
+                nuc_xs = interpolate(majorant.x_values, majorant.y_values,
+                                     e_vals, out=buffer)
+            xs_out += np.multiply(nuc_xs, density, out=buffer)
+        xs_out.flags.writeable = False
+        if key is None:
+            return xs_out
+
+        # holding on to the grid keeps its id from being reused
+        self._xs_cache[key] = (e_grid, xs_out)
+        if len(self._xs_cache) > self.cache_size:
+            self._xs_cache.popitem(last=False)
 
-        atom_density = awr_inv * av * density * barns_to_cm_sq
+        return xs_out
 
-        xs_out = np.zeros_like(e_grid)
+class Majorant(Max2D):
 
-        for nuclide, percent, _percent_type in self.material.nuclides:
-            xs_out += percent * atom_density * self.nuclide_majorants[nuclide].y_values
+    def calculate_xs(self, e, out=None, assume_sorted=False):
+        """
+        Compute the majorant cross section at the specified energy value(s)
 
-        return xs_out
+        Parameters
+        ----------
+        e : float or Iterable of float
+            Energy value(s) (eV)
+        out : numpy.ndarray, optional
+            Array with the shape of `e` in which to place the result
+        assume_sorted : bool
+            Whether the energy values are a sorted array, which allows a
+            faster lookup (see :func:`interpolate_sorted`)
 
-class Majorant(Max2D):
+        Returns
+        -------
+        float or numpy.ndarray
+            Majorant cross section value(s)
+        """
+        if assume_sorted:
+            return interpolate_sorted(self._x_values, self._y_values, e, out)
+        return interpolate(self._x_values, self._y_values, e, out)
 
-    def calculate_xs(self, e):
-        # determine energy values to interpolate between
-        idx = binary_search(self.x_values, e)
+    def astype(self, dtype, tables=()):
+        """
+        Copy of the majorant stored with another precision, e.g.
+        np.float32 to halve the memory and cache traffic of lookups.
 
-        # calculate interpolation factor
-        f = e - self.x_values[idx]
-        f /= self.x_values[idx + 1] - self.x_values[idx]
+        Reduced precision data is rounded with :func:`round_up` so that
+        it still bounds the majorant everywhere. Lookups gather the
+        reduced precision values and interpolate them in float64.
 
-        xs = f * self.y_values[idx] + (1 - f) * self.y_values[idx + 1]
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            Floating point type of the data
+        tables : Iterable of CEXS, optional
+            Material cross sections the copy must also bound, e.g. tables
+            themselves reduced with :meth:`igmc.xs.CEXS.astype`, whose
+            rounded energies and values may lie above the majorant
 
-        return xs
+        Returns
+        -------
+        Majorant
+            Majorant with data of type `dtype`. Unverified, see
+            :func:`igmc.verify.verify_majorant`.
+        """
+        out = type(self)()
+        out.metadata = {key: value for key, value in self.metadata.items()
+                        if key != 'verification'}
+        out._x_values, out._y_values = round_up(
+            self._x_values, self._y_values, dtype,
+            [(table.e_grid, table.xs_vals) for table in tables])
+        return out
 
     @classmethod
     def from_others(cls, energy_grid, other_majorants):
         # majorant = Majorant.from_others(cross_sections)
         majorant = cls()
         for other in other_majorants:
-            majorant.update(energy_grid, other.xs(energy_grid))
+            xs = other.xs(energy_grid)
+            with profiling.timer('majorant.merge'):
+                majorant.update(energy_grid, xs)
 
         return majorant
+
+
+def _subclasses(cls):
+    out = [cls]
+    for subclass in cls.__subclasses__():
+        out += _subclasses(subclass)
+    return out
@@ -1,12 +1,18 @@
 from collections import defaultdict
+import copy
+from numbers import Integral
 import sys
 
 import numpy as np
-import openmc
-from openmc.plotter import calculate_cexs
-from matplotlib import pyplot as plt
 
-from .majorant import Majorant, MicroMajorant, MaterialMajorant
+from .majorant import Majorant, MicroMajorant, MaterialMajorant, material_key
+from . import checkvalue as cv
+from . import profiling
+
+# approximate working memory (bytes) per energy point of a window: the
+# window's union grid, a material cross section, interpolation buffers
+# and the arrays of the envelope merge
+WINDOW_BYTES_PER_POINT = 160
 
 def setup_energy_grid(nuclides):
     """
@@ -21,28 +27,148 @@ def setup_energy_grid(nuclides):
     # get the energy grid for each nuclide
     for nuclide in nuclides.values():
         if e_grid_out is None:
-            e_grid_out = nuclide.e_grid
+            e_grid_out = np.asarray(nuclide.e_grid)
         else:
             e_grid_out = np.unique(np.concatenate((e_grid_out, nuclide.e_grid)))
 
     return e_grid_out
 
-def majorants_from_model(model):
+def energy_windows(grids, max_points):
+    """
+    Split the energy range of several grids into windows holding a
+    bounded number of grid points
+
+    Parameters
+    ----------
+    grids : Iterable of numpy.ndarray
+        Sorted energy grids
+    max_points : int
+        Maximum number of points of all grids together (counting points
+        shared by several grids once per grid) in a window
+
+    Returns
+    -------
+    numpy.ndarray
+        Window boundaries, from the lowest to the highest energy of the
+        grids. Window i spans [bounds[i], bounds[i + 1]], so adjacent
+        windows share the grid point at their boundary.
+    """
+    grids = [np.asarray(grid, dtype=np.float64) for grid in grids]
+    e_min = min(grid[0] for grid in grids)
+    e_max = max(grid[-1] for grid in grids)
+
+    # candidate boundaries every `stride` points of each grid, so that no
+    # more than len(grids) * stride points lie between two candidates
+    stride = max(1, max_points // (2 * len(grids)))
+    candidates = np.unique(np.concatenate(
+        [grid[::stride] for grid in grids] + [[e_min, e_max]]))
+    if len(candidates) == 1:
+        return np.array([e_min, e_max])
+
+    # points below or at each candidate, and strictly below it
+    below = sum(np.searchsorted(grid, candidates, 'right') for grid in grids)
+    before = sum(np.searchsorted(grid, candidates, 'left') for grid in grids)
+
+    bounds = [0]
+    while bounds[-1] < len(candidates) - 1:
+        start = bounds[-1]
+        end = np.searchsorted(below, before[start] + max_points, 'right') - 1
+        if end <= start:
+            raise ValueError('A window of {} points cannot hold the grid '
+                             'points near {} eV'.format(max_points,
+                                                        candidates[start]))
+        bounds.append(end)
+    return candidates[bounds]
+
+
+def _window_slice(x, y, e_low, e_high):
+    """
+    Points of a curve in [e_low, e_high] and the points bracketing them,
+    which interpolate exactly as the whole curve in the window
+    """
+    start = np.searchsorted(x, e_low, 'left')
+    end = np.searchsorted(x, e_high, 'right')
+    inner = x[start:end]
+    start = min(max(start - 1, 0), len(x) - 1)
+    end = max(end + 1, start + 1)
+    return inner, x[start:end], y[start:end]
+
+
+class _WindowOutput:
+    """
+    Envelope assembled window by window, in memory or appended to a
+    majorant file. The last point of each window is held back and merged
+    with the first point of the next window at the shared boundary.
+    """
+
+    def __init__(self, f=None):
+        self._f = f
+        self._pieces = []
+        self._last = None
+        if f is not None:
+            for name in ('energy', 'values'):
+                f.create_dataset(name, shape=(0,), maxshape=(None,),
+                                 dtype=float, chunks=True)
+
+    def append(self, x, y):
+        x = np.asarray(x)
+        y = np.array(y)
+        if self._last is not None:
+            if x[0] == self._last[0]:
+                y[0] = max(y[0], self._last[1])
+            else:
+                x = np.concatenate(([self._last[0]], x))
+                y = np.concatenate(([self._last[1]], y))
+        self._write(x[:-1], y[:-1])
+        self._last = (x[-1], y[-1])
+
+    def _write(self, x, y):
+        if self._f is None:
+            self._pieces.append((x, y))
+            return
+        n = self._f['energy'].shape[0]
+        for name, values in (('energy', x), ('values', y)):
+            dset = self._f[name]
+            dset.resize((n + len(values),))
+            dset[n:] = values
+
+    def close(self):
+        if self._last is not None:
+            self._write(np.array([self._last[0]]), np.array([self._last[1]]))
+            self._last = None
+        if self._f is None:
+            x = np.concatenate([x for x, _ in self._pieces])
+            y = np.concatenate([y for _, y in self._pieces])
+            self._pieces = []
+            return x, y
+
+
+def majorants_from_model(model, provider=None):
     """
     Calculate the macroscopic majorant from materials on an OpenMC model
 
     model : openmc.Model instance
+    provider : XSProvider, optional
     """
-    return majorants_from_geometry(model.geometry)
+    return majorants_from_geometry(model.geometry, provider)
 
-def majorants_from_geometry(geom):
+def material_temperatures(geom):
     """
-    Calculate the macroscopic majorant for a set of materials
+    Collect the temperatures of each material in a geometry from
+    the cells they fill and the materials themselves
 
-    geom : openmc.Geometry instance
-    """
+    Parameters
+    ----------
+    geom : openmc.Geometry
+        Geometry to collect temperatures from
 
-    # get all the nuclides and their temperatures
+    Returns
+    -------
+    defaultdict of set
+        Dictionary with materials as keys and sets of temperatures as
+        values. Unset temperatures are represented by None.
+    """
+    import openmc
 
     material_temps = defaultdict(set)
 
@@ -51,48 +177,371 @@ def majorants_from_geometry(geom):
         if isinstance(cell.fill, openmc.Material):
             material_temps[cell.fill].add(cell.temperature)
 
-    materials = list(geom.get_all_materials().values())
-
     # and all temperatures set on materials
-    [material_temps[mat].add(mat.temperature) for mat in materials]
+    for mat in geom.get_all_materials().values():
+        material_temps[mat].add(mat.temperature)
 
-    nuclides = defaultdict(set)
-    for material in materials:
-        for name, _, _ in material.nuclides:
-            nuclides[name] = material_temps[material]
+    return material_temps
 
-    default_temperature = 294 # K
-    for temps in nuclides.values():
-        if None in temps:
-            temps.add(default_temperature)
-            temps.discard(None)
 
-    # compute majorants for all nuclide temperatures
-    nuclide_majorants = defaultdict(MicroMajorant)
-    for nuclide, temperatures in nuclides.items():
-        print("Computing majorant for {}...".format(nuclide))
-        m = MicroMajorant(nuclide, temperatures)
-        nuclide_majorants[nuclide] = m
+class MajorantBuilder:
+    """
+    Builds and maintains the majorant cross sections for a set of
+    materials. Materials with identical compositions share a single
+    material majorant and the temperatures required for each nuclide
+    are the union of the temperatures of every material containing it.
+
+    Changes to the set of materials, or to a material's composition
+    or temperature, are applied incrementally: only the nuclides whose
+    temperature requirements changed are recomputed from nuclear data and
+    only the affected material contributions are re-evaluated before the
+    global envelope is merged again.
 
-    # setup the common energy grid
-    print("Computing common energy grid...")
-    common_e_grid = setup_energy_grid(nuclide_majorants)
-    print("Energy grid size: {}".format(common_e_grid.size))
-    print("Energy grid min (eV): {}".format(common_e_grid[0]))
-    print("Energy grid max (eV): {}".format(common_e_grid[-1]))
+    Parameters
+    ----------
+    materials : Iterable of openmc.Material, optional
+        Materials to include in the majorant
+    default_temperature : float
+        Temperature (K) used when no temperature is set on a material
+        or the cells it fills
+    provider : XSProvider, optional
+        Provider of the nuclide cross sections. Defaults to the OpenMC
+        data library.
+
+    Attributes
+    ----------
+    materials : list of openmc.Material
+        Materials represented in the majorant
+    e_grid : numpy.ndarray
+        Common energy grid of the nuclide majorants
+    nuclide_majorants : defaultdict
+        Dictionary with nuclide names as keys and MicroMajorant
+        instances on the common energy grid as values
+    material_majorants : list of MaterialMajorant
+        Majorant for each unique material composition
+    majorant : Majorant
+        Majorant cross section over all materials
+    """
 
-    for nuclide_majorant in nuclide_majorants.values():
-        print("Evaluating {} on the common energy grid...".format(nuclide_majorant.nuclide))
-        nuclide_majorant.update_grid(common_e_grid)
+    def __init__(self, materials=None, default_temperature=294, provider=None):
+        self.default_temperature = default_temperature
+        self.provider = provider
+
+        # material -> temperatures set on cells filled by the material
+        self._materials = {}
+        # nuclide -> MicroMajorant on the nuclide's own energy grid
+        self._raw_majorants = {}
+        # nuclide -> MicroMajorant on the common energy grid
+        self._nuc_majorants = defaultdict(MicroMajorant)
+        # composition key -> MaterialMajorant, xs on common energy grid
+        self._mat_majorants = {}
+        self._mat_xs = {}
+
+        self._e_grid = None
+        self._majorant = None
+        self._stale = False
+        self._regrid = False
+
+        if materials is not None:
+            for material in materials:
+                self.add_material(material)
+
+    @classmethod
+    def from_geometry(cls, geom, default_temperature=294, provider=None):
+        """
+        Create a builder for all materials in a geometry
+
+        Parameters
+        ----------
+        geom : openmc.Geometry
+            Geometry containing the materials
+        default_temperature : float
+            Temperature (K) used when no temperature is set
+        provider : XSProvider, optional
+            Provider of the nuclide cross sections
+        """
+        builder = cls(default_temperature=default_temperature,
+                      provider=provider)
+        for material, temps in material_temperatures(geom).items():
+            builder.add_material(material, temps)
+        return builder
+
+    @property
+    def materials(self):
+        return list(self._materials)
+
+    @property
+    def e_grid(self):
+        self._build()
+        return self._e_grid
+
+    @property
+    def nuclide_majorants(self):
+        self._build()
+        return self._nuc_majorants
+
+    @property
+    def material_majorants(self):
+        self._build()
+        return list(self._mat_majorants.values())
+
+    @property
+    def majorant(self):
+        self._build()
+        if self._majorant is None:
+            self._majorant = Majorant()
+            with profiling.timer('majorant.merge'):
+                for xs in self._mat_xs.values():
+                    self._majorant.update(self._e_grid, xs)
+        return self._majorant
+
+    def add_material(self, material, temperatures=None):
+        """
+        Add a material to the majorant
+
+        Parameters
+        ----------
+        material : openmc.Material
+            Material to add
+        temperatures : Iterable of float, optional
+            Temperatures of the cells filled by the material. The
+            material's own temperature is always included.
+        """
+        import openmc
+
+        cv.check_type('material', material, openmc.Material)
+        self._materials[material] = set(temperatures) if temperatures else set()
+        self._stale = True
+
+    def update_material(self, material, temperatures=None):
+        """
+        Apply changes to a material's composition, density or temperature
+
+        Parameters
+        ----------
+        material : openmc.Material
+            Material that has been modified
+        temperatures : Iterable of float, optional
+            New temperatures of the cells filled by the material. If None,
+            the previously provided cell temperatures are kept.
+        """
+        if material not in self._materials:
+            raise ValueError('Material {} is not part of the '
+                             'majorant'.format(material.name))
+        if temperatures is not None:
+            self._materials[material] = set(temperatures)
+        self._stale = True
+
+    def remove_material(self, material):
+        """
+        Remove a material from the majorant
+
+        Parameters
+        ----------
+        material : openmc.Material
+            Material to remove
+        """
+        del self._materials[material]
+        self._stale = True
+
+    def _material_temps(self, material):
+        temps = self._materials[material] | {material.temperature}
+        if None in temps:
+            temps.discard(None)
+            temps.add(self.default_temperature)
+        return temps
+
+    def _nuclide_temps(self):
+        nuclides = defaultdict(set)
+        for material in self._materials:
+            temps = self._material_temps(material)
+            for name, _, _ in material.nuclides:
+                nuclides[name] |= temps
+        return nuclides
+
+    def _update_nuclides(self):
+        # compute majorants for any nuclides with new temperature requirements
+        nuclides = self._nuclide_temps()
+        regrid = set(self._raw_majorants) != set(nuclides)
+        for nuclide, temperatures in nuclides.items():
+            raw = self._raw_majorants.get(nuclide)
+            if raw is not None and temperatures == set(raw.temperatures):
+                continue
+            if raw is not None and temperatures > set(raw.temperatures):
+                print("Extending majorant for {}...".format(nuclide))
+                raw.add_temperatures(sorted(temperatures))
+            else:
+                print("Computing majorant for {}...".format(nuclide))
+                self._raw_majorants[nuclide] = MicroMajorant(
+                    nuclide, sorted(temperatures), self.provider)
+            regrid = True
+
+        for nuclide in set(self._raw_majorants) - set(nuclides):
+            del self._raw_majorants[nuclide]
+
+        # the common grid is recomputed at the next build
+        self._regrid = self._regrid or regrid
+
+    def _material_keys(self):
+        keys = {}
+        for material in self._materials:
+            keys.setdefault(material_key(material), material)
+        return keys
+
+    def _build(self):
+        if not self._stale:
+            return
+
+        self._update_nuclides()
+        if self._regrid:
+            # setup the common energy grid
+            print("Computing common energy grid...")
+            with profiling.timer('majorant.union_grid'):
+                self._e_grid = setup_energy_grid(self._raw_majorants)
+            self._e_grid.flags.writeable = False
+            print("Energy grid size: {}".format(self._e_grid.size))
+            print("Energy grid min (eV): {}".format(self._e_grid[0]))
+            print("Energy grid max (eV): {}".format(self._e_grid[-1]))
+
+            self._nuc_majorants = defaultdict(MicroMajorant)
+            for nuclide, raw in self._raw_majorants.items():
+                print("Evaluating {} on the common energy grid...".format(nuclide))
+                nuclide_majorant = copy.copy(raw)
+                with profiling.timer('majorant.regrid'):
+                    nuclide_majorant.update_grid(self._e_grid)
+                self._nuc_majorants[nuclide] = nuclide_majorant
+
+            self._mat_majorants.clear()
+            self._mat_xs.clear()
+            self._regrid = False
+
+        # calculate the majorant cross section for each unique material
+        # composition on the common energy grid
+        keys = self._material_keys()
+
+        for key in set(self._mat_majorants) - set(keys):
+            del self._mat_majorants[key]
+            del self._mat_xs[key]
+
+        for key, material in keys.items():
+            # a material representing a key may have been modified in
+            # place, with another material now holding the composition
+            mat_majorant = self._mat_majorants.get(key)
+            if mat_majorant is not None and mat_majorant.material is material:
+                continue
+            mat_majorant = MaterialMajorant(material, self._nuc_majorants)
+            self._mat_majorants[key] = mat_majorant
+            with profiling.timer('majorant.material_xs'):
+                self._mat_xs[key] = mat_majorant.xs(self._e_grid)
+
+        self._majorant = None
+        self._stale = False
+
+    def windowed_majorant(self, max_memory, path=None):
+        """
+        Compute the majorant over all materials one energy window at a
+        time, without the common energy grid of all nuclides.
+
+        The energy axis is split into windows (see :func:`energy_windows`)
+        sized so that the working memory of a window stays within
+        `max_memory`. For each window the nuclide majorants are sliced,
+        their union grid is built, the material cross sections are
+        evaluated on it and merged into the envelope, which is appended
+        to the output. Adjacent windows share the grid point at their
+        boundary, which is written once. Within a window the values are
+        the same as on the common grid, so the result matches
+        :attr:`majorant` up to rounding in the envelope merge.
+
+        The nuclide majorants on their own grids and the output are not
+        included in `max_memory`; writing the output to `path` keeps it
+        out of memory during the construction.
+
+        Parameters
+        ----------
+        max_memory : int
+            Approximate bound on the working memory (bytes) of a window
+        path : str, optional
+            Majorant file (see :meth:`Max2D.to_file`) the envelope is
+            appended to window by window
+
+        Returns
+        -------
+        Majorant
+            Majorant over all materials. Read from `path` if given.
+        """
+        cv.check_type('max_memory', max_memory, Integral)
+        cv.check_greater_than('max_memory', max_memory, 0)
+
+        self._update_nuclides()
+        curves = {name: (np.asarray(raw.x_values), np.asarray(raw.y_values))
+                  for name, raw in self._raw_majorants.items()}
+        densities = [MaterialMajorant(material).number_densities
+                     for material in self._material_keys().values()]
+
+        bounds = energy_windows([x for x, _ in curves.values()],
+                                max_memory // WINDOW_BYTES_PER_POINT)
+        print("Computing majorant in {} energy windows...".format(
+            len(bounds) - 1))
+
+        f = None
+        if path is not None:
+            import h5py
+            f = h5py.File(path, 'w')
+            temperatures = {name: sorted(raw.temperatures)
+                            for name, raw in self._raw_majorants.items()}
+            Majorant()._write_header(f, self.materials, temperatures,
+                                     self.provider)
+        try:
+            output = _WindowOutput(f)
+            for e_low, e_high in zip(bounds[:-1], bounds[1:]):
+                pieces = {name: _window_slice(x, y, e_low, e_high)
+                          for name, (x, y) in curves.items()}
+                with profiling.timer('majorant.union_grid'):
+                    e_grid = np.unique(np.concatenate(
+                        [inner for inner, _, _ in pieces.values()]))
+
+                # nuclide values are those on the common grid, summed in
+                # the same order as MaterialMajorant.xs
+                envelope = Majorant()
+                buffer = np.empty_like(e_grid)
+                for density in densities:
+                    with profiling.timer('majorant.material_xs'):
+                        xs = np.zeros_like(e_grid)
+                        for name, value in density.items():
+                            _, x, y = pieces[name]
+                            nuc_xs = np.interp(e_grid, x, y)
+                            xs += np.multiply(nuc_xs, value, out=buffer)
+                    with profiling.timer('majorant.merge'):
+                        envelope.update(e_grid, xs)
+                output.append(envelope.x_values, envelope.y_values)
+            values = output.close()
+        finally:
+            if f is not None:
+                f.close()
+
+        if path is not None:
+            return Majorant.from_file(path, provider=self.provider)
+        majorant = Majorant()
+        majorant._x_values, majorant._y_values = values
+        return majorant
+
+
+def majorants_from_geometry(geom, provider=None):
+    """
+    Calculate the macroscopic majorant for a set of materials
 
-    # calculate the majorant cross section for each material on the common energy grid
-    material_majorants = []
-    for material in materials:
-        material_majorants.append(MaterialMajorant(material, nuclide_majorants))
+    geom : openmc.Geometry instance
+    provider : XSProvider, optional
+        Provider of the nuclide cross sections. Defaults to the OpenMC
+        data library.
 
-    return common_e_grid, material_majorants
+    Returns the common energy grid and a MaterialMajorant for
+    each unique material composition in the geometry.
+    """
+    builder = MajorantBuilder.from_geometry(geom, provider=provider)
+    return builder.e_grid, builder.material_majorants
 
-def majorant_from_geometry(geom):
+def majorant_from_geometry(geom, provider=None, max_memory=None, path=None):
     """
     Compute the majorant for a given geometry
 
@@ -100,16 +549,32 @@ def majorant_from_geometry(geom):
     ----------
     geom : openmc.Geometry
         Geometry for which the majorant is computed
+    provider : XSProvider, optional
+        Provider of the nuclide cross sections
+    max_memory : int, optional
+        If set, the majorant is computed in energy windows whose working
+        memory (bytes) stays approximately within this bound (see
+        :meth:`MajorantBuilder.windowed_majorant`)
+    path : str, optional
+        Majorant file the majorant is written to
 
     Returns
     -------
         Instance of `Majorant` for the geometry.
     """
-    e_grid, mat_majorants = majorants_from_geometry(geom)
-    return Majorant.from_others(e_grid, mat_majorants)
+    if max_memory is not None:
+        builder = MajorantBuilder.from_geometry(geom, provider=provider)
+        return builder.windowed_majorant(max_memory, path)
+    e_grid, mat_majorants = majorants_from_geometry(geom, provider)
+    majorant = Majorant.from_others(e_grid, mat_majorants)
+    if path is not None:
+        majorant.to_file(path, geom.get_all_materials().values(),
+                         provider=provider)
+    return majorant
 
 
 def plot_majorant(energy_grid, cross_sections):
+    from matplotlib import pyplot as plt
 
     for mat_xs in cross_sections:
         # compute material cross section on the energy grid
@@ -108,3 +108,23 @@ def set_auto_id(next_id):
     """
     for cls in IDManagerMixin.__subclasses__():
         cls.next_id = next_id
+
+
+def next_auto_id(cls):
+    """Get the ID the next auto-generated ID of a class will be.
+
+    Parameters
+    ----------
+    cls : type
+        Class with auto-generated IDs (e.g., :class:`igmc.Particle`)
+
+    Returns
+    -------
+    int
+        First ID at or above the class's next ID that is not in use
+
+    """
+    next_id = cls.next_id
+    while next_id in cls.used_ids:
+        next_id += 1
+    return next_id
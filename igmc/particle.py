@@ -1,4 +1,5 @@
 from collections.abc import Iterable
+from enum import IntEnum
 from numbers import Real
 
 import numpy as np
@@ -10,6 +11,15 @@ from .mixin import IDManagerMixin
 from . import checkvalue as cv
 
 
+class Termination(IntEnum):
+    """
+    Reasons for the termination of a particle history
+    """
+    ENERGY_CUTOFF = 1
+    LEAKAGE = 2
+    ROULETTE = 3
+
+
 class Particle(IDManagerMixin):
     """
     Particle class. Used to represent a particle in phase space.
@@ -23,7 +33,9 @@ class Particle(IDManagerMixin):
     u : iterable of 3 floats
         Unit vector representing the direction. Defaults to (1.0, 0.0, 0.0)
     e : float
-
+        Particle energy. Defaults to 10 eV.
+    wgt : float
+        Statistical weight of the particle. Defaults to 1.0.
 
     Attributes
     ----------
@@ -35,6 +47,12 @@ class Particle(IDManagerMixin):
         Directional unit vector
     e : float
         Particle energy
+    wgt : float
+        Statistical weight of the particle
+    termination : Termination or None
+        Reason the particle history ended. None while the particle is alive.
+    alive : bool
+        Whether or not the particle history is still active
     xs : float
         Total cross section of the current cell.
     cell : openmc.Cell
@@ -49,11 +67,13 @@ class Particle(IDManagerMixin):
     next_id = 1
     used_ids = set()
 
-    def __init__(self, id=None, r=None, u=None, e=None):
+    def __init__(self, id=None, r=None, u=None, e=None, wgt=None):
         self.id = id
-        self.r = r if r else (0.0, 0.0, 0.0)
-        self.u = u if u else (1.0, 0.0, 0.0)
+        self.r = r if r is not None else (0.0, 0.0, 0.0)
+        self.u = u if u is not None else (1.0, 0.0, 0.0)
         self.e = e if e else 10.0
+        self.wgt = wgt if wgt is not None else 1.0
+        self.termination = None
 
         # statistics
         self.advance_events = 0
@@ -71,6 +91,7 @@ class Particle(IDManagerMixin):
         out += "\tPosition: {}\n".format(self.r)
         out += "\tDirection: {}\n".format(self.u)
         out += "\tEnergy: {}\n".format(self.e)
+        out += "\tWeight: {}\n".format(self.wgt)
         out += "\tDistance traveled: {}\n".format(self.distance_traveled)
         out += "\tScattering Events: {}\n".format(self.n_scatter_events)
         out += "\tAdvance Events: {}\n".format(self.n_advance_events)
@@ -83,8 +104,9 @@ class Particle(IDManagerMixin):
 
     @r.setter
     def r(self, val):
-        cv.check_type('position', val, Iterable, Real)
-        cv.check_length('position', val, 3)
+        if cv.full_checks:
+            cv.check_type('position', val, Iterable, Real)
+            cv.check_length('position', val, 3)
         self._r = np.asarray(val)
 
     @property
@@ -93,8 +115,9 @@ class Particle(IDManagerMixin):
 
     @u.setter
     def u(self, val):
-        cv.check_type('direction', val, Iterable, Real)
-        cv.check_length('direction', val, 3)
+        if cv.full_checks:
+            cv.check_type('direction', val, Iterable, Real)
+            cv.check_length('direction', val, 3)
         self._u = np.asarray(val)
 
     @property
@@ -103,9 +126,36 @@ class Particle(IDManagerMixin):
 
     @e.setter
     def e(self, val):
-        cv.check_type('energy', val, Real)
+        if cv.full_checks:
+            cv.check_type('energy', val, Real)
         self._e = val
 
+    @property
+    def wgt(self):
+        return self._wgt
+
+    @wgt.setter
+    def wgt(self, val):
+        if cv.full_checks:
+            cv.check_type('weight', val, Real)
+            cv.check_greater_than('weight', val, 0.0, equality=True)
+        self._wgt = val
+
+    @property
+    def alive(self):
+        return self.termination is None
+
+    def kill(self, reason):
+        """
+        End the particle history
+
+        Parameters
+        ----------
+        reason : Termination
+            Reason the history ended
+        """
+        self.termination = Termination(reason)
+
     def advance(self, majorant):
         """
         Step particle along its directon vector
@@ -120,9 +170,21 @@ class Particle(IDManagerMixin):
         # sample distance
         dist = -np.log(rand()) / majorant
         # advance particle
-        self.r = self.r + dist * self.u
+        self.move(dist)
         # increment counter
         self.advance_events += 1
+
+    def move(self, dist):
+        """
+        Move the particle a set distance along its direction vector
+
+        Parameters
+        ----------
+
+        dist : float
+            Distance to move the particle
+        """
+        self.r = self.r + dist * self.u
         self.distance_traveled += dist
 
     def scatter(self):
@@ -141,12 +203,19 @@ class Particle(IDManagerMixin):
         ----------
 
         geometry : openmc.Geometry instance
+
+        Returns
+        -------
+        openmc.Cell or None
+            The containing cell. None if the particle is outside
+            of the geometry.
         """
         cells = geometry.find(self.r)
         if cells:
             self._cell = cells[-1]
         else:
             self._cell = None
+        return self._cell
 
     def calculate_xs(self, xs_dict):
         """
@@ -157,7 +226,7 @@ class Particle(IDManagerMixin):
 
     @property
     def xs(self):
-        if not self._xs:
+        if self._xs is None:
             raise RuntimeError("Cross-section called for but not set")
 
         return self._xs
@@ -0,0 +1,312 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+import functools
+import importlib
+import json
+import os
+import threading
+from time import perf_counter
+
+from . import checkvalue as cv
+
+# functions timed while a profiler is enabled: (module, attribute, stage)
+HOT_PATHS = [
+    ('igmc.majorant', 'Majorant.calculate_xs', 'majorant.calculate_xs'),
+    ('igmc.xs', 'CEXS.calculate_xs', 'material.calculate_xs'),
+    ('igmc.particle', 'Particle.locate', 'particle.locate'),
+    ('igmc.particle', 'Particle.calculate_xs', 'particle.calculate_xs'),
+    ('igmc.particle', 'Particle.advance', 'particle.advance'),
+    ('igmc.particle', 'Particle.scatter', 'particle.scatter'),
+    ('igmc.particle', 'rand', 'rng'),
+    ('igmc.transport', 'rand', 'rng'),
+    ('igmc.distributions', 'rand', 'rng'),
+]
+
+# modules whose check_* functions are timed as 'checkvalue'
+VALIDATORS = ['igmc.checkvalue']
+
+# profiler receiving counts and timings, None when profiling is disabled
+_active = None
+
+
+class Profiler:
+    """
+    Opt-in instrumentation recording named counters and cumulative
+    timers.
+
+    While enabled, the transport hot paths listed in :data:`HOT_PATHS`
+    and the ``check_*`` validators are replaced by timed wrappers and
+    coarse phases instrumented with :func:`timer` (majorant
+    construction, batches) are recorded. Disabled profiling leaves the
+    original functions in place, so the only remaining cost is a
+    ``None`` check in :func:`timer` and :func:`count`. Timers are
+    inclusive: a stage calling another timed stage includes its time.
+
+    Results can be exported as JSON and as a Chrome trace-event file,
+    which can be opened in chrome://tracing or Perfetto. Profiling is
+    per process.
+
+    Parameters
+    ----------
+    trace_calls : bool
+        Record a trace event for every call of a hot path function in
+        addition to the coarse phases
+    max_events : int
+        Maximum number of trace events kept
+
+    Attributes
+    ----------
+    counters : collections.Counter
+        Named counters
+    timers : collections.defaultdict
+        Cumulative time (s) of each timer
+    calls : collections.Counter
+        Number of times each timer was entered
+    events : list of tuple
+        Trace events as (name, start, duration, thread ID) with times
+        in seconds
+    """
+
+    def __init__(self, trace_calls=False, max_events=100000):
+        cv.check_type('maximum events', max_events, int)
+        self.trace_calls = trace_calls
+        self.max_events = max_events
+        self.counters = Counter()
+        self.timers = defaultdict(float)
+        self.calls = Counter()
+        self.events = []
+        self._patched = []
+        self._origin = perf_counter()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def __repr__(self):
+        return "Profiler(timers={}, counters={})".format(len(self.timers),
+                                                         len(self.counters))
+
+    @property
+    def enabled(self):
+        return _active is self
+
+    def enable(self):
+        """
+        Install the timed wrappers and make this the active profiler
+        """
+        global _active
+        if _active is not None and _active is not self:
+            raise RuntimeError('Another profiler is already enabled')
+        if self.enabled:
+            return
+
+        for module_name, attr, name in HOT_PATHS:
+            owner, attr = _resolve(module_name, attr)
+            self._patch(owner, attr, name)
+        for module_name in VALIDATORS:
+            module = importlib.import_module(module_name)
+            for attr in dir(module):
+                if attr.startswith('check_'):
+                    self._patch(module, attr, 'checkvalue')
+
+        _active = self
+
+    def disable(self):
+        """
+        Restore the original functions
+        """
+        global _active
+        while self._patched:
+            owner, attr, func = self._patched.pop()
+            setattr(owner, attr, func)
+        if _active is self:
+            _active = None
+
+    def reset(self):
+        """
+        Discard all recorded counts, timings and events
+        """
+        self.counters.clear()
+        self.timers.clear()
+        self.calls.clear()
+        self.events.clear()
+        self._origin = perf_counter()
+
+    def _patch(self, owner, attr, name):
+        func = getattr(owner, attr)
+        self._patched.append((owner, attr, func))
+        setattr(owner, attr, self._wrap(func, name))
+
+    def _wrap(self, func, name):
+        timers = self.timers
+        calls = self.calls
+        trace = self.trace_calls
+        record = self._record
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                timers[name] += elapsed
+                calls[name] += 1
+                if trace:
+                    record(name, start, elapsed)
+
+        return wrapper
+
+    def _record(self, name, start, elapsed):
+        if len(self.events) < self.max_events:
+            self.events.append((name, start - self._origin, elapsed,
+                                threading.get_ident()))
+
+    def count(self, name, n=1):
+        """
+        Increment a named counter
+
+        Parameters
+        ----------
+        name : str
+            Counter name
+        n : int
+            Amount to add
+        """
+        self.counters[name] += n
+
+    @contextmanager
+    def timer(self, name):
+        """
+        Time a block of code
+
+        Parameters
+        ----------
+        name : str
+            Timer name
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.timers[name] += elapsed
+            self.calls[name] += 1
+            self._record(name, start, elapsed)
+
+    def to_dict(self):
+        """
+        Recorded counters and timers
+
+        Returns
+        -------
+        dict
+            Counters and, for each timer, the number of calls, total
+            time (s) and mean time per call (s)
+        """
+        timers = {name: {'calls': self.calls[name],
+                         'total': total,
+                         'mean': total / self.calls[name] if self.calls[name] else 0.0}
+                  for name, total in sorted(self.timers.items())}
+        return {'counters': dict(sorted(self.counters.items())),
+                'timers': timers}
+
+    def to_json(self, path):
+        """
+        Write the counters and timers to a JSON file
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to write
+        """
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_chrome_trace(self, path):
+        """
+        Write the recorded events in the Chrome trace-event format
+
+        Parameters
+        ----------
+        path : str
+            Path of the file to write
+        """
+        pid = os.getpid()
+        events = [{'name': name, 'cat': name.split('.')[0], 'ph': 'X',
+                   'ts': start * 1E6, 'dur': elapsed * 1E6,
+                   'pid': pid, 'tid': tid}
+                  for name, start, elapsed, tid in self.events]
+        end = (perf_counter() - self._origin) * 1E6
+        events += [{'name': name, 'ph': 'C', 'ts': end, 'pid': pid,
+                    'args': {'value': value}}
+                   for name, value in sorted(self.counters.items())]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+    def summary(self):
+        """
+        Table of the timers sorted by total time
+
+        Returns
+        -------
+        str
+        """
+        lines = ["{:<28} {:>12} {:>12} {:>12}".format(
+                 "Timer", "Calls", "Total (s)", "Mean (us)")]
+        for name, total in sorted(self.timers.items(), key=lambda t: -t[1]):
+            n = self.calls[name]
+            lines.append("{:<28} {:>12} {:>12.4f} {:>12.3f}".format(
+                         name, n, total, 1E6 * total / n if n else 0.0))
+        for name, value in sorted(self.counters.items()):
+            lines.append("{:<28} {:>12}".format(name, value))
+        return '\n'.join(lines)
+
+
+def _resolve(module_name, attr):
+    owner = importlib.import_module(module_name)
+    *path, attr = attr.split('.')
+    for name in path:
+        owner = getattr(owner, name)
+    return owner, attr
+
+
+def active_profiler():
+    """
+    Profiler that is currently enabled, None if profiling is disabled
+    """
+    return _active
+
+
+def timer(name):
+    """
+    Time a block of code with the active profiler. Does nothing if
+    profiling is disabled.
+
+    Parameters
+    ----------
+    name : str
+        Timer name
+    """
+    if _active is None:
+        return nullcontext()
+    return _active.timer(name)
+
+
+def count(name, n=1):
+    """
+    Increment a counter of the active profiler. Does nothing if
+    profiling is disabled.
+
+    Parameters
+    ----------
+    name : str
+        Counter name
+    n : int
+        Amount to add
+    """
+    if _active is not None:
+        _active.counters[name] += n
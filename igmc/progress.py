@@ -0,0 +1,270 @@
+from collections import Counter
+from collections.abc import Callable
+from numbers import Integral, Real
+import sys
+import threading
+from time import perf_counter
+
+from .particle import Termination
+from . import checkvalue as cv
+
+
+class ProgressReporter:
+    """
+    Aggregates the progress of a run and reports it at a limited rate.
+
+    Histories, particles, terminations and leaked weight are counted as
+    histories complete; nothing is reported per event. A report is made
+    once `every` histories or `interval` seconds have passed since the
+    previous one, whichever comes first, and when the reporter is closed.
+
+    Worker processes report through a :class:`QueueReporter` sending
+    their counts to a queue, which a single reporter in the main process
+    drains with :meth:`listen`.
+
+    Parameters
+    ----------
+    total : int, optional
+        Expected number of histories, shown as a percentage
+    every : int, optional
+        Number of histories between reports. Reports are only time based
+        if not set.
+    interval : float
+        Time (s) between reports
+    callback : Callable, optional
+        Function called with the reporter on every report. Defaults to
+        writing a progress line to `stream`.
+    stream : file-like, optional
+        Stream the default report is written to. Defaults to sys.stderr.
+
+    Attributes
+    ----------
+    histories : int
+        Number of completed histories
+    particles : int
+        Number of transported particles, including secondaries
+    terminations : collections.Counter
+        Number of particles ended by each termination reason
+    leaked : float
+        Weight that leaked from the geometry
+    elapsed : float
+        Time (s) since the reporter was created
+    """
+
+    def __init__(self, total=None, every=None, interval=1.0, callback=None,
+                 stream=None):
+        cv.check_type('total', total, Integral, none_ok=True)
+        cv.check_type('every', every, Integral, none_ok=True)
+        if every is not None:
+            cv.check_greater_than('every', every, 0)
+        cv.check_type('interval', interval, Real)
+        cv.check_greater_than('interval', interval, 0.0, equality=True)
+        cv.check_type('callback', callback, Callable, none_ok=True)
+
+        self.total = total
+        self.every = every
+        self.interval = interval
+        self.callback = callback
+        self.stream = stream
+
+        self.histories = 0
+        self.particles = 0
+        self.terminations = Counter()
+        self.leaked = 0.0
+
+        self._start = perf_counter()
+        self._next_histories = every
+        self._next_time = self._start + interval
+        self._reported = None
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def __repr__(self):
+        return "{}(histories={}, particles={})".format(
+            type(self).__name__, self.histories, self.particles)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def elapsed(self):
+        return perf_counter() - self._start
+
+    def record(self, p):
+        """
+        Count a particle whose transport has ended
+
+        Parameters
+        ----------
+        p : Particle
+            Transported particle
+        """
+        self.particles += 1
+        self.terminations[p.termination] += 1
+        if p.termination == Termination.LEAKAGE:
+            self.leaked += p.wgt
+
+    def update(self, n=1):
+        """
+        Count completed histories and report if due
+
+        Parameters
+        ----------
+        n : int
+            Number of histories completed since the last update
+        """
+        self.histories += n
+        if self._next_histories is not None and \
+           self.histories >= self._next_histories:
+            self.report()
+        elif perf_counter() >= self._next_time:
+            self.report()
+
+    def merge(self, counts):
+        """
+        Add counts sent by another reporter
+
+        Parameters
+        ----------
+        counts : dict
+            Numbers of histories and particles, termination counts and
+            leaked weight (see :meth:`QueueReporter.report`)
+        """
+        with self._lock:
+            self.particles += counts['particles']
+            self.terminations.update(counts['terminations'])
+            self.leaked += counts['leaked']
+            self.update(counts['histories'])
+
+    def report(self):
+        """
+        Report the current progress
+        """
+        if self.every is not None:
+            self._next_histories = self.histories + self.every
+        self._next_time = perf_counter() + self.interval
+        self._reported = self.histories
+
+        if self.callback is not None:
+            self.callback(self)
+        else:
+            self._write('\r' if self._isatty() else '\n')
+
+    def _isatty(self):
+        stream = sys.stderr if self.stream is None else self.stream
+        return getattr(stream, 'isatty', lambda: False)()
+
+    def _write(self, end):
+        stream = sys.stderr if self.stream is None else self.stream
+        stream.write(self.summary() + end)
+        stream.flush()
+
+    def summary(self):
+        """
+        One-line description of the current progress
+
+        Returns
+        -------
+        str
+        """
+        elapsed = self.elapsed
+        if self.total:
+            done = "{}/{} histories ({:.0%})".format(
+                self.histories, self.total, self.histories / self.total)
+        else:
+            done = "{} histories".format(self.histories)
+        rate = self.histories / elapsed if elapsed > 0.0 else 0.0
+        leaked = self.terminations[Termination.LEAKAGE]
+        return "{}, {:.4g} histories/s, {} particles, {} leaked".format(
+            done, rate, self.particles, leaked)
+
+    def listen(self, queue):
+        """
+        Merge counts sent to a queue by :class:`QueueReporter` instances
+        in a background thread until :meth:`close` is called
+
+        Parameters
+        ----------
+        queue : multiprocessing.Queue or queue.Queue
+            Queue the counts are sent to
+        """
+        if self._listener is not None:
+            raise RuntimeError('The reporter is already listening to a queue')
+
+        def drain():
+            while True:
+                counts = queue.get()
+                if counts is None:
+                    break
+                self.merge(counts)
+
+        self._listener = (queue, threading.Thread(target=drain, daemon=True))
+        self._listener[1].start()
+
+    def close(self):
+        """
+        Stop listening to a queue and make a final report
+        """
+        if self._listener is not None:
+            queue, thread = self._listener
+            queue.put(None)
+            thread.join()
+            self._listener = None
+        # a terminal line is always completed, a log is not repeated
+        if self._isatty() or self.histories != self._reported:
+            if self.callback is not None:
+                self.callback(self)
+            else:
+                self._write('\n')
+
+
+class QueueReporter(ProgressReporter):
+    """
+    Progress reporter of a worker process. Counts are accumulated locally
+    and sent to a queue at a limited rate rather than reported, to be
+    merged by the :meth:`ProgressReporter.listen` of the main process.
+
+    Parameters
+    ----------
+    queue : multiprocessing.Queue
+        Queue the counts are sent to
+    every : int, optional
+        Number of histories between sends
+    interval : float
+        Time (s) between sends
+    """
+
+    def __init__(self, queue, every=None, interval=0.5):
+        super().__init__(every=every, interval=interval)
+        self.queue = queue
+        self._sent = {'histories': 0, 'particles': 0,
+                      'terminations': Counter(), 'leaked': 0.0}
+
+    def report(self):
+        """
+        Send the counts accumulated since the previous send
+        """
+        if self.every is not None:
+            self._next_histories = self.histories + self.every
+        self._next_time = perf_counter() + self.interval
+
+        sent = self._sent
+        counts = {'histories': self.histories - sent['histories'],
+                  'particles': self.particles - sent['particles'],
+                  'terminations': dict(self.terminations - sent['terminations']),
+                  'leaked': self.leaked - sent['leaked']}
+        if counts['histories'] or counts['particles']:
+            self.queue.put(counts)
+        self._sent = {'histories': self.histories,
+                      'particles': self.particles,
+                      'terminations': self.terminations.copy(),
+                      'leaked': self.leaked}
+
+    def close(self):
+        """
+        Send any remaining counts
+        """
+        self.report()
@@ -0,0 +1,316 @@
+from collections.abc import Iterable
+from numbers import Integral, Real
+import hashlib
+import os
+import zlib
+
+import numpy as np
+
+from . import checkvalue as cv
+
+
+def library_fingerprint():
+    """
+    Fingerprint of the cross section library pointed to by the
+    OPENMC_CROSS_SECTIONS environment variable
+
+    Returns
+    -------
+    str
+        SHA-1 digest of the library's cross_sections.xml file. An empty
+        string if no library is configured.
+    """
+    path = os.environ.get('OPENMC_CROSS_SECTIONS')
+    if path is None or not os.path.isfile(path):
+        return ''
+
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def library_temperatures(nuclide):
+    """
+    Temperatures available for a nuclide in the cross section library
+    pointed to by the OPENMC_CROSS_SECTIONS environment variable
+
+    Parameters
+    ----------
+    nuclide : str
+        Name of the nuclide in GND format
+
+    Returns
+    -------
+    list of float
+        Sorted library temperatures (K)
+    """
+    import h5py
+    import openmc
+
+    library = openmc.data.DataLibrary.from_xml()
+    lib = library.get_by_material(nuclide)
+    if lib is None:
+        raise ValueError('Nuclide {} is not present in the cross '
+                         'section library'.format(nuclide))
+
+    with h5py.File(lib['path'], 'r') as f:
+        return sorted(float(kT.rstrip('K')) for kT in f[nuclide]['kTs'])
+
+
+def atom_densities(material):
+    """
+    Atom densities of a material's nuclides
+
+    Parameters
+    ----------
+    material : openmc.Material
+        Material to evaluate
+
+    Returns
+    -------
+    dict
+        Dictionary with nuclide names as keys and atom densities
+        (atom/b-cm) as values
+    """
+    densities = {}
+    for nuclide, density in material.get_nuclide_atom_densities().items():
+        # OpenMC before 0.13.1 gives (nuclide, density) tuples
+        if isinstance(density, tuple):
+            density = density[1]
+        densities[nuclide] = density
+    return densities
+
+
+class XSProvider:
+    """
+    Source of the point-wise total cross sections that majorants and
+    material cross sections are built from.
+
+    Subclasses implement :meth:`nuclide_xs` and :meth:`temperatures`.
+    Material cross sections are by default the sum of the nuclide cross
+    sections at the material's temperature weighted by the nuclide atom
+    densities, evaluated on the union of the nuclide energy grids.
+
+    Attributes
+    ----------
+    default_temperature : float
+        Temperature (K) of materials without a temperature
+    """
+
+    default_temperature = 294.0
+
+    def __repr__(self):
+        return "{}()".format(type(self).__name__)
+
+    def nuclide_xs(self, nuclide, temperature):
+        """
+        Microscopic total cross section of a nuclide
+
+        Parameters
+        ----------
+        nuclide : str
+            Name of the nuclide in GND format
+        temperature : float
+            Temperature (K)
+
+        Returns
+        -------
+        e_grid : numpy.ndarray
+            Energy values (eV)
+        xs : numpy.ndarray
+            Cross section values (b)
+        """
+        raise NotImplementedError
+
+    def temperatures(self, nuclide):
+        """
+        Temperatures at which data is available for a nuclide
+
+        Parameters
+        ----------
+        nuclide : str
+            Name of the nuclide in GND format
+
+        Returns
+        -------
+        list of float
+            Sorted temperatures (K)
+        """
+        raise NotImplementedError
+
+    def fingerprint(self):
+        """
+        Identifier of the data, recorded with serialized majorants.
+        An empty string if the data cannot be identified.
+
+        Returns
+        -------
+        str
+        """
+        return ''
+
+    def material_xs(self, material):
+        """
+        Macroscopic total cross section of a material at its temperature
+
+        Parameters
+        ----------
+        material : openmc.Material
+            Material to evaluate
+
+        Returns
+        -------
+        e_grid : numpy.ndarray
+            Energy values (eV)
+        xs : numpy.ndarray
+            Cross section values (cm^-1)
+        """
+        temperature = material.temperature
+        if temperature is None:
+            temperature = self.default_temperature
+
+        densities = atom_densities(material)
+        curves = [self.nuclide_xs(nuclide, temperature) for nuclide in densities]
+        e_grid = np.unique(np.concatenate([e for e, _ in curves]))
+
+        xs = np.zeros_like(e_grid)
+        for density, (e, nuc_xs) in zip(densities.values(), curves):
+            xs += density * np.interp(e_grid, e, nuc_xs)
+        return e_grid, xs
+
+
+class OpenMCProvider(XSProvider):
+    """
+    Cross sections from the OpenMC data library pointed to by the
+    OPENMC_CROSS_SECTIONS environment variable
+    """
+
+    def nuclide_xs(self, nuclide, temperature):
+        from openmc.plotter import calculate_cexs
+
+        e_grid, xs = calculate_cexs(nuclide, 'nuclide', ('total',),
+                                    temperature=temperature)
+        return e_grid, xs.reshape(xs.size)
+
+    def temperatures(self, nuclide):
+        return library_temperatures(nuclide)
+
+    def fingerprint(self):
+        return library_fingerprint()
+
+    def material_xs(self, material):
+        from openmc.plotter import calculate_cexs
+
+        e_grid, xs = calculate_cexs(material, 'material', ('total',))
+        return e_grid, xs[0]
+
+
+class SyntheticProvider(XSProvider):
+    """
+    Deterministic synthetic cross sections for running majorant
+    construction and transport without nuclear data.
+
+    Each nuclide has a constant potential scattering cross section, a
+    1/v component and Lorentzian resonances between 1 eV and 100 keV.
+    Half of the energy points form a jittered logarithmic grid and the
+    rest are placed around the resonances. Grid, resonance energies and
+    strengths are derived from the nuclide name and the seed, so the
+    same nuclide always yields the same data. Resonances are Doppler
+    broadened with temperature, lowering and widening the peaks, and
+    data can be generated at any temperature.
+
+    Parameters
+    ----------
+    n_points : int
+        Approximate number of energy points per nuclide
+    n_resonances : int, optional
+        Number of resonances per nuclide. Defaults to one per 50 points.
+    temperatures : Iterable of float
+        Temperatures (K) reported as available, e.g. for
+        :class:`TemperatureRangeMajorant`
+    seed : int
+        Seed from which the data of every nuclide is derived
+
+    Attributes
+    ----------
+    n_points : int
+        Approximate number of energy points per nuclide
+    n_resonances : int
+        Number of resonances per nuclide
+    seed : int
+        Seed from which the data of every nuclide is derived
+    """
+
+    e_min = 1E-05
+    e_max = 2E+07
+    # relative Doppler width of a resonance at the reference temperature
+    doppler_width = 1E-04
+    reference_temperature = 294.0
+
+    def __init__(self, n_points=10000, n_resonances=None,
+                 temperatures=(294.0, 600.0, 900.0, 1200.0), seed=0):
+        cv.check_type('number of points', n_points, Integral)
+        cv.check_greater_than('number of points', n_points, 1)
+        if n_resonances is None:
+            n_resonances = max(1, n_points // 50)
+        cv.check_type('number of resonances', n_resonances, Integral)
+        cv.check_greater_than('number of resonances', n_resonances, 0)
+        cv.check_type('temperatures', temperatures, Iterable, Real)
+        cv.check_type('seed', seed, Integral)
+
+        self.n_points = n_points
+        self.n_resonances = n_resonances
+        self._temperatures = sorted(float(t) for t in temperatures)
+        self.seed = seed
+
+    def __repr__(self):
+        return "SyntheticProvider(n_points={}, n_resonances={}, seed={})".format(
+            self.n_points, self.n_resonances, self.seed)
+
+    def temperatures(self, nuclide):
+        return list(self._temperatures)
+
+    def fingerprint(self):
+        params = (self.n_points, self.n_resonances, self._temperatures, self.seed)
+        return 'synthetic-' + hashlib.sha1(repr(params).encode()).hexdigest()
+
+    def nuclide_xs(self, nuclide, temperature):
+        cv.check_type('temperature', temperature, Real)
+        cv.check_greater_than('temperature', temperature, 0.0, equality=True)
+        rng = np.random.default_rng([self.seed, zlib.crc32(nuclide.encode())])
+
+        potential = rng.uniform(2.0, 20.0)
+        one_over_v = rng.uniform(0.1, 10.0)
+        centers = np.sort(10.0**rng.uniform(0.0, 5.0, self.n_resonances))
+        widths = centers * 10.0**rng.uniform(-5.0, -3.0, self.n_resonances)
+        heights = 10.0**rng.uniform(1.0, 4.0, self.n_resonances)
+
+        # half of the points on a jittered logarithmic grid, the rest
+        # resolving the resonances
+        # (an odd number of points per resonance includes its center)
+        n_peak = max(3, self.n_points // (2 * self.n_resonances)) | 1
+        n_log = max(2, self.n_points - n_peak * self.n_resonances)
+        log_e = np.linspace(np.log10(self.e_min), np.log10(self.e_max), n_log)
+        step = log_e[1] - log_e[0]
+        log_e[1:-1] += rng.uniform(-0.3, 0.3, n_log - 2) * step
+        offsets = np.tan(np.linspace(-1.5, 1.5, n_peak))
+        peaks = centers[:, np.newaxis] + widths[:, np.newaxis] * offsets
+        e_grid = np.unique(np.concatenate((10.0**log_e, peaks.ravel())))
+
+        xs = potential + one_over_v / np.sqrt(e_grid)
+
+        # Doppler broadening preserving the area under each peak
+        doppler = self.doppler_width * centers * \
+            np.sqrt(temperature / self.reference_temperature)
+        broadened = np.hypot(widths, doppler)
+        heights *= widths / broadened
+
+        # each point sees the resonances closest to it
+        idx = np.searchsorted(centers, e_grid)
+        for shift in (-2, -1, 0, 1):
+            k = idx + shift
+            valid = (k >= 0) & (k < self.n_resonances)
+            k = k[valid]
+            xs[valid] += heights[k] / (1.0 + ((e_grid[valid] - centers[k]) /
+                                              broadened[k])**2)
+
+        return e_grid, xs
@@ -0,0 +1,269 @@
+from numbers import Integral
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+from . import checkvalue as cv
+
+# record of a transported particle. Particles of the same source history
+# (e.g. split from it) share the history index; the termination is the
+# value of the Termination enum, 0 for particles still alive.
+HISTORY_DTYPE = np.dtype([('history', '<i8'),
+                          ('id', '<i8'),
+                          ('r', '<f8', (3,)),
+                          ('u', '<f8', (3,)),
+                          ('e', '<f8'),
+                          ('wgt', '<f8'),
+                          ('distance', '<f8'),
+                          ('scatter_events', '<i4'),
+                          ('advance_events', '<i4'),
+                          ('termination', '<i1')])
+
+# size of the .npy header, large enough for any number of records so that
+# the final count can be written in place
+_NPY_HEADER_SIZE = 512
+
+
+class HistoryBuffer:
+    """
+    Collects a record of each transported particle in a structured array
+    with dtype :data:`HISTORY_DTYPE`
+
+    Parameters
+    ----------
+    capacity : int
+        Initial number of records held. The buffer grows as needed.
+    first_history : int
+        Index of the next source history
+
+    Attributes
+    ----------
+    histories : int
+        Index of the next source history
+    """
+
+    def __init__(self, capacity=4096, first_history=0):
+        cv.check_type('capacity', capacity, Integral)
+        cv.check_greater_than('capacity', capacity, 0)
+        cv.check_type('first history', first_history, Integral)
+        self.histories = first_history
+        self._records = np.empty(capacity, dtype=HISTORY_DTYPE)
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def record(self, p):
+        """
+        Record a particle whose transport has ended
+
+        Parameters
+        ----------
+        p : Particle
+            Transported particle
+        """
+        if self._n == len(self._records):
+            self._full()
+        self._records[self._n] = (self.histories, p.id, p.r, p.u, p.e, p.wgt,
+                                  p.distance_traveled, p.scatter_events,
+                                  p.advance_events, p.termination or 0)
+        self._n += 1
+
+    def end_history(self):
+        """
+        Move on to the next source history
+        """
+        self.histories += 1
+
+    def take(self):
+        """
+        Remove the records collected so far
+
+        Returns
+        -------
+        numpy.ndarray
+            Structured array of the records
+        """
+        records = self._records[:self._n].copy()
+        self._n = 0
+        return records
+
+    def _full(self):
+        self._records = np.resize(self._records, 2 * len(self._records))
+
+
+class HistoryWriter(HistoryBuffer):
+    """
+    Writes a record of each transported particle to a file. Records are
+    buffered and full buffers are written by a background thread so that
+    transport does not wait on the file system.
+
+    Files ending in '.h5' are written as an HDF5 dataset named 'histories',
+    anything else in the NumPy .npy format. Either can be read back with
+    :func:`read_histories`.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to write
+    buffer_size : int
+        Number of records written at a time
+    first_history : int
+        Index of the first source history, e.g. when resuming a run
+
+    Attributes
+    ----------
+    path : str
+        Path of the file written
+    n_records : int
+        Number of records passed to the writer
+    """
+
+    def __init__(self, path, buffer_size=65536, first_history=0):
+        super().__init__(buffer_size, first_history)
+        self.path = path
+        self.n_records = 0
+        self._hdf5 = os.path.splitext(path)[1] in ('.h5', '.hdf5')
+        self._queue = queue.Queue(maxsize=4)
+        self._error = None
+        self._file = self._open()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return "HistoryWriter({!r}, records={})".format(self.path,
+                                                        self.n_records)
+
+    def _open(self):
+        if self._hdf5:
+            import h5py
+            f = h5py.File(self.path, 'w')
+            f.attrs['filetype'] = np.bytes_('histories')
+            f.create_dataset('histories', (0,), dtype=HISTORY_DTYPE,
+                             maxshape=(None,), chunks=(4096,))
+            return f
+        f = open(self.path, 'wb')
+        f.write(_npy_header(HISTORY_DTYPE, 0))
+        return f
+
+    def _full(self):
+        self._put(self.take())
+
+    def append(self, records, n_histories):
+        """
+        Write records collected elsewhere, e.g. by a worker process
+
+        Parameters
+        ----------
+        records : numpy.ndarray
+            Records of consecutive source histories, with history indices
+            counted from zero
+        n_histories : int
+            Number of source histories the records cover
+        """
+        records = np.asarray(records, dtype=HISTORY_DTYPE)
+        if len(self):
+            self._put(self.take())
+        if len(records):
+            records = records.copy()
+            records['history'] += self.histories
+            self._put(records)
+        self.histories += n_histories
+
+    def _put(self, records):
+        if self._error is not None:
+            raise RuntimeError('Writing {} failed'.format(self.path)) \
+                from self._error
+        self.n_records += len(records)
+        self._queue.put(records)
+
+    def _run(self):
+        while True:
+            records = self._queue.get()
+            if records is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                self._write(records)
+            except Exception as e:
+                self._error = e
+
+    def _write(self, records):
+        if self._hdf5:
+            dset = self._file['histories']
+            n = dset.shape[0]
+            dset.resize((n + len(records),))
+            dset[n:] = records
+        else:
+            self._file.write(records.tobytes())
+
+    def close(self):
+        """
+        Write any buffered records and close the file
+        """
+        if self._file is None:
+            return
+        if len(self):
+            self._put(self.take())
+        self._queue.put(None)
+        self._thread.join()
+
+        if not self._hdf5 and self._error is None:
+            # the number of records is only known now
+            self._file.seek(0)
+            self._file.write(_npy_header(HISTORY_DTYPE, self.n_records))
+        self._file.close()
+        self._file = None
+
+        if self._error is not None:
+            raise RuntimeError('Writing {} failed'.format(self.path)) \
+                from self._error
+
+
+def _npy_header(dtype, n_records):
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), n_records)
+    # magic string, version, header length, header padded with spaces
+    length = _NPY_HEADER_SIZE - 10
+    return b'\x93NUMPY\x01\x00' + struct.pack('<H', length) + \
+        header.ljust(length - 1).encode('latin1') + b'\n'
+
+
+def read_histories(path, mmap=True):
+    """
+    Read the records written by :class:`HistoryWriter`
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to read
+    mmap : bool
+        Memory-map a .npy file rather than reading it into memory. HDF5
+        files are always read into memory.
+
+    Returns
+    -------
+    numpy.ndarray
+        Structured array with dtype :data:`HISTORY_DTYPE`
+    """
+    if os.path.splitext(path)[1] in ('.h5', '.hdf5'):
+        import h5py
+        with h5py.File(path, 'r') as f:
+            if f.attrs.get('filetype', b'').decode() != 'histories':
+                raise IOError('{} is not a histories file.'.format(path))
+            return f['histories'][()]
+
+    records = np.load(path, mmap_mode='r' if mmap else None)
+    if records.dtype != HISTORY_DTYPE:
+        raise IOError('{} does not contain history records'.format(path))
+    return records
@@ -0,0 +1,270 @@
+from collections.abc import Callable, Iterable
+from enum import Enum
+from numbers import Integral, Real
+from time import perf_counter
+
+import numpy as np
+
+from .tally import Tally
+from . import checkvalue as cv
+from . import profiling
+
+
+class StopReason(str, Enum):
+    """
+    Reason a controlled run stopped
+    """
+    TARGET_REACHED = 'target relative error reached'
+    TIME_LIMIT = 'wall-clock limit reached'
+    PARTICLE_LIMIT = 'particle limit reached'
+
+
+class RunController:
+    """
+    Runs histories in batches until the relative error of the tracked
+    quantities reaches a target, a wall-clock budget is used up or a
+    maximum number of particles has been run, whichever comes first.
+
+    Relative errors are computed from the spread of the batch means of
+    the global quantities and from the batch statistics of the tracked
+    tallies (largest relative error over the bins with a score). A new
+    batch is not started if it is expected to finish after the time
+    limit.
+
+    Parameters
+    ----------
+    batch_size : int
+        Number of histories per batch
+    target_rel_err : float, optional
+        Relative error at which the run stops
+    time_limit : float, optional
+        Wall-clock budget of the run (s)
+    max_particles : int, optional
+        Maximum number of histories
+    min_batches : int
+        Number of batches run before the target is checked
+    quantities : Iterable of str
+        Global quantities tracked for convergence, any of 'leakage'
+        (leakage fraction) and 'events' (events per history)
+    tallies : Iterable of Tally, optional
+        Tallies tracked for convergence
+
+    Attributes
+    ----------
+    n_batches : int
+        Number of completed batches
+    n_particles : int
+        Number of completed histories
+    elapsed : float
+        Wall-clock time spent running batches (s)
+    rel_errs : dict
+        Current relative error of each tracked quantity and tally
+    stop_reason : StopReason or None
+        Why the run stopped, None while running
+    leakage : list of numpy.ndarray
+        Leakage of each history, one array per batch
+    events : list of numpy.ndarray
+        Number of events of each history, one array per batch
+    """
+
+    global_quantities = ('leakage', 'events')
+
+    def __init__(self, batch_size, target_rel_err=None, time_limit=None,
+                 max_particles=None, min_batches=3, quantities=('leakage',),
+                 tallies=None):
+        cv.check_type('batch size', batch_size, Integral)
+        cv.check_greater_than('batch size', batch_size, 0)
+        if target_rel_err is not None:
+            cv.check_type('target relative error', target_rel_err, Real)
+            cv.check_greater_than('target relative error', target_rel_err, 0.0)
+        if time_limit is not None:
+            cv.check_type('time limit', time_limit, Real)
+            cv.check_greater_than('time limit', time_limit, 0.0)
+        if max_particles is not None:
+            cv.check_type('maximum particles', max_particles, Integral)
+            cv.check_greater_than('maximum particles', max_particles, 0)
+        if target_rel_err is None and time_limit is None and max_particles is None:
+            raise ValueError('A target relative error, time limit or '
+                             'maximum number of particles is required')
+        cv.check_type('minimum batches', min_batches, Integral)
+        cv.check_greater_than('minimum batches', min_batches, 2, equality=True)
+        cv.check_type('quantities', quantities, Iterable, str)
+        for quantity in quantities:
+            cv.check_value('quantity', quantity, self.global_quantities)
+        tallies = [] if tallies is None else list(tallies)
+        cv.check_type('tallies', tallies, Iterable, Tally)
+
+        self.batch_size = batch_size
+        self.target_rel_err = target_rel_err
+        self.time_limit = time_limit
+        self.max_particles = max_particles
+        self.min_batches = min_batches
+        self.quantities = tuple(quantities)
+        self.tallies = tallies
+
+        self.n_batches = 0
+        self.n_particles = 0
+        self.elapsed = 0.0
+        self.rel_errs = {}
+        self.stop_reason = None
+        self.leakage = []
+        self.events = []
+        self._batch_means = {quantity: [] for quantity in self.quantities}
+
+    def __repr__(self):
+        return "RunController(batches={}, particles={}, stop_reason={})".format(
+            self.n_batches, self.n_particles,
+            None if self.stop_reason is None else self.stop_reason.name)
+
+    def add_batch(self, leakage, events):
+        """
+        Record the results of a batch of histories
+
+        Parameters
+        ----------
+        leakage : numpy.ndarray
+            Weight leaking from the geometry for each history
+        events : numpy.ndarray
+            Number of events for each history
+        """
+        values = {'leakage': leakage, 'events': events}
+        for quantity in self.quantities:
+            self._batch_means[quantity].append(np.mean(values[quantity]))
+        self.leakage.append(leakage)
+        self.events.append(events)
+        self.n_batches += 1
+        self.n_particles += len(leakage)
+        self._update_rel_errs()
+
+    def _update_rel_errs(self):
+        for quantity, means in self._batch_means.items():
+            self.rel_errs[quantity] = _rel_err(np.asarray(means))
+
+        for tally in self.tallies:
+            scored = tally.mean > 0.0
+            if scored.any():
+                rel_err = float(tally.rel_err[scored].max())
+            else:
+                rel_err = np.inf
+            self.rel_errs[tally.name or repr(tally)] = rel_err
+
+    def should_stop(self):
+        """
+        Determine whether the run should stop before the next batch
+
+        Returns
+        -------
+        bool
+            Whether the run should stop. The reason is set in
+            :attr:`stop_reason`.
+        """
+        if self.stop_reason is not None:
+            return True
+
+        if self.target_rel_err is not None and self.n_batches >= self.min_batches \
+                and self.rel_errs \
+                and max(self.rel_errs.values()) <= self.target_rel_err:
+            self.stop_reason = StopReason.TARGET_REACHED
+        elif self.max_particles is not None and self.n_particles >= self.max_particles:
+            self.stop_reason = StopReason.PARTICLE_LIMIT
+        elif self.time_limit is not None and self.n_batches > 0 and \
+                self.elapsed + self.elapsed / self.n_batches > self.time_limit:
+            self.stop_reason = StopReason.TIME_LIMIT
+
+        return self.stop_reason is not None
+
+    def next_batch_size(self):
+        """
+        Number of histories in the next batch, limited by the
+        maximum number of particles
+        """
+        if self.max_particles is None:
+            return self.batch_size
+        return min(self.batch_size, self.max_particles - self.n_particles)
+
+    def get_state(self):
+        """
+        Progress of the run, e.g. for writing a checkpoint
+
+        Returns
+        -------
+        dict
+            Number of batches and particles, elapsed time, history
+            results and batch means of the tracked quantities
+        """
+        empty = np.zeros(0)
+        return {'n_batches': self.n_batches,
+                'n_particles': self.n_particles,
+                'elapsed': self.elapsed,
+                'leakage': np.concatenate(self.leakage) if self.leakage else empty,
+                'events': np.concatenate(self.events) if self.events else empty,
+                'batch_means': {quantity: np.array(means)
+                                for quantity, means in self._batch_means.items()}}
+
+    def set_state(self, state):
+        """
+        Resume a run from the progress returned by :meth:`get_state`
+
+        Parameters
+        ----------
+        state : dict
+            Progress of the run
+        """
+        if set(state['batch_means']) != set(self.quantities):
+            raise ValueError('Run state tracks different quantities '
+                             '({})'.format(', '.join(state['batch_means'])))
+        self.n_batches = int(state['n_batches'])
+        self.n_particles = int(state['n_particles'])
+        self.elapsed = float(state['elapsed'])
+        self.leakage = [np.asarray(state['leakage'])]
+        self.events = [np.asarray(state['events'])]
+        self._batch_means = {quantity: list(means) for quantity, means
+                             in state['batch_means'].items()}
+        self.stop_reason = None
+        self._update_rel_errs()
+
+    def run(self, run_batch, on_batch=None):
+        """
+        Run batches until a stopping criterion is met
+
+        Parameters
+        ----------
+        run_batch : Callable
+            Function taking a number of histories, running them as one
+            batch and returning the leakage and number of events of each
+            history (see simulate.run_histories)
+        on_batch : Callable, optional
+            Function called with the controller after each batch, e.g.
+            to write a checkpoint
+
+        Returns
+        -------
+        leakage : numpy.ndarray
+            Weight leaking from the geometry for each history, including
+            any histories of a resumed run
+        events : numpy.ndarray
+            Number of events for each history, including any histories
+            of a resumed run
+        """
+        cv.check_type('run_batch', run_batch, Callable)
+        cv.check_type('on_batch', on_batch, Callable, none_ok=True)
+
+        while not self.should_stop():
+            start = perf_counter()
+            with profiling.timer('run.batch'):
+                batch_leakage, batch_events = run_batch(self.next_batch_size())
+            self.elapsed += perf_counter() - start
+
+            self.add_batch(batch_leakage, batch_events)
+            if on_batch is not None:
+                on_batch(self)
+
+        return np.concatenate(self.leakage), np.concatenate(self.events)
+
+
+def _rel_err(batch_means):
+    n = len(batch_means)
+    mean = batch_means.mean() if n > 0 else 0.0
+    if n < 2 or mean <= 0.0:
+        return np.inf
+    return batch_means.std(ddof=1) / np.sqrt(n) / mean
@@ -0,0 +1,229 @@
+import mmap
+import os
+import pickle
+import tempfile
+import uuid
+import weakref
+from multiprocessing import shared_memory
+
+from . import checkvalue as cv
+
+# alignment (bytes) of each array placed in a shared segment
+ALIGNMENT = 64
+
+# segments attached in this process, kept open for the lifetime of the
+# arrays viewing them
+_attached = {}
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class SharedHandle:
+    """
+    Small, picklable reference to an object whose array data has been
+    placed in shared memory or a memory-mapped file by
+    :class:`SharedTables`. Worker processes receive the handle and call
+    :meth:`attach` to obtain the object with zero-copy, read-only arrays.
+
+    Parameters
+    ----------
+    name : str
+        Shared memory segment name or path of the memory-mapped file
+    backend : {'shm', 'mmap'}
+        Storage used for the array data
+    payload : bytes
+        Pickled object with the array data stored out-of-band
+    spans : list of tuple
+        (offset, size) in bytes of each array buffer in the segment
+    """
+
+    def __init__(self, name, backend, payload, spans):
+        self.name = name
+        self.backend = backend
+        self.payload = payload
+        self.spans = spans
+
+    def __repr__(self):
+        return "SharedHandle({!r}, backend={!r}, buffers={})".format(
+            self.name, self.backend, len(self.spans))
+
+    def attach(self):
+        """
+        Reconstruct the shared object in this process
+
+        Returns
+        -------
+        object
+            Copy of the shared object whose arrays are read-only views
+            into the shared segment
+        """
+        buf = _attached.get(self.name)
+        if buf is None:
+            buf = _open_segment(self.name, self.backend)
+            _attached[self.name] = buf
+        view = buf[1].toreadonly()
+        buffers = [view[offset:offset + size] for offset, size in self.spans]
+        return pickle.loads(self.payload, buffers=buffers)
+
+
+def attach(handle):
+    """
+    Reconstruct a shared object from its handle
+
+    Parameters
+    ----------
+    handle : SharedHandle
+        Handle returned by :meth:`SharedTables.share`
+    """
+    cv.check_type('handle', handle, SharedHandle)
+    return handle.attach()
+
+
+def _open_segment(name, backend):
+    if backend == 'shm':
+        try:
+            # do not let this process unlink the segment on exit
+            segment = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            segment = shared_memory.SharedMemory(name=name)
+        return segment, segment.buf
+    else:
+        with open(name, 'rb') as f:
+            segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return segment, memoryview(segment)
+
+
+class SharedTables:
+    """
+    Places majorant and cross section tables in shared memory (or
+    memory-mapped files) once so that worker processes can attach to
+    them without each receiving a pickled copy.
+
+    Any picklable object can be shared. Its NumPy arrays are stored
+    out-of-band in a single segment per object and everything else
+    (e.g. OpenMC materials) travels inside the handle.
+
+    Segments are released by :meth:`close`, which is called on exiting a
+    ``with`` block, when the manager is garbage collected and at
+    interpreter exit. If the process is killed (e.g. by SIGTERM) before
+    then, its shared memory segments are unlinked by the multiprocessing
+    resource tracker, but memory-mapped files and the temporary directory
+    holding them are left behind.
+
+    Parameters
+    ----------
+    backend : {'shm', 'mmap'}
+        Store arrays in POSIX shared memory or in memory-mapped files
+    directory : str, optional
+        Directory for memory-mapped files. A temporary directory is
+        created if not provided.
+
+    Attributes
+    ----------
+    handles : list of SharedHandle
+        Handles of the objects shared by this manager
+    """
+
+    def __init__(self, backend='shm', directory=None):
+        cv.check_value('backend', backend, ('shm', 'mmap'))
+        self.backend = backend
+        self.handles = []
+
+        self._tmpdir = None
+        if backend == 'mmap' and directory is None:
+            self._tmpdir = tempfile.TemporaryDirectory(prefix='igmc_')
+            directory = self._tmpdir.name
+        self.directory = directory
+
+        self._segments = []
+        self._finalizer = weakref.finalize(self, SharedTables._release,
+                                           self._segments, self._tmpdir,
+                                           os.getpid())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def share(self, obj):
+        """
+        Place an object's array data in a new shared segment
+
+        Parameters
+        ----------
+        obj : object
+            Object to share, e.g. a Majorant, MaterialMajorant, CEXS or a
+            dictionary of them
+
+        Returns
+        -------
+        SharedHandle
+            Picklable handle used to attach to the object
+        """
+        if not self._finalizer.alive:
+            raise RuntimeError('Shared tables have already been released')
+
+        buffers = []
+        payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raw = [b.raw() for b in buffers]
+
+        spans = []
+        offset = 0
+        for b in raw:
+            offset = _aligned(offset)
+            spans.append((offset, b.nbytes))
+            offset += b.nbytes
+        size = max(offset, 1)
+
+        if self.backend == 'shm':
+            name = 'igmc_' + uuid.uuid4().hex[:16]
+            segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self._segments.append(('shm', segment))
+            dest = segment.buf
+        else:
+            name = os.path.join(self.directory, uuid.uuid4().hex + '.bin')
+            with open(name, 'wb+') as f:
+                f.truncate(size)
+                segment = mmap.mmap(f.fileno(), size)
+            self._segments.append(('mmap', (name, segment)))
+            dest = memoryview(segment)
+
+        for b, (offset, nbytes) in zip(raw, spans):
+            dest[offset:offset + nbytes] = b.cast('B')
+        if self.backend == 'mmap':
+            dest.release()
+            segment.flush()
+
+        handle = SharedHandle(name, self.backend, payload, spans)
+        self.handles.append(handle)
+        return handle
+
+    def close(self):
+        """
+        Release all segments created by this manager
+        """
+        self._finalizer()
+
+    @staticmethod
+    def _release(segments, tmpdir, owner):
+        # forked workers inherit the manager but must not release segments
+        if os.getpid() != owner:
+            return
+        while segments:
+            backend, segment = segments.pop()
+            try:
+                if backend == 'shm':
+                    segment.close()
+                    segment.unlink()
+                else:
+                    path, mm = segment
+                    mm.close()
+                    os.remove(path)
+            except (OSError, BufferError, FileNotFoundError):
+                pass
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
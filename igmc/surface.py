@@ -0,0 +1,108 @@
+import numpy as np
+
+# distance used to nudge particles across surfaces (cm)
+TINY_BIT = 1E-08
+
+
+def quadric_coeffs(surface):
+    """
+    Coefficients of the general quadric
+
+        f(x,y,z) = Ax^2 + By^2 + Cz^2 + Dxy + Eyz + Fxz + Gx + Hy + Jz + K
+
+    describing a surface. Planes, for which openmc.Surface._get_base_coeffs
+    provides (a, b, c, d) with f(x,y,z) = ax + by + cz - d, are converted.
+
+    Parameters
+    ----------
+    surface : openmc.Surface
+        Quadric surface
+
+    Returns
+    -------
+    tuple of 10 float
+        Coefficients (A, B, C, D, E, F, G, H, J, K)
+    """
+    coeffs = tuple(surface._get_base_coeffs())
+    if len(coeffs) == 4:
+        a, b, c, d = coeffs
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, a, b, c, -d)
+    return coeffs
+
+
+def distance_to_surface(surface, r, u):
+    """
+    Compute the distance along a ray to a quadric surface.
+    Surfaces are described by the coefficients of the general quadric
+
+        f(x,y,z) = Ax^2 + By^2 + Cz^2 + Dxy + Eyz + Fxz + Gx + Hy + Jz + K
+
+    (see :func:`quadric_coeffs`).
+
+    Parameters
+    ----------
+    surface : openmc.Surface
+        Surface to intersect
+    r : Iterable of 3 floats
+        Starting position of the ray
+    u : Iterable of 3 floats
+        Unit direction of the ray
+
+    Returns
+    -------
+    float
+        Distance to the nearest intersection in front of the ray.
+        Infinity if there is no intersection.
+    """
+    a, b, c, d, e, f, g, h, j, k = quadric_coeffs(surface)
+    x, y, z = r
+    ux, uy, uz = u
+
+    # coefficients of the quadratic in the distance along the ray
+    qa = a*ux*ux + b*uy*uy + c*uz*uz + d*ux*uy + e*uy*uz + f*ux*uz
+    qb = 2.0*(a*x*ux + b*y*uy + c*z*uz) + d*(x*uy + y*ux) + \
+        e*(y*uz + z*uy) + f*(x*uz + z*ux) + g*ux + h*uy + j*uz
+    qc = a*x*x + b*y*y + c*z*z + d*x*y + e*y*z + f*x*z + g*x + h*y + j*z + k
+
+    if qa == 0.0:
+        if qb == 0.0:
+            return np.inf
+        dist = -qc / qb
+        return dist if dist > TINY_BIT else np.inf
+
+    discriminant = qb*qb - 4.0*qa*qc
+    if discriminant < 0.0:
+        return np.inf
+
+    sqrt_disc = np.sqrt(discriminant)
+    roots = sorted(((-qb - sqrt_disc) / (2.0*qa), (-qb + sqrt_disc) / (2.0*qa)))
+    for dist in roots:
+        if dist > TINY_BIT:
+            return dist
+    return np.inf
+
+
+def distance_to_boundary(cell, r, u):
+    """
+    Compute the distance along a ray to the nearest surface of a cell
+
+    Parameters
+    ----------
+    cell : openmc.Cell
+        Cell containing the starting position of the ray
+    r : Iterable of 3 floats
+        Starting position of the ray
+    u : Iterable of 3 floats
+        Unit direction of the ray
+
+    Returns
+    -------
+    float
+        Distance to the nearest surface bounding the cell. Infinity if
+        the cell has no bounding surfaces in the direction of the ray.
+    """
+    if cell.region is None:
+        return np.inf
+
+    surfaces = cell.region.get_surfaces().values()
+    return min((distance_to_surface(s, r, u) for s in surfaces), default=np.inf)
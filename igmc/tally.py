@@ -0,0 +1,518 @@
+from collections.abc import Iterable
+from numbers import Integral, Real
+
+import numpy as np
+
+from . import checkvalue as cv
+
+
+class RegularMesh:
+    """
+    Rectilinear mesh with bins of equal width along each axis
+
+    Parameters
+    ----------
+    lower_left : Iterable of 3 floats
+        Lower-left corner of the mesh (cm)
+    upper_right : Iterable of 3 floats
+        Upper-right corner of the mesh (cm)
+    dimension : Iterable of 3 int
+        Number of bins along each axis
+
+    Attributes
+    ----------
+    lower_left : numpy.ndarray
+        Lower-left corner of the mesh (cm)
+    upper_right : numpy.ndarray
+        Upper-right corner of the mesh (cm)
+    dimension : numpy.ndarray
+        Number of bins along each axis
+    width : numpy.ndarray
+        Width of the bins along each axis (cm)
+    n_bins : int
+        Total number of bins
+    volume : float
+        Volume of a single bin (cm^3)
+    """
+
+    def __init__(self, lower_left, upper_right, dimension):
+        cv.check_type('lower_left', lower_left, Iterable, Real)
+        cv.check_length('lower_left', lower_left, 3, 3)
+        cv.check_type('upper_right', upper_right, Iterable, Real)
+        cv.check_length('upper_right', upper_right, 3, 3)
+        cv.check_type('dimension', dimension, Iterable, Integral)
+        cv.check_length('dimension', dimension, 3, 3)
+
+        self.lower_left = np.asarray(lower_left, dtype=np.float64)
+        self.upper_right = np.asarray(upper_right, dtype=np.float64)
+        self.dimension = np.asarray(dimension, dtype=np.int64)
+
+        if np.any(self.upper_right <= self.lower_left):
+            raise ValueError('Upper-right corner of the mesh must be '
+                             'above the lower-left corner')
+        if np.any(self.dimension < 1):
+            raise ValueError('Mesh dimension must be at least one '
+                             'along each axis')
+
+        self.width = (self.upper_right - self.lower_left) / self.dimension
+
+    def __repr__(self):
+        return "RegularMesh({}, {}, {})".format(self.lower_left.tolist(),
+                                               self.upper_right.tolist(),
+                                               self.dimension.tolist())
+
+    @property
+    def n_bins(self):
+        return int(np.prod(self.dimension))
+
+    @property
+    def volume(self):
+        return float(np.prod(self.width))
+
+    def get_indices(self, r):
+        """
+        Find the mesh bins containing a set of points
+
+        Parameters
+        ----------
+        r : numpy.ndarray
+            Points with shape (N, 3)
+
+        Returns
+        -------
+        numpy.ndarray
+            Flat bin index of each point, -1 for points outside the mesh
+        """
+        ijk = np.floor((r - self.lower_left) / self.width).astype(np.int64)
+        inside = np.all((ijk >= 0) & (ijk < self.dimension), axis=1)
+        idx = np.ravel_multi_index(tuple(np.where(inside, ijk.T, 0)),
+                                   tuple(self.dimension))
+        idx[~inside] = -1
+        return idx
+
+    def track_lengths(self, r0, r1):
+        """
+        Split a set of straight line segments at the mesh planes
+
+        Parameters
+        ----------
+        r0 : numpy.ndarray
+            Start points of the segments with shape (N, 3)
+        r1 : numpy.ndarray
+            End points of the segments with shape (N, 3)
+
+        Returns
+        -------
+        segments : numpy.ndarray
+            Index of the segment each piece belongs to
+        bins : numpy.ndarray
+            Flat mesh bin index of each piece
+        lengths : numpy.ndarray
+            Length of each piece (cm)
+        """
+        n = len(r0)
+        delta = r1 - r0
+        length = np.sqrt(np.einsum('ij,ij->i', delta, delta))
+
+        # fraction along each segment of its end points and of every
+        # mesh plane it crosses
+        segments = [np.arange(n), np.arange(n)]
+        fractions = [np.zeros(n), np.ones(n)]
+        for axis in range(3):
+            a = (r0[:, axis] - self.lower_left[axis]) / self.width[axis]
+            b = (r1[:, axis] - self.lower_left[axis]) / self.width[axis]
+            lo = np.clip(np.ceil(np.minimum(a, b)), 0, self.dimension[axis])
+            hi = np.clip(np.floor(np.maximum(a, b)), 0, self.dimension[axis])
+            count = np.where(a != b, np.maximum(hi - lo + 1, 0), 0).astype(np.int64)
+
+            seg = np.repeat(np.arange(n), count)
+            first = np.cumsum(count) - count
+            planes = lo[seg] + (np.arange(seg.size) - first[seg])
+            segments.append(seg)
+            fractions.append((planes - a[seg]) / (b - a)[seg])
+
+        segments = np.concatenate(segments)
+        fractions = np.clip(np.concatenate(fractions), 0.0, 1.0)
+        order = np.lexsort((fractions, segments))
+        segments = segments[order]
+        fractions = fractions[order]
+
+        # pieces between consecutive fractions of the same segment
+        same = segments[1:] == segments[:-1]
+        seg = segments[:-1][same]
+        f0 = fractions[:-1][same]
+        f1 = fractions[1:][same]
+
+        mid = r0[seg] + (0.5 * (f0 + f1))[:, np.newaxis] * delta[seg]
+        bins = self.get_indices(mid)
+        lengths = (f1 - f0) * length[seg]
+
+        keep = (bins >= 0) & (lengths > 0.0)
+        return seg[keep], bins[keep], lengths[keep]
+
+
+class EnergyFilter:
+    """
+    Energy group structure for a tally
+
+    Parameters
+    ----------
+    bins : Iterable of float
+        Increasing group boundaries (eV)
+
+    Attributes
+    ----------
+    bins : numpy.ndarray
+        Increasing group boundaries (eV)
+    n_bins : int
+        Number of energy groups
+    """
+
+    def __init__(self, bins):
+        cv.check_type('energy bins', bins, Iterable, Real)
+        cv.check_length('energy bins', bins, 2)
+        self.bins = np.asarray(bins, dtype=np.float64)
+        if np.any(np.diff(self.bins) <= 0.0):
+            raise ValueError('Energy bins must be increasing')
+
+    def __repr__(self):
+        return "EnergyFilter({} groups)".format(self.n_bins)
+
+    @property
+    def n_bins(self):
+        return len(self.bins) - 1
+
+    def get_indices(self, e):
+        """
+        Find the energy group of a set of energies
+
+        Parameters
+        ----------
+        e : numpy.ndarray
+            Energies (eV)
+
+        Returns
+        -------
+        numpy.ndarray
+            Group index of each energy, -1 for energies outside the bins
+        """
+        idx = np.searchsorted(self.bins, e, side='right') - 1
+        # the upper boundary belongs to the last group
+        idx[e == self.bins[-1]] = self.n_bins - 1
+        idx[(idx < 0) | (idx >= self.n_bins)] = -1
+        return idx
+
+
+class Tally:
+    """
+    Flux tally over mesh and energy bins.
+
+    Events are written to fixed-size buffers during transport and are
+    binned together with :func:`numpy.bincount` when the buffers fill
+    up or a batch ends. Results are normalized per source particle
+    and reported with batch statistics.
+
+    The collision estimator scores weight / sigma at every collision
+    reported to the tally. With delta tracking this is every tentative
+    (real or virtual) collision, scored with the majorant. The
+    track-length estimator scores weight times the length of each
+    flight path in each mesh bin. With delta tracking, flights that
+    leave the geometry are scored up to the end of the sampled flight,
+    so mesh bins outside the geometry should be ignored.
+
+    Parameters
+    ----------
+    mesh : RegularMesh, optional
+        Spatial bins. The whole problem is a single bin if not set.
+    energy_filter : EnergyFilter, optional
+        Energy bins. All energies are a single bin if not set.
+    estimator : {'collision', 'track-length'}
+        Flux estimator
+    buffer_size : int
+        Number of events held before they are binned
+    name : str
+        Name of the tally
+
+    Attributes
+    ----------
+    shape : tuple of int
+        Number of mesh and energy bins
+    n_batches : int
+        Number of completed batches
+    sum : numpy.ndarray
+        Sum of the batch results
+    sum_sq : numpy.ndarray
+        Sum of the squared batch results
+    mean : numpy.ndarray
+        Mean result per source particle
+    std_dev : numpy.ndarray
+        Standard deviation of the mean
+    rel_err : numpy.ndarray
+        Relative error of the mean (infinity for bins with no score)
+    """
+
+    estimators = ('collision', 'track-length')
+
+    def __init__(self, mesh=None, energy_filter=None, estimator='collision',
+                 buffer_size=8192, name=''):
+        cv.check_type('mesh', mesh, RegularMesh, none_ok=True)
+        cv.check_type('energy filter', energy_filter, EnergyFilter, none_ok=True)
+        cv.check_value('estimator', estimator, self.estimators)
+        cv.check_type('buffer size', buffer_size, Integral)
+        cv.check_greater_than('buffer size', buffer_size, 0)
+
+        self.mesh = mesh
+        self.energy_filter = energy_filter
+        self.estimator = estimator
+        self.buffer_size = buffer_size
+        self.name = name
+
+        self.n_batches = 0
+        self.sum = np.zeros(self.shape)
+        self.sum_sq = np.zeros(self.shape)
+        self._batch = np.zeros(self.shape)
+        self._allocate()
+
+    def __repr__(self):
+        return "Tally({!r}, estimator={!r}, shape={}, batches={})".format(
+            self.name, self.estimator, self.shape, self.n_batches)
+
+    def __getstate__(self):
+        # buffers are flushed and not sent between processes
+        self.flush()
+        state = self.__dict__.copy()
+        for key in ('_r0', '_r1', '_e', '_w'):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._allocate()
+
+    def _allocate(self):
+        n = self.buffer_size
+        self._r0 = np.empty((n, 3))
+        self._r1 = np.empty((n, 3))
+        self._e = np.empty(n)
+        self._w = np.empty(n)
+        self._n = 0
+
+    @property
+    def shape(self):
+        n_mesh = self.mesh.n_bins if self.mesh is not None else 1
+        n_energy = self.energy_filter.n_bins if self.energy_filter is not None else 1
+        return (n_mesh, n_energy)
+
+    @property
+    def mean(self):
+        if self.n_batches == 0:
+            return np.zeros(self.shape)
+        return self.sum / self.n_batches
+
+    @property
+    def std_dev(self):
+        n = self.n_batches
+        if n < 2:
+            return np.full(self.shape, np.inf)
+        mean = self.mean
+        var = np.maximum(self.sum_sq / n - mean**2, 0.0) / (n - 1)
+        return np.sqrt(var)
+
+    @property
+    def rel_err(self):
+        mean = self.mean
+        return np.divide(self.std_dev, mean, out=np.full(self.shape, np.inf),
+                         where=mean > 0.0)
+
+    def score_collision(self, r, e, score):
+        """
+        Record a collision
+
+        Parameters
+        ----------
+        r : Iterable of 3 floats
+            Position of the collision
+        e : float
+            Energy of the particle entering the collision (eV)
+        score : float
+            Weight divided by the cross section used to sample the
+            collision
+        """
+        if self.estimator != 'collision':
+            return
+        i = self._n
+        self._r0[i] = r
+        self._e[i] = e
+        self._w[i] = score
+        self._n = i + 1
+        if self._n == self.buffer_size:
+            self.flush()
+
+    def score_track(self, r0, r1, e, wgt):
+        """
+        Record a flight path
+
+        Parameters
+        ----------
+        r0 : Iterable of 3 floats
+            Start of the flight
+        r1 : Iterable of 3 floats
+            End of the flight
+        e : float
+            Energy of the particle during the flight (eV)
+        wgt : float
+            Weight of the particle during the flight
+        """
+        if self.estimator != 'track-length':
+            return
+        i = self._n
+        self._r0[i] = r0
+        self._r1[i] = r1
+        self._e[i] = e
+        self._w[i] = wgt
+        self._n = i + 1
+        if self._n == self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Bin the buffered events into the current batch
+        """
+        n = self._n
+        if n == 0:
+            return
+        r0 = self._r0[:n]
+        e = self._e[:n]
+        w = self._w[:n]
+
+        if self.estimator == 'collision':
+            if self.mesh is not None:
+                mesh_bins = self.mesh.get_indices(r0)
+            else:
+                mesh_bins = np.zeros(n, dtype=np.int64)
+            scores = w
+        else:
+            r1 = self._r1[:n]
+            if self.mesh is not None:
+                events, mesh_bins, lengths = self.mesh.track_lengths(r0, r1)
+            else:
+                events = np.arange(n)
+                mesh_bins = np.zeros(n, dtype=np.int64)
+                lengths = np.linalg.norm(r1 - r0, axis=1)
+            e = e[events]
+            scores = w[events] * lengths
+
+        if self.energy_filter is not None:
+            energy_bins = self.energy_filter.get_indices(e)
+        else:
+            energy_bins = np.zeros(len(e), dtype=np.int64)
+
+        valid = (mesh_bins >= 0) & (energy_bins >= 0)
+        bins = mesh_bins[valid] * self.shape[1] + energy_bins[valid]
+        self._batch += np.bincount(bins, weights=scores[valid],
+                                   minlength=self._batch.size).reshape(self.shape)
+        self._n = 0
+
+    def end_batch(self, n_histories):
+        """
+        Complete a batch of histories and accumulate its result
+
+        Parameters
+        ----------
+        n_histories : int
+            Number of source particles in the batch
+        """
+        cv.check_greater_than('number of histories', n_histories, 0)
+        self.flush()
+        result = self._batch / n_histories
+        self.sum += result
+        self.sum_sq += result**2
+        self.n_batches += 1
+        self._batch[...] = 0.0
+
+    def reset(self):
+        """
+        Discard all batch results and buffered events
+        """
+        self.n_batches = 0
+        self.sum[...] = 0.0
+        self.sum_sq[...] = 0.0
+        self._batch[...] = 0.0
+        self._n = 0
+
+    def merge(self, other):
+        """
+        Add the completed batches of another tally, e.g. one
+        accumulated by a worker process
+
+        Parameters
+        ----------
+        other : Tally
+            Tally with the same bins and estimator
+        """
+        cv.check_type('other', other, Tally)
+        if other.shape != self.shape or other.estimator != self.estimator:
+            raise ValueError('Cannot merge tallies with different bins '
+                             'or estimators')
+        self.sum += other.sum
+        self.sum_sq += other.sum_sq
+        self.n_batches += other.n_batches
+
+
+def reduce_tallies(tallies):
+    """
+    Combine the batches of a set of tallies
+
+    Parameters
+    ----------
+    tallies : Iterable of Tally
+        Tallies with the same bins and estimator, e.g. one per worker
+
+    Returns
+    -------
+    Tally
+        New tally holding the batches of all tallies
+    """
+    tallies = list(tallies)
+    cv.check_length('tallies', tallies, 1)
+    first = tallies[0]
+    out = Tally(first.mesh, first.energy_filter, first.estimator,
+                first.buffer_size, first.name)
+    for tally in tallies:
+        out.merge(tally)
+    return out
+
+
+def score_collision(tallies, p, xs):
+    """
+    Score a collision of a particle with a set of tallies
+
+    Parameters
+    ----------
+    tallies : Iterable of Tally
+        Tallies to score
+    p : Particle
+        Particle entering the collision
+    xs : float
+        Cross section used to sample the collision
+    """
+    score = p.wgt / xs
+    for tally in tallies:
+        tally.score_collision(p.r, p.e, score)
+
+
+def score_track(tallies, p, r0):
+    """
+    Score the flight of a particle with a set of tallies
+
+    Parameters
+    ----------
+    tallies : Iterable of Tally
+        Tallies to score
+    p : Particle
+        Particle at the end of the flight
+    r0 : Iterable of 3 floats
+        Start of the flight
+    """
+    for tally in tallies:
+        tally.score_track(r0, p.r, p.e, p.wgt)
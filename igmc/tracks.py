@@ -0,0 +1,226 @@
+from collections.abc import Callable
+from enum import IntEnum
+from numbers import Integral
+
+import numpy as np
+
+from .results import _npy_header
+from . import checkvalue as cv
+
+
+class TrackEvent(IntEnum):
+    """
+    Types of recorded transport events
+    """
+    # tentative collision accepted as real (treated as real by weighted
+    # delta tracking), or a surface tracking collision
+    REAL = 1
+    # tentative collision rejected
+    VIRTUAL = 2
+    # flight ending outside the geometry
+    LEAKAGE = 3
+    # surface tracking flight to a cell boundary
+    CROSSING = 4
+
+
+# record of a transport event. The position is the event site and the
+# energy that of the particle entering the event. sigma_maj is the cross
+# section the flight was sampled with, sigma_t for surface tracking.
+TRACK_DTYPE = np.dtype([('history', '<i8'),
+                        ('event', '<i1'),
+                        ('r', '<f8', (3,)),
+                        ('e', '<f8'),
+                        ('sigma_t', '<f8'),
+                        ('sigma_maj', '<f8')])
+
+
+class TrackRecorder:
+    """
+    Records the transport events of sampled histories in a preallocated
+    buffer. When the buffer is full its events are appended to a file,
+    or kept in memory if no file is given, and the buffer is reused.
+
+    Histories are sampled when they start: every `every`-th history is
+    recorded if its source particle satisfies `select`. Transport
+    functions only receive the recorder for sampled histories, so
+    histories that are not recorded cost nothing beyond the sampling
+    decision.
+
+    Parameters
+    ----------
+    path : str, optional
+        .npy file the events are written to. Events are kept in memory
+        if not set.
+    capacity : int
+        Number of events held by the buffer
+    every : int
+        Record every this many histories
+    select : Callable, optional
+        Function taking the source particle of a history and returning
+        whether the history is recorded. Must be picklable to be used by
+        worker processes.
+    first_history : int
+        Index of the first source history
+
+    Attributes
+    ----------
+    histories : int
+        Index of the current source history
+    n_events : int
+        Number of recorded events
+    """
+
+    def __init__(self, path=None, capacity=65536, every=1, select=None,
+                 first_history=0):
+        cv.check_type('capacity', capacity, Integral)
+        cv.check_greater_than('capacity', capacity, 0)
+        cv.check_type('every', every, Integral)
+        cv.check_greater_than('every', every, 0)
+        cv.check_type('select', select, Callable, none_ok=True)
+        cv.check_type('first history', first_history, Integral)
+
+        self.path = path
+        self.capacity = capacity
+        self.every = every
+        self.select = select
+        self.histories = first_history
+        self.n_events = 0
+
+        self._events = np.empty(capacity, dtype=TRACK_DTYPE)
+        self._n = 0
+        self._chunks = []
+        self._file = None
+        if path is not None:
+            self._file = open(path, 'wb')
+            self._file.write(_npy_header(TRACK_DTYPE, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self):
+        return "TrackRecorder(path={!r}, every={}, events={})".format(
+            self.path, self.every, self.n_events)
+
+    def start_history(self, p):
+        """
+        Decide whether the history of a source particle is recorded
+
+        Parameters
+        ----------
+        p : Particle
+            Source particle of the history
+
+        Returns
+        -------
+        bool
+            Whether the history is recorded
+        """
+        if self.histories % self.every:
+            return False
+        return self.select is None or bool(self.select(p))
+
+    def end_history(self):
+        """
+        Move on to the next source history
+        """
+        self.histories += 1
+
+    def record(self, p, event, xs, maj_xs):
+        """
+        Record a transport event
+
+        Parameters
+        ----------
+        p : Particle
+            Particle at the event site
+        event : TrackEvent
+            Type of the event
+        xs : float
+            Total cross section at the event site
+        maj_xs : float
+            Cross section the flight was sampled with
+        """
+        i = self._n
+        self._events[i] = (self.histories, event, p.r, p.e, xs, maj_xs)
+        self._n = i + 1
+        if self._n == self.capacity:
+            self.flush()
+
+    def write(self, events):
+        """
+        Add events recorded elsewhere, e.g. by a worker process
+
+        Parameters
+        ----------
+        events : numpy.ndarray
+            Events with dtype :data:`TRACK_DTYPE`
+        """
+        self.flush()
+        self._store(np.asarray(events, dtype=TRACK_DTYPE))
+
+    def flush(self):
+        """
+        Empty the buffer into the file or the events kept in memory
+        """
+        if self._n:
+            self._store(self._events[:self._n].copy())
+            self._n = 0
+
+    def _store(self, events):
+        self.n_events += len(events)
+        if self._file is not None:
+            self._file.write(events.tobytes())
+        else:
+            self._chunks.append(events)
+
+    def take(self):
+        """
+        Remove the events kept in memory
+
+        Returns
+        -------
+        numpy.ndarray
+            Events with dtype :data:`TRACK_DTYPE` in recording order
+        """
+        self.flush()
+        events = np.concatenate(self._chunks) if self._chunks else \
+            np.empty(0, dtype=TRACK_DTYPE)
+        self._chunks = []
+        return events
+
+    def close(self):
+        """
+        Write any buffered events and close the file
+        """
+        if self._file is None:
+            return
+        self.flush()
+        self._file.seek(0)
+        self._file.write(_npy_header(TRACK_DTYPE, self.n_events))
+        self._file.close()
+        self._file = None
+
+
+def read_tracks(path, mmap=True):
+    """
+    Read the events written by :class:`TrackRecorder`
+
+    Parameters
+    ----------
+    path : str
+        Path of the file to read
+    mmap : bool
+        Memory-map the file rather than reading it into memory
+
+    Returns
+    -------
+    numpy.ndarray
+        Structured array with dtype :data:`TRACK_DTYPE`
+    """
+    events = np.load(path, mmap_mode='r' if mmap else None)
+    if events.dtype != TRACK_DTYPE:
+        raise IOError('{} does not contain track events'.format(path))
+    return events
@@ -0,0 +1,408 @@
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from numbers import Real
+
+import numpy as np
+from numpy.random import rand
+
+from .particle import Particle, Termination
+from .surface import distance_to_boundary, TINY_BIT
+from .tally import score_collision, score_track
+from .tracks import TrackEvent
+from . import checkvalue as cv
+
+# relative excess of a material cross section over the majorant that is
+# attributed to rounding: material and majorant tables are interpolated
+# on different energy grids
+MAJORANT_RTOL = 1E-09
+
+
+def check_majorant(xs, maj_xs):
+    """
+    Ensure a material cross section does not exceed the majorant value
+    beyond rounding differences. Transport skips the check for majorants
+    verified in advance (see igmc.verify.verify_majorant).
+    """
+    if xs > maj_xs * (1.0 + MAJORANT_RTOL):
+        raise RuntimeError("Total XS value {} b is greater than the "
+                           "majorant value ({} b).".format(xs, maj_xs))
+
+
+def delta_tracking(p, geometry, majorant, xs_dict, e_min=1E-03, tallies=None,
+                   tracks=None):
+    """
+    Transport a particle using analog delta tracking. Tentative
+    collisions are accepted as real with probability xs / majorant.
+
+    Parameters
+    ----------
+    p : Particle
+        Particle to transport
+    geometry : openmc.Geometry
+        Geometry the particle is transported through
+    majorant : Majorant
+        Majorant cross section for the geometry
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+    e_min : float
+        Energy cutoff (eV)
+    tallies : Iterable of Tally, optional
+        Tallies scored during the history
+    tracks : TrackRecorder, optional
+        Recorder of the tentative collisions of the history
+
+    Returns
+    -------
+    list of Particle
+        Secondary particles produced during the history (always empty
+        for analog tracking)
+    """
+    while p.e > e_min:
+        maj_xs = majorant.calculate_xs(p.e)
+        r0 = p.r
+        p.advance(maj_xs)
+        if tallies:
+            score_track(tallies, p, r0)
+
+        if p.locate(geometry) is None:
+            if tracks is not None:
+                tracks.record(p, TrackEvent.LEAKAGE, 0.0, maj_xs)
+            p.kill(Termination.LEAKAGE)
+            return []
+
+        p.calculate_xs(xs_dict)
+        if not majorant.verified:
+            check_majorant(p.xs, maj_xs)
+        if tallies:
+            score_collision(tallies, p, maj_xs)
+
+        if rand() < p.xs / maj_xs:
+            if tracks is not None:
+                tracks.record(p, TrackEvent.REAL, p.xs, maj_xs)
+            p.scatter()
+        elif tracks is not None:
+            tracks.record(p, TrackEvent.VIRTUAL, p.xs, maj_xs)
+
+    p.kill(Termination.ENERGY_CUTOFF)
+    return []
+
+
+def weighted_delta_tracking(p, geometry, majorant, xs_dict, e_min=1E-03,
+                            collision_prob=0.5, weight_cutoff=0.25,
+                            survival_weight=1.0, split_weight=2.0,
+                            tallies=None, tracks=None):
+    """
+    Transport a particle using weighted delta tracking. Tentative
+    collisions are treated as real with a fixed probability and the
+    particle weight is adjusted to account for the difference between
+    this probability and xs / majorant. The number of events per history
+    is therefore set by the collision probability rather than by how
+    closely the majorant follows the material cross sections.
+
+    Weight spread is controlled with Russian roulette and splitting
+    after each weight adjustment.
+
+    Parameters
+    ----------
+    p : Particle
+        Particle to transport
+    geometry : openmc.Geometry
+        Geometry the particle is transported through
+    majorant : Majorant
+        Majorant cross section for the geometry
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+    e_min : float
+        Energy cutoff (eV)
+    collision_prob : float
+        Probability of treating a tentative collision as real
+    weight_cutoff : float
+        Weight below which Russian roulette is played
+    survival_weight : float
+        Weight assigned to particles surviving Russian roulette
+    split_weight : float
+        Weight above which a particle is split
+    tallies : Iterable of Tally, optional
+        Tallies scored during the history
+    tracks : TrackRecorder, optional
+        Recorder of the tentative collisions of the history. Collisions
+        treated as real are recorded as real.
+
+    Returns
+    -------
+    list of Particle
+        Particles produced by splitting which still need to be transported
+    """
+    if cv.full_checks:
+        cv.check_greater_than('collision probability', collision_prob, 0.0)
+        cv.check_less_than('collision probability', collision_prob, 1.0)
+
+    secondaries = []
+
+    while p.e > e_min:
+        maj_xs = majorant.calculate_xs(p.e)
+        r0 = p.r
+        p.advance(maj_xs)
+        if tallies:
+            score_track(tallies, p, r0)
+
+        if p.locate(geometry) is None:
+            if tracks is not None:
+                tracks.record(p, TrackEvent.LEAKAGE, 0.0, maj_xs)
+            p.kill(Termination.LEAKAGE)
+            return secondaries
+
+        p.calculate_xs(xs_dict)
+        if not majorant.verified:
+            check_majorant(p.xs, maj_xs)
+        if tallies:
+            score_collision(tallies, p, maj_xs)
+
+        # limited to 1 as the check allows for rounding differences
+        ratio = min(p.xs / maj_xs, 1.0)
+        if rand() < collision_prob:
+            if tracks is not None:
+                tracks.record(p, TrackEvent.REAL, p.xs, maj_xs)
+            p.wgt *= ratio / collision_prob
+            p.scatter()
+        else:
+            if tracks is not None:
+                tracks.record(p, TrackEvent.VIRTUAL, p.xs, maj_xs)
+            p.wgt *= (1.0 - ratio) / (1.0 - collision_prob)
+
+        if p.wgt < weight_cutoff:
+            russian_roulette(p, survival_weight)
+            if not p.alive:
+                return secondaries
+        elif p.wgt > split_weight:
+            secondaries += split(p, survival_weight)
+
+    p.kill(Termination.ENERGY_CUTOFF)
+    return secondaries
+
+
+def russian_roulette(p, survival_weight=1.0):
+    """
+    Play Russian roulette with a particle. The particle survives
+    with probability wgt / survival_weight and is assigned the
+    survival weight. Otherwise the history is terminated.
+
+    Parameters
+    ----------
+    p : Particle
+        Particle to play Russian roulette with
+    survival_weight : float
+        Weight assigned to the particle if it survives
+    """
+    if rand() < p.wgt / survival_weight:
+        p.wgt = survival_weight
+    else:
+        p.wgt = 0.0
+        p.kill(Termination.ROULETTE)
+
+
+def split(p, survival_weight=1.0):
+    """
+    Split a particle into copies with weights close to the survival
+    weight. The weight of the original particle is reduced to match the
+    copies so that the total weight is preserved.
+
+    Parameters
+    ----------
+    p : Particle
+        Particle to split
+    survival_weight : float
+        Target weight of the split particles
+
+    Returns
+    -------
+    list of Particle
+        New particles created by the split (not including `p`)
+    """
+    n_split = int(np.ceil(p.wgt / survival_weight))
+    if n_split < 2:
+        return []
+
+    p.wgt /= n_split
+
+    return [Particle(r=p.r.copy(), u=p.u.copy(), e=p.e, wgt=p.wgt)
+            for _ in range(n_split - 1)]
+
+
+def majorant_ratios(geometry, majorant, xs_dict):
+    """
+    Compute the lethargy-averaged ratio of the total cross section
+    to the majorant for each material-filled cell in a geometry.
+    Low values indicate regions where delta tracking spends most of
+    its events on virtual collisions.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry containing the cells
+    majorant : Majorant
+        Majorant cross section for the geometry
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+
+    Returns
+    -------
+    dict
+        Dictionary with cell IDs as keys and the average
+        sigma_t / sigma_maj ratio as values
+    """
+    e_grid = np.asarray(majorant.x_values)
+    maj_xs = np.asarray(majorant.y_values)
+    lethargy = np.diff(np.log(e_grid))
+
+    ratios = {}
+    for cell in geometry.get_all_cells().values():
+        if cell.fill not in xs_dict:
+            continue
+        xs_vals = xs_dict[cell.fill].calculate_xs(e_grid)
+        ratio = np.divide(xs_vals, maj_xs, out=np.ones_like(maj_xs),
+                          where=maj_xs > 0.0)
+        avg = 0.5 * (ratio[1:] + ratio[:-1])
+        ratios[cell.id] = np.sum(avg * lethargy) / np.sum(lethargy)
+
+    return ratios
+
+
+def surface_tracking_cells(ratios, threshold=0.1):
+    """
+    Select cells that should use surface tracking
+
+    Parameters
+    ----------
+    ratios : dict
+        Dictionary with cell IDs as keys and sigma_t / sigma_maj ratios
+        as values (see :func:`majorant_ratios`)
+    threshold : float or dict
+        Cells with a ratio below this value use surface tracking. A
+        dictionary with cell IDs as keys can be used to set a threshold
+        per cell. Cells not present in the dictionary use delta tracking.
+
+    Returns
+    -------
+    set of int
+        IDs of cells flagged for surface tracking
+    """
+    if isinstance(threshold, Mapping):
+        return {cell_id for cell_id, ratio in ratios.items()
+                if cell_id in threshold and ratio < threshold[cell_id]}
+
+    cv.check_type('threshold', threshold, Real)
+    return {cell_id for cell_id, ratio in ratios.items() if ratio < threshold}
+
+
+def hybrid_tracking(p, geometry, majorant, xs_dict, e_min=1E-03,
+                    surface_cells=None, counts=None, tallies=None,
+                    tracks=None):
+    """
+    Transport a particle using delta tracking in most of the geometry
+    and conventional surface tracking in cells flagged as poorly
+    majorized.
+
+    Parameters
+    ----------
+    p : Particle
+        Particle to transport
+    geometry : openmc.Geometry
+        Geometry the particle is transported through
+    majorant : Majorant
+        Majorant cross section for the geometry
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+    e_min : float
+        Energy cutoff (eV)
+    surface_cells : set of int
+        IDs of the cells using surface tracking
+    counts : defaultdict of Counter, optional
+        Per-cell event counts keyed by cell ID. Delta tracking events are
+        counted as 'real' and 'virtual', surface tracking events as
+        'collision' and 'crossing'.
+    tallies : Iterable of Tally, optional
+        Tallies scored during the history. In surface tracking cells
+        collision estimators score real collisions with sigma_t.
+    tracks : TrackRecorder, optional
+        Recorder of the events of the history. Surface tracking
+        collisions and boundary crossings are recorded with sigma_t as
+        the sampling cross section, leakage through a surface tracking
+        crossing with zero cross sections.
+
+    Returns
+    -------
+    list of Particle
+        Secondary particles produced during the history (always empty)
+    """
+    surface_cells = set() if surface_cells is None else surface_cells
+    counts = defaultdict(Counter) if counts is None else counts
+
+    cell = p.locate(geometry)
+
+    while p.e > e_min:
+        if cell is None:
+            if tracks is not None:
+                tracks.record(p, TrackEvent.LEAKAGE, 0.0, 0.0)
+            p.kill(Termination.LEAKAGE)
+            return []
+
+        if cell.id in surface_cells:
+            p.calculate_xs(xs_dict)
+            if p.xs > 0.0:
+                d_collision = -np.log(rand()) / p.xs
+            else:
+                d_collision = np.inf
+            d_boundary = distance_to_boundary(cell, p.r, p.u)
+
+            r0 = p.r
+            if d_boundary < d_collision:
+                p.move(d_boundary + TINY_BIT)
+                if tallies:
+                    score_track(tallies, p, r0)
+                if tracks is not None:
+                    tracks.record(p, TrackEvent.CROSSING, p.xs, p.xs)
+                counts[cell.id]['crossing'] += 1
+            else:
+                p.move(d_collision)
+                p.advance_events += 1
+                if tallies:
+                    score_track(tallies, p, r0)
+                    score_collision(tallies, p, p.xs)
+                if tracks is not None:
+                    tracks.record(p, TrackEvent.REAL, p.xs, p.xs)
+                p.scatter()
+                counts[cell.id]['collision'] += 1
+        else:
+            maj_xs = majorant.calculate_xs(p.e)
+            r0 = p.r
+            p.advance(maj_xs)
+            if tallies:
+                score_track(tallies, p, r0)
+
+            if p.locate(geometry) is None:
+                if tracks is not None:
+                    tracks.record(p, TrackEvent.LEAKAGE, 0.0, maj_xs)
+                p.kill(Termination.LEAKAGE)
+                return []
+
+            p.calculate_xs(xs_dict)
+            if not majorant.verified:
+                check_majorant(p.xs, maj_xs)
+            if tallies:
+                score_collision(tallies, p, maj_xs)
+
+            if rand() < p.xs / maj_xs:
+                if tracks is not None:
+                    tracks.record(p, TrackEvent.REAL, p.xs, maj_xs)
+                p.scatter()
+                counts[p.cell.id]['real'] += 1
+            else:
+                if tracks is not None:
+                    tracks.record(p, TrackEvent.VIRTUAL, p.xs, maj_xs)
+                counts[p.cell.id]['virtual'] += 1
+
+        cell = p.locate(geometry)
+
+    p.kill(Termination.ENERGY_CUTOFF)
+    return []
@@ -0,0 +1,227 @@
+from collections.abc import Mapping
+import hashlib
+
+import numpy as np
+
+from .interpolate import interpolate_sorted
+from .majorant import Max2D, MaterialMajorant
+from .transport import MAJORANT_RTOL
+from .xs import CEXS
+
+
+class MajorantVerification:
+    """
+    Outcome of checking that a majorant bounds a set of cross sections
+
+    Attributes
+    ----------
+    passed : bool
+        Whether the majorant bounds every table at every point checked
+    n_points : int
+        Number of energies checked
+    n_violations : int
+        Number of (table, energy) pairs at which a table exceeds the
+        majorant beyond the tolerance
+    worst_excess : float
+        Largest relative excess of a table over the majorant, xs / maj - 1.
+        Negative if the majorant bounds every table with a margin.
+    energy : float
+        Energy (eV) of the worst excess
+    table : str
+        Name of the table with the worst excess
+    xs : float
+        Value of that table at that energy
+    majorant_xs : float
+        Majorant value at that energy
+    excess_by_table : dict
+        Largest relative excess of each table
+    missed_intersections : int
+        Number of intersections missed while the majorant was merged
+    fingerprint : str
+        SHA-1 digest of the majorant and table data checked
+    """
+
+    def __init__(self, passed, n_points, n_violations, worst_excess, energy,
+                 table, xs, majorant_xs, excess_by_table,
+                 missed_intersections, fingerprint):
+        self.passed = passed
+        self.n_points = n_points
+        self.n_violations = n_violations
+        self.worst_excess = worst_excess
+        self.energy = energy
+        self.table = table
+        self.xs = xs
+        self.majorant_xs = majorant_xs
+        self.excess_by_table = excess_by_table
+        self.missed_intersections = missed_intersections
+        self.fingerprint = fingerprint
+
+    def __bool__(self):
+        return self.passed
+
+    def __repr__(self):
+        return "MajorantVerification(passed={}, violations={}, " \
+            "worst_excess={:.3e})".format(self.passed, self.n_violations,
+                                          self.worst_excess)
+
+    def __str__(self):
+        status = "passed" if self.passed else \
+            "failed at {} of {} points".format(self.n_violations, self.n_points)
+        return "Majorant verification {}: worst excess {:.3e} for {} at " \
+            "{:.6g} eV ({:.6g} vs majorant {:.6g})".format(
+                status, self.worst_excess, self.table, self.energy, self.xs,
+                self.majorant_xs)
+
+    def to_dict(self):
+        """
+        Summary for the metadata of a serialized majorant
+
+        Returns
+        -------
+        dict
+        """
+        return {'passed': self.passed, 'n_points': self.n_points,
+                'n_violations': self.n_violations,
+                'worst_excess': self.worst_excess, 'energy': self.energy,
+                'table': self.table, 'fingerprint': self.fingerprint}
+
+
+def _label(key, table):
+    material = key if key is not None else getattr(table, 'material', None)
+    if material is not None and hasattr(material, 'id'):
+        name = getattr(material, 'name', '')
+        return "material {}{}".format(material.id,
+                                      " ({})".format(name) if name else '')
+    return str(key)
+
+
+def _curve(table):
+    if isinstance(table, CEXS):
+        return table.e_grid, \
+            lambda e: table.calculate_xs(e, assume_sorted=True)
+    if isinstance(table, MaterialMajorant):
+        return np.asarray(table.e_grid, dtype=np.float64), table.xs
+    if isinstance(table, Max2D):
+        x = np.ascontiguousarray(table.x_values, dtype=np.float64)
+        y = np.ascontiguousarray(table.y_values, dtype=np.float64)
+        return x, lambda e: interpolate_sorted(x, y, e)
+    raise TypeError('Cannot verify a majorant against a {}'.format(
+        type(table).__name__))
+
+
+def _fingerprint(majorant, tables):
+    sha = hashlib.sha1()
+    for vals in (majorant.x_values, majorant.y_values):
+        sha.update(np.ascontiguousarray(vals, dtype=np.float64))
+    for _, table in tables:
+        e_grid, evaluate = _curve(table)
+        sha.update(np.ascontiguousarray(e_grid, dtype=np.float64))
+        sha.update(np.ascontiguousarray(evaluate(e_grid), dtype=np.float64))
+    return sha.hexdigest()
+
+
+def _items(tables):
+    if isinstance(tables, Mapping):
+        items = list(tables.items())
+    else:
+        items = [(None, table) for table in tables]
+    # a stable order so that the fingerprint does not depend on hashing
+    return sorted(items, key=lambda item: _label(*item))
+
+
+def verify_majorant(majorant, tables, rtol=MAJORANT_RTOL, record=True):
+    """
+    Check that a majorant bounds a set of cross sections everywhere.
+
+    Every table and the majorant are evaluated at once on the union of
+    all their energy points and the midpoints between consecutive
+    points. Between consecutive points of the union every table and the
+    majorant are linear in energy, so the check covers the whole range.
+    Points just below repeated energies (discontinuities) are added so
+    that the values on both sides are checked. Values are held at the
+    end points outside of a table's range, as during transport.
+
+    Parameters
+    ----------
+    majorant : Majorant
+        Majorant to verify
+    tables : Mapping or Iterable
+        Material cross sections (CEXS), material majorants
+        (MaterialMajorant) or other Max2D data. A mapping such as the
+        material cross section dictionary names each table by its key.
+    rtol : float
+        Relative excess over the majorant attributed to rounding
+    record : bool
+        Set :attr:`Max2D.verified` and record the outcome in the
+        majorant's metadata, which is written with it to file
+
+    Returns
+    -------
+    MajorantVerification
+        Outcome of the check, including the worst violation
+    """
+    items = _items(tables)
+    curves = [_curve(table) for _, table in items]
+
+    maj_x = np.ascontiguousarray(majorant.x_values, dtype=np.float64)
+    maj_y = np.ascontiguousarray(majorant.y_values, dtype=np.float64)
+    grids = [maj_x] + [np.asarray(e, dtype=np.float64) for e, _ in curves]
+    points = np.unique(np.concatenate(grids))
+    repeated = np.concatenate([grid[1:][np.diff(grid) == 0.0] for grid in grids])
+    points = np.unique(np.concatenate((points,
+                                       0.5 * (points[1:] + points[:-1]),
+                                       np.nextafter(repeated, -np.inf))))
+    maj_xs = interpolate_sorted(maj_x, maj_y, points)
+    scale = maj_xs * (1.0 + rtol)
+
+    n_violations = 0
+    excess_by_table = {}
+    worst = (-np.inf, 0, None, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for (key, table), (_, evaluate) in zip(items, curves):
+            xs = evaluate(points)
+            n_violations += int(np.count_nonzero(xs > scale))
+            excess = np.where(maj_xs > 0.0, xs / maj_xs - 1.0,
+                              np.where(xs > 0.0, np.inf, -1.0))
+            i = int(np.argmax(excess))
+            label = _label(key, table)
+            excess_by_table[label] = float(excess[i])
+            if excess[i] > worst[0]:
+                worst = (float(excess[i]), i, label, float(xs[i]))
+
+    worst_excess, i, label, xs = worst
+    result = MajorantVerification(
+        passed=n_violations == 0, n_points=len(points),
+        n_violations=n_violations, worst_excess=worst_excess,
+        energy=float(points[i]), table=label, xs=xs,
+        majorant_xs=float(maj_xs[i]), excess_by_table=excess_by_table,
+        missed_intersections=majorant.missed_intersections,
+        fingerprint=_fingerprint(majorant, items))
+
+    if record:
+        majorant.verified = result.passed
+        majorant.metadata['verification'] = result.to_dict()
+    return result
+
+
+def is_verified(majorant, tables):
+    """
+    Whether the metadata of a majorant, e.g. loaded from file, records a
+    passed verification against the same majorant and table data. Sets
+    :attr:`Max2D.verified` accordingly.
+
+    Parameters
+    ----------
+    majorant : Majorant
+        Majorant to check
+    tables : Mapping or Iterable
+        Tables the majorant must bound (see :func:`verify_majorant`)
+
+    Returns
+    -------
+    bool
+    """
+    record = majorant.metadata.get('verification')
+    majorant.verified = bool(record) and record['passed'] and \
+        record['fingerprint'] == _fingerprint(majorant, _items(tables))
+    return majorant.verified
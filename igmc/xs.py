@@ -1,7 +1,10 @@
 from collections.abc import Iterable
+import copy
 from numbers import Real
 
-from .binary_search import binary_search
+import numpy as np
+
+from .interpolate import interpolate, interpolate_sorted
 from . import checkvalue as cv
 
 class CEXS:
@@ -18,9 +21,9 @@ class CEXS:
 
     Attributes
     ----------
-    e_grid : Iterable of float
+    e_grid : numpy.ndarray
        Energy values for the point-wise data (in eV)
-    xs_vals : Iterable of float
+    xs_vals : numpy.ndarray
        Cross-section data values (b)
     """
     def __init__(self, e_grid, data):
@@ -34,7 +37,7 @@ class CEXS:
     @e_grid.setter
     def e_grid(self, vals):
         cv.check_type('e_grid', vals, Iterable, Real)
-        self._e_grid = vals
+        self._e_grid = np.ascontiguousarray(vals, dtype=np.float64)
 
     @property
     def xs_vals(self):
@@ -43,22 +46,49 @@ class CEXS:
     @xs_vals.setter
     def xs_vals(self, vals):
         cv.check_type('xs data', vals, Iterable, Real)
-        self._data = vals
+        self._data = np.ascontiguousarray(vals, dtype=np.float64)
 
-    def calculate_xs(self, e):
+    def calculate_xs(self, e, out=None, assume_sorted=False):
         """
-        Compute the cross section at the specified energy value
+        Compute the cross section at the specified energy value(s)
+
+        Parameters
+        ----------
+        e : float or Iterable of float
+            Energy value(s) (eV)
+        out : numpy.ndarray, optional
+            Array with the shape of `e` in which to place the result
+        assume_sorted : bool
+            Whether the energy values are a sorted array, which allows a
+            faster lookup (see :func:`interpolate_sorted`)
+
+        Returns
+        -------
+        float or numpy.ndarray
+            Cross section value(s) (b)
         """
-        # return only value if this is a flat xs
-        if len(self.xs_vals) == 1:
-            return self.xs_vals[0]
+        if assume_sorted:
+            return interpolate_sorted(self.e_grid, self.xs_vals, e, out)
+        return interpolate(self.e_grid, self.xs_vals, e, out)
 
-        # determine energy values to interpolate between
-        idx = binary_search(self.e_grid, e)
-        # calculate interpolation factor
-        f = e - self.e_grid[idx]
-        f /= self.e_grid[idx + 1] - self.e_grid[idx]
+    def astype(self, dtype):
+        """
+        Copy of the cross section stored with another precision, e.g.
+        np.float32 to halve the memory and cache traffic of lookups.
+        Energies and values are rounded to nearest; a majorant bounding
+        the copy is obtained with :meth:`igmc.majorant.Majorant.astype`.
 
-        xs = f * self.xs_vals[idx] + (1 - f) * self.xs_vals[idx + 1]
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            Floating point type of the data
 
-        return xs
+        Returns
+        -------
+        CEXS
+            Cross section with data of type `dtype`
+        """
+        out = copy.copy(self)
+        out._e_grid = self._e_grid.astype(dtype)
+        out._data = self._data.astype(dtype)
+        return out
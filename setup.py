@@ -23,15 +23,13 @@ kwargs = {
         'Natural Language :: English',
         'Topic :: Scientific/Engineering'
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ],
 
     # Dependencies
-    'python_requires': '>=3.5',
+    'python_requires': '>=3.8',
     'install_requires': [
-        'openmc>0.11.0', 'atpbar', 'numpy', 'matplotlib'
+        'openmc>0.11.0', 'numpy', 'matplotlib'
     ],
     'extras_require': {
         'test' : ['pytest', 'pytest-qt'],
@@ -1,23 +1,41 @@
 from argparse import ArgumentParser
-from atpbar import atpbar
+from contextlib import nullcontext
+import copy
+import os
+from collections import Counter, defaultdict
+from functools import partial
+from multiprocessing import Pool, SimpleQueue
 
 import numpy as np
-from numpy.random import rand
 
 import openmc
-from openmc.plotter import calculate_cexs
 
-from igmc import ParticleGenerator
-from igmc import majorants_from_geometry, Majorant, CEXS
+from igmc import Particle, ParticleGenerator, Termination
+from igmc import majorants_from_geometry, majorant_from_geometry, Majorant, CEXS
 from igmc import plot_majorant
+from igmc import OpenMCProvider, SyntheticProvider
+from igmc import delta_tracking, weighted_delta_tracking, hybrid_tracking
+from igmc import majorant_ratios, surface_tracking_cells
+from igmc import RegularMesh, EnergyFilter, Tally
+from igmc import RunController
+from igmc import is_verified, verify_majorant
+from igmc import HistoryBuffer, HistoryWriter, TrackRecorder
+from igmc import ProgressReporter, QueueReporter
+from igmc.checkpoint import Checkpoint, table_fingerprint
+from igmc.mixin import next_auto_id, reset_auto_ids, set_auto_id
+from igmc.shared import SharedTables, attach
+from igmc import checkvalue as cv
+from igmc import profiling
 
-def simulate(n_particles, seed, e_min=1E-03, plot=False, verbose=False):
 
-    # set random number seed
-    np.random.seed(seed)
-
-    particle_generator = ParticleGenerator()
+def pincell():
+    """
+    Simple UO2 pincell with zircaloy cladding and borated water
 
+    Returns
+    -------
+    openmc.Geometry
+    """
     # materials
     uo2 = openmc.Material(name='UO2 fuel at 2.4% wt enrichment')
     uo2.set_density('g/cm3', 5.29769)
@@ -46,47 +64,631 @@ def simulate(n_particles, seed, e_min=1E-03, plot=False, verbose=False):
     clad_cell = openmc.Cell(region=+fuel_cyl & -clad_cyl, fill=zircaloy)
     water_cell = openmc.Cell(region=+clad_cyl & -boundary, fill=borated_water)
 
-    geom = openmc.Geometry([fuel_cell, clad_cell, water_cell])
+    return openmc.Geometry([fuel_cell, clad_cell, water_cell])
+
+
+def run_histories(n_particles, transport, geom, majorant, xs_dict,
+                  e_min=1E-03, verbose=False, progress=True, tallies=None,
+                  batch_size=None, reporter=None, recorder=None, tracks=None):
+    """
+    Transport a number of source particles and any secondaries they produce
+
+    Parameters
+    ----------
+    n_particles : int
+        Number of source particles
+    transport : Callable
+        Function transporting a single particle (e.g. delta_tracking)
+    geom : openmc.Geometry
+        Geometry to transport particles through
+    majorant : Majorant
+        Majorant cross section for the geometry
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+    e_min : float
+        Energy cutoff (eV)
+    verbose : bool
+        Print the state of each particle at termination
+    progress : bool
+        Report progress if no reporter is provided
+    tallies : Iterable of Tally, optional
+        Tallies scored by the transport function
+    batch_size : int, optional
+        Number of histories in each tally batch. All histories form a
+        single batch if not set.
+    reporter : ProgressReporter, optional
+        Reporter counting the histories and particle terminations
+    recorder : HistoryBuffer, optional
+        Buffer or writer recording the final state of each particle
+    tracks : TrackRecorder, optional
+        Recorder of the transport events of the histories it samples
+
+    Returns
+    -------
+    leakage : numpy.ndarray
+        Weight leaking from the geometry for each history
+    events : numpy.ndarray
+        Number of events for each history
+    """
+    particle_generator = ParticleGenerator()
+
+    leakage = np.zeros(n_particles)
+    events = np.zeros(n_particles)
+
+    own_reporter = reporter is None and progress
+    if own_reporter:
+        reporter = ProgressReporter(total=n_particles)
+
+    kwargs = {'tallies': tallies} if tallies else {}
+    batch_size = n_particles if batch_size is None else batch_size
+
+    # transport loop
+    for i in range(n_particles):
+        source = particle_generator()
+        # only sampled histories are passed the track recorder
+        history_kwargs = kwargs
+        if tracks is not None and tracks.start_history(source):
+            history_kwargs = dict(kwargs, tracks=tracks)
+
+        bank = [source]
+        while bank:
+            p = bank.pop()
+            bank += transport(p, geom, majorant, xs_dict, e_min,
+                              **history_kwargs)
+
+            events[i] += p.n_events
+            if p.termination == Termination.LEAKAGE:
+                leakage[i] += p.wgt
+                profiling.count('leaked')
+
+            profiling.count('particles')
+            if reporter is not None:
+                reporter.record(p)
+            if recorder is not None:
+                recorder.record(p)
+
+            if verbose:
+                print(p)
+
+        if reporter is not None:
+            reporter.update()
+        if recorder is not None:
+            recorder.end_history()
+        if tracks is not None:
+            tracks.end_history()
+
+        if tallies and ((i + 1) % batch_size == 0 or i + 1 == n_particles):
+            for tally in tallies:
+                tally.end_batch((i % batch_size) + 1)
+
+    if own_reporter:
+        reporter.close()
+
+    return leakage, events
+
+
+# tables attached by each worker process
+_worker = {}
+
+
+def _init_worker(handle, transport, e_min, verbose, tallies, queue, record,
+                 track_options):
+    _worker.update(attach(handle))
+    _worker['transport'] = transport
+    _worker['e_min'] = e_min
+    _worker['verbose'] = verbose
+    # workers only return the batches they run themselves
+    for tally in tallies or []:
+        tally.reset()
+    _worker['tallies'] = tallies
+    _worker['reporter'] = None if queue is None else QueueReporter(queue)
+    _worker['record'] = record
+    _worker['track_options'] = track_options
+
+
+def _run_chunk(args):
+    chunk, n_particles, seed, first_history = args
+    np.random.seed([seed, chunk])
+    # particles are numbered from 1 within the chunk, like the histories
+    reset_auto_ids()
+
+    transport = _worker['transport']
+    tallies = _worker['tallies']
+    reporter = _worker['reporter']
+    # records are returned with history indices counted within the chunk
+    recorder = HistoryBuffer() if _worker['record'] else None
+    # histories are sampled by their index in the whole run
+    tracks = None
+    if _worker['track_options'] is not None:
+        tracks = TrackRecorder(first_history=first_history,
+                               **_worker['track_options'])
+    leakage, events = run_histories(n_particles, transport,
+                                    _worker['geometry'], _worker['majorant'],
+                                    _worker['xs_dict'], _worker['e_min'],
+                                    _worker['verbose'], progress=False,
+                                    tallies=tallies, reporter=reporter,
+                                    recorder=recorder, tracks=tracks)
+    if reporter is not None:
+        reporter.close()
+    records = None if recorder is None else recorder.take()
+    track_events = None if tracks is None else tracks.take()
+    n_ids = next_auto_id(Particle) - 1
+
+    # event counts accumulated by hybrid tracking in this worker
+    counts = None
+    if isinstance(transport, partial) and 'counts' in transport.keywords:
+        counts = dict(transport.keywords['counts'])
+        transport.keywords['counts'].clear()
+
+    # each chunk is one tally batch, returned and then discarded here
+    chunk_tallies = None
+    if tallies:
+        chunk_tallies = copy.deepcopy(tallies)
+        for tally in tallies:
+            tally.reset()
+
+    return leakage, events, counts, chunk_tallies, records, track_events, n_ids
+
+
+def run_parallel(n_particles, seed, processes, transport, geom, majorant,
+                 xs_dict, e_min=1E-03, verbose=False, backend='shm',
+                 tallies=None, controller=None, on_batch=None, reporter=None,
+                 writer=None, tracks=None):
+    """
+    Transport particles using a pool of worker processes. The geometry,
+    majorant and material cross sections are placed in shared memory once
+    and attached by each worker rather than being pickled to every one.
+
+    Parameters
+    ----------
+    n_particles : int
+        Number of source particles
+    seed : int
+        Random number seed. Each chunk of histories uses a stream seeded
+        with the pair (seed, chunk index).
+    processes : int
+        Number of worker processes
+    transport : Callable
+        Function transporting a single particle (e.g. delta_tracking)
+    geom : openmc.Geometry
+        Geometry to transport particles through
+    majorant : Majorant
+        Majorant cross section for the geometry
+    xs_dict : dict
+        Dictionary with materials as keys and CEXS instances as values
+    e_min : float
+        Energy cutoff (eV)
+    verbose : bool
+        Print the state of each particle at termination
+    backend : {'shm', 'mmap'}
+        Storage used for the shared tables
+    tallies : Iterable of Tally, optional
+        Tallies scored by the transport function. Each chunk of histories
+        is one batch and the batches of all workers are merged into these
+        tallies.
+    controller : RunController, optional
+        Controller deciding how many histories are run. Each of its
+        batches is split over the worker processes and `n_particles` is
+        ignored. Chunk indices follow from the controller's batch count so
+        a resumed run uses the same random number streams.
+    on_batch : Callable, optional
+        Function called with the controller after each of its batches
+    reporter : ProgressReporter, optional
+        Reporter the workers send their progress to. It listens to the
+        workers until it is closed.
+    writer : HistoryWriter, optional
+        Writer of the particle records collected by the workers, written
+        in history order
+    tracks : TrackRecorder, optional
+        Recorder the events of the histories sampled by the workers are
+        written to, in history order. Workers sample histories with its
+        settings.
+
+    Returns
+    -------
+    leakage : numpy.ndarray
+        Weight leaking from the geometry for each history
+    events : numpy.ndarray
+        Number of events for each history
+    counts : defaultdict of Counter
+        Per-cell event counts from hybrid tracking (empty otherwise). The
+        counts of a hybrid tracking partial are updated in place.
+    """
+    # tables are shared together so that the materials keying
+    # xs_dict are the same objects as those filling the cells
+    tables = {'geometry': geom, 'majorant': majorant, 'xs_dict': xs_dict}
+
+    # a controlled run splits each of its batches over the workers
+    chunks_per_batch = 4 * processes if controller is None else processes
+
+    if isinstance(transport, partial) and 'counts' in transport.keywords:
+        counts = transport.keywords['counts']
+    else:
+        counts = defaultdict(Counter)
+
+    def run_batch(n_histories):
+        first_chunk = 0 if controller is None else \
+            controller.n_batches * chunks_per_batch
+
+        n_chunks = min(n_histories, chunks_per_batch)
+        chunk_sizes = np.full(n_chunks, n_histories // n_chunks)
+        chunk_sizes[:n_histories % n_chunks] += 1
+
+        first_history = 0 if controller is None else controller.n_particles
+        first_histories = first_history + np.cumsum(chunk_sizes) - chunk_sizes
+
+        chunks = pool.map(_run_chunk, [(first_chunk + i, int(n), seed, int(h))
+                                       for i, (n, h) in enumerate(
+                                           zip(chunk_sizes, first_histories))])
+
+        # particle IDs continue from those of previous chunks in order
+        first_id = next_auto_id(Particle)
+        for n, (_, _, chunk_counts, chunk_tallies, records, track_events,
+                n_ids) in zip(chunk_sizes, chunks):
+            for cell_id, cell_counts in (chunk_counts or {}).items():
+                counts[cell_id].update(cell_counts)
+            for tally, chunk_tally in zip(tallies or [], chunk_tallies or []):
+                tally.merge(chunk_tally)
+            if writer is not None:
+                records['id'] += first_id - 1
+                writer.append(records, int(n))
+            if tracks is not None:
+                tracks.write(track_events)
+            first_id += n_ids
+        set_auto_id(first_id)
+
+        leakage = np.concatenate([chunk[0] for chunk in chunks])
+        events = np.concatenate([chunk[1] for chunk in chunks])
+        return leakage, events
+
+    # workers send their progress to the reporter through a queue
+    queue = None
+    if reporter is not None:
+        queue = SimpleQueue()
+        reporter.listen(queue)
+
+    track_options = None
+    if tracks is not None:
+        track_options = {'capacity': tracks.capacity, 'every': tracks.every,
+                         'select': tracks.select}
+
+    with SharedTables(backend) as shared:
+        handle = shared.share(tables)
+        with Pool(processes, _init_worker,
+                  (handle, transport, e_min, verbose, tallies, queue,
+                   writer is not None, track_options)) as pool:
+            if controller is None:
+                leakage, events = run_batch(n_particles)
+            else:
+                leakage, events = controller.run(run_batch, on_batch)
+
+    return leakage, events, counts
+
+
+def pincell_tallies(mesh_dimension=None, energy_groups=None, e_min=1E-03,
+                    e_max=10.0):
+    """
+    Collision and track-length flux tallies over the pincell
+
+    Parameters
+    ----------
+    mesh_dimension : Iterable of 3 int, optional
+        Number of mesh bins along each axis. The mesh covers the pincell
+        cross section and -2 cm < z < 2 cm.
+    energy_groups : int, optional
+        Number of logarithmically spaced energy groups
+    e_min : float
+        Lower energy of the groups (eV)
+    e_max : float
+        Upper energy of the groups (eV)
+
+    Returns
+    -------
+    list of Tally
+    """
+    mesh = None
+    if mesh_dimension is not None:
+        mesh = RegularMesh((-2.0, -2.0, -2.0), (2.0, 2.0, 2.0), mesh_dimension)
+
+    energy_filter = None
+    if energy_groups is not None:
+        energy_filter = EnergyFilter(np.logspace(np.log10(e_min),
+                                                 np.log10(e_max),
+                                                 energy_groups + 1))
+
+    return [Tally(mesh, energy_filter, 'collision', name='flux (collision)'),
+            Tally(mesh, energy_filter, 'track-length', name='flux (track-length)')]
+
+
+def simulate(n_particles, seed, e_min=1E-03, plot=False, verbose=False,
+             weighted=False, hybrid_threshold=None, processes=1,
+             majorant_file=None, mesh_dimension=None, energy_groups=None,
+             batches=10, target_rel_err=None, time_limit=None,
+             batch_size=None, checkpoint=None, checkpoint_interval=1,
+             restart=None, provider=None, progress_every=None,
+             progress_interval=1.0, history_file=None, track_file=None,
+             track_every=1, majorant_memory=None, single_precision=False):
+    """
+    Run particle histories through the pincell model
+
+    Parameters
+    ----------
+    n_particles : int
+        Number of source particles. The maximum number of source particles
+        if a target relative error or time limit is set.
+    seed : int
+        Random number seed
+    e_min : float
+        Energy cutoff (eV)
+    plot : bool
+        Plot the majorant cross section
+    verbose : bool
+        Print the state of each particle at termination
+    weighted : bool
+        Use weighted delta tracking rather than analog delta tracking
+    hybrid_threshold : float or None
+        If set, cells with an average sigma_t / sigma_maj ratio below
+        this value use surface tracking rather than delta tracking
+    processes : int
+        Number of worker processes used to transport particles
+    majorant_file : str or None
+        HDF5 file the majorant is loaded from if it exists. Otherwise the
+        majorant is computed and written to this file.
+    mesh_dimension : Iterable of 3 int, optional
+        Number of bins along each axis of a flux tally mesh
+    energy_groups : int, optional
+        Number of energy groups of the flux tallies
+    batches : int
+        Number of batches `n_particles` is split into if `batch_size` is
+        not set. Parallel runs split each batch over the workers and
+        score one tally batch per worker chunk.
+    target_rel_err : float, optional
+        Run batches until the relative error of the leakage fraction and
+        of any flux tallies reaches this value
+    time_limit : float, optional
+        Stop running batches once this wall-clock budget (s) is used up
+    batch_size : int, optional
+        Number of histories per batch. Defaults to `n_particles` /
+        `batches`.
+    checkpoint : str, optional
+        HDF5 file to which the state of the run is written at batch
+        boundaries
+    checkpoint_interval : int
+        Number of batches between checkpoints
+    restart : str, optional
+        Checkpoint file to resume the run from. The run must use the same
+        settings. Checkpoints continue to be written to this file if
+        `checkpoint` is not set.
+    provider : XSProvider, optional
+        Provider of the cross sections. Defaults to the OpenMC data
+        library.
+    progress_every : int, optional
+        Number of histories between progress reports
+    progress_interval : float
+        Time (s) between progress reports
+    history_file : str, optional
+        File the final state of every particle is written to, as a .npy
+        file or an HDF5 file if the name ends in '.h5' (see
+        igmc.results.read_histories). A resumed run only writes the
+        histories it runs.
+    track_file : str, optional
+        .npy file the transport events of sampled histories are written
+        to (see igmc.tracks.read_tracks)
+    track_every : int
+        Record the events of every this many histories
+    majorant_memory : int, optional
+        Compute the majorant in energy windows whose working memory
+        (bytes) stays approximately within this bound rather than on the
+        common energy grid of all nuclides
+    single_precision : bool
+        Store the majorant and material cross sections as float32. The
+        majorant is rounded up to bound the rounded material cross
+        sections and is written to `majorant_file` in float32.
+
+    Returns
+    -------
+    dict
+        Run results: number of histories, leakage fraction estimate and
+        its relative error, mean number of events per history, transport
+        time (s), figure of merit of the leakage estimate, the reason
+        the run stopped and the number of particles ended by each
+        termination reason in this run. Per-cell event counts are
+        included for hybrid tracking and flux tallies if a mesh or energy
+        groups are requested.
+    """
+    if weighted and hybrid_threshold is not None:
+        raise ValueError("Weighted delta tracking cannot be combined "
+                         "with hybrid tracking")
+    if plot and majorant_memory is not None:
+        raise ValueError("Material majorants cannot be plotted when the "
+                         "majorant is computed in energy windows")
+
+    # set random number seed
+    np.random.seed(seed)
+
+    geom = pincell()
+    if provider is None:
+        provider = OpenMCProvider()
 
     print("Computing material cross-sections...")
     xs_dict = {}
     for material in geom.get_all_materials().values():
-        e_grid, xs = calculate_cexs(material, 'material', ('total',))
-        xs_dict[material] = CEXS(e_grid, xs[0])
+        xs_dict[material] = CEXS(*provider.material_xs(material))
+
+    loaded = majorant_file is not None and os.path.exists(majorant_file)
+    if loaded:
+        print("Loading majorant cross-section from {}...".format(majorant_file))
+        majorant = Majorant.from_file(majorant_file, provider=provider)
+    elif majorant_memory is not None:
+        print("Computing majorant cross-section...")
+        majorant = majorant_from_geometry(geom, provider,
+                                          max_memory=majorant_memory)
+    else:
+        print("Computing majorant cross-section...")
+        e_grid, majorants = majorants_from_geometry(geom, provider)
+
+        if plot:
+            plot_majorant(e_grid, majorants)
+
+        majorant = Majorant.from_others(e_grid, majorants)
+
+    if single_precision:
+        xs_dict = {material: xs.astype(np.float32)
+                   for material, xs in xs_dict.items()}
+        majorant = majorant.astype(np.float32, xs_dict.values())
 
-    print("Computing majorant cross-section...")
-    e_grid, majorants = majorants_from_geometry(geom)
+    # verified once here rather than at every collision during transport,
+    # unless a loaded majorant records a verification against these tables
+    if is_verified(majorant, xs_dict):
+        print("Majorant verified when written to {}".format(majorant_file))
+    else:
+        verification = verify_majorant(majorant, xs_dict)
+        print(verification)
+        if not verification:
+            print("Checking the majorant at every collision")
 
-    if plot:
-        plot_majorant(e_grid, majorants)
+    # written after verification so that the outcome is recorded
+    if majorant_file is not None and not loaded:
+        majorant.to_file(majorant_file, geom.get_all_materials().values(),
+                         provider=provider)
 
-    majorant = Majorant.from_others(e_grid, majorants)
+    transport = weighted_delta_tracking if weighted else delta_tracking
+
+    if hybrid_threshold is not None:
+        ratios = majorant_ratios(geom, majorant, xs_dict)
+        surface_cells = surface_tracking_cells(ratios, hybrid_threshold)
+        for cell_id, ratio in ratios.items():
+            print("Cell {}: sigma_t / sigma_maj = {:.4f} ({} tracking)".format(
+                  cell_id, ratio, 'surface' if cell_id in surface_cells else 'delta'))
+        cell_events = defaultdict(Counter)
+        transport = partial(hybrid_tracking, surface_cells=surface_cells,
+                            counts=cell_events)
+
+    tallies = None
+    if mesh_dimension is not None or energy_groups is not None:
+        tallies = pincell_tallies(mesh_dimension, energy_groups, e_min)
+
+    if batch_size is None:
+        batch_size = -(-n_particles // batches)
+
+    # a run without a target or time limit stops at n_particles
+    controller = RunController(batch_size, target_rel_err, time_limit,
+                               max_particles=n_particles, tallies=tallies)
+    counts = cell_events if hybrid_threshold is not None else None
+
+    settings = {'n_particles': n_particles, 'seed': seed, 'e_min': e_min,
+                'weighted': weighted, 'hybrid_threshold': hybrid_threshold,
+                'processes': processes, 'batch_size': batch_size,
+                'target_rel_err': target_rel_err, 'time_limit': time_limit,
+                'mesh_dimension': mesh_dimension, 'energy_groups': energy_groups}
+    fingerprint = table_fingerprint(majorant, xs_dict)
+
+    if restart is not None:
+        state = Checkpoint.from_file(restart)
+        state.check(settings, fingerprint)
+        state.restore(controller, tallies, counts)
+        print("Resuming from {} after {} batches ({} histories)...".format(
+              restart, controller.n_batches, controller.n_particles))
+        checkpoint = restart if checkpoint is None else checkpoint
+
+    def write_checkpoint(controller):
+        if checkpoint is not None and \
+           controller.n_batches % checkpoint_interval == 0:
+            Checkpoint.from_run(settings, fingerprint, controller,
+                                tallies, counts).to_file(checkpoint)
 
     print("Running particles...")
 
-    # transport loop
-    for _ in atpbar(range(n_particles)):
-        p = particle_generator()
-        while p.e > e_min:
-            maj_xs = majorant.calculate_xs(p.e)
-            p.advance(maj_xs)
-            p.locate(geom)
+    reporter = ProgressReporter(total=n_particles - controller.n_particles,
+                                every=progress_every,
+                                interval=progress_interval)
+    writer = None
+    if history_file is not None:
+        writer = HistoryWriter(history_file,
+                               first_history=controller.n_particles)
+
+    tracks = None
+    if track_file is not None:
+        tracks = TrackRecorder(track_file, every=track_every,
+                               first_history=controller.n_particles)
+
+    with reporter, writer if writer is not None else nullcontext(), \
+            tracks if tracks is not None else nullcontext():
+        if processes > 1:
+            leakage, events, _ = run_parallel(n_particles, seed, processes,
+                                              transport, geom, majorant,
+                                              xs_dict, e_min, verbose,
+                                              tallies=tallies,
+                                              controller=controller,
+                                              on_batch=write_checkpoint,
+                                              reporter=reporter,
+                                              writer=writer, tracks=tracks)
+        else:
+            run_batch = partial(run_histories, transport=transport, geom=geom,
+                                majorant=majorant, xs_dict=xs_dict,
+                                e_min=e_min, verbose=verbose, tallies=tallies,
+                                reporter=reporter, recorder=writer,
+                                tracks=tracks)
+            leakage, events = controller.run(run_batch, write_checkpoint)
+    elapsed = controller.elapsed
+
+    n_run = len(leakage)
+    mean = leakage.mean()
+    std_dev = leakage.std(ddof=1) / np.sqrt(n_run)
+    rel_err = std_dev / mean if mean > 0.0 else np.inf
 
-            if not p.cell:
-                print('Particle left geometry')
-                break
+    results = {'particles': n_run,
+               'leakage': mean,
+               'leakage_rel_err': rel_err,
+               'events_per_history': events.mean(),
+               'time': elapsed,
+               'fom': 1.0 / (rel_err**2 * elapsed) if rel_err > 0.0 else np.inf,
+               'stop_reason': controller.stop_reason,
+               'batches': controller.n_batches,
+               'terminations': {reason.name: n for reason, n
+                                in reporter.terminations.items()}}
 
-            p.calculate_xs(xs_dict)
+    print("Histories run: {} ({})".format(n_run, results['stop_reason'].value))
+    print("Leakage fraction: {:.5f} +/- {:.2%}".format(mean, rel_err))
+    print("Events per history: {:.2f}".format(results['events_per_history']))
+    print("Figure of merit: {:.4g}".format(results['fom']))
 
-            if p.xs > maj_xs:
-                raise RuntimeError("Total XS value {} b is greater than the "
-                                   "majorant value ({} b).".format(p.xs, maj_xs))
+    if hybrid_threshold is not None:
+        results['cell_events'] = cell_events
+        print("{:>6} {:>10} {:>10} {:>10} {:>10}".format(
+              "Cell", "Real", "Virtual", "Collision", "Crossing"))
+        for cell_id, counts in sorted(cell_events.items()):
+            print("{:>6} {:>10} {:>10} {:>10} {:>10}".format(
+                  cell_id, counts['real'], counts['virtual'],
+                  counts['collision'], counts['crossing']))
 
-            if rand() < p.xs / maj_xs:
-                p.scatter()
+    if tallies is not None:
+        results['tallies'] = tallies
+        for tally in tallies:
+            scored = tally.mean > 0.0
+            max_err = tally.rel_err[scored].max() if scored.any() else np.inf
+            print("{}: {} batches, total {:.5g}, max rel. err. {:.2%}".format(
+                  tally.name, tally.n_batches, tally.mean.sum(), max_err))
+
+    return results
+
+
+def compare_tracking(n_particles, seed, e_min=1E-03, provider=None):
+    """
+    Compare the figure of merit of the leakage estimate for
+    analog and weighted delta tracking on the pincell model
+    """
+    analog = simulate(n_particles, seed, e_min, provider=provider)
+    weighted = simulate(n_particles, seed, e_min, weighted=True,
+                        provider=provider)
+
+    print("{:>10} {:>10} {:>10} {:>10} {:>10}".format(
+          "Tracking", "Leakage", "Rel. Err.", "Events", "FOM"))
+    for name, res in (('analog', analog), ('weighted', weighted)):
+        print("{:>10} {:>10.5f} {:>10.2%} {:>10.2f} {:>10.4g}".format(
+              name, res['leakage'], res['leakage_rel_err'],
+              res['events_per_history'], res['fom']))
 
-        if verbose:
-            print(p)
 
 if __name__ == "__main__":
 
@@ -102,6 +704,116 @@ if __name__ == "__main__":
                     help="Random number seed (int)")
     ap.add_argument("--verbose", action='store_true',
                     default=False, help="Verbose output")
+    ap.add_argument("--weighted", action='store_true',
+                    default=False, help="Use weighted delta tracking")
+    ap.add_argument("--compare-tracking", action='store_true',
+                    default=False, help="Compare the figure of merit of "
+                    "analog and weighted delta tracking")
+    ap.add_argument("--hybrid-threshold", type=float, default=None,
+                    help="Use surface tracking in cells with an average "
+                    "sigma_t / sigma_maj ratio below this value")
+    ap.add_argument("--processes", type=int, default=1,
+                    help="Number of worker processes")
+    ap.add_argument("--majorant-file", type=str, default=None,
+                    help="HDF5 file to load the majorant from, or to "
+                    "write it to if the file does not exist")
+
+    ap.add_argument("--majorant-memory", type=int, default=None,
+                    metavar='BYTES', help="Compute the majorant in energy "
+                    "windows using about this much working memory")
+    ap.add_argument("--single-precision", action='store_true', default=False,
+                    help="Store the majorant and material cross sections "
+                    "as float32, with the majorant rounded up")
+    ap.add_argument("--mesh", type=int, nargs=3, default=None,
+                    metavar=('NX', 'NY', 'NZ'),
+                    help="Tally the flux on a mesh with this many bins "
+                    "along each axis")
+    ap.add_argument("--energy-groups", type=int, default=None,
+                    help="Tally the flux in this many energy groups")
+    ap.add_argument("--batches", type=int, default=10,
+                    help="Number of batches the particles are split into")
+    ap.add_argument("--target-rel-err", type=float, default=None,
+                    help="Run batches until the relative error of the "
+                    "leakage fraction and any flux tallies reaches this "
+                    "value (--particles becomes the maximum)")
+    ap.add_argument("--time-limit", type=float, default=None,
+                    help="Wall-clock budget (s) for running batches")
+    ap.add_argument("--batch-size", type=int, default=None,
+                    help="Histories per batch")
+    ap.add_argument("--checkpoint", type=str, default=None,
+                    help="HDF5 file to write the state of the run to at "
+                    "batch boundaries")
+    ap.add_argument("--checkpoint-interval", type=int, default=1,
+                    help="Number of batches between checkpoints")
+    ap.add_argument("--restart", type=str, default=None,
+                    help="Checkpoint file to resume the run from")
+    ap.add_argument("--synthetic", type=int, default=None, metavar='POINTS',
+                    help="Use synthetic cross sections with this many "
+                    "energy points per nuclide rather than the OpenMC "
+                    "data library")
+    ap.add_argument("--validation", choices=cv.VALIDATION_LEVELS,
+                    default=None, help="Validation level: 'full' checks "
+                    "every value, 'boundary' only checks inputs at public "
+                    "entry points and 'off' disables checks (default: "
+                    "IGMC_VALIDATION or 'full')")
+    ap.add_argument("--progress-every", type=int, default=None,
+                    help="Report progress every this many histories")
+    ap.add_argument("--progress-interval", type=float, default=1.0,
+                    help="Time (s) between progress reports")
+    ap.add_argument("--history-file", type=str, default=None,
+                    help="Write the final state of every particle to this "
+                    ".npy file (HDF5 if the name ends in .h5)")
+    ap.add_argument("--tracks", type=str, default=None, metavar='FILE',
+                    help="Write the transport events of sampled histories "
+                    "to this .npy file")
+    ap.add_argument("--track-every", type=int, default=1, metavar='K',
+                    help="Record the events of every K-th history")
+    ap.add_argument("--profile", type=str, default=None, metavar='PREFIX',
+                    help="Time the transport stages and majorant "
+                    "construction (main process only) and write "
+                    "PREFIX.json and a PREFIX.trace.json Chrome trace")
+    ap.add_argument("--trace-calls", action='store_true', default=False,
+                    help="Record every hot path call in the profile trace")
 
     args = ap.parse_args()
-    simulate(args.particles, args.seed, args.e_min, args.plot, args.verbose)
+
+    if args.validation is not None:
+        # worker processes read the level from the environment
+        os.environ['IGMC_VALIDATION'] = args.validation
+        cv.set_validation_level(args.validation)
+
+    provider = None
+    if args.synthetic is not None:
+        provider = SyntheticProvider(args.synthetic)
+
+    profiler = None
+    if args.profile is not None:
+        profiler = profiling.Profiler(trace_calls=args.trace_calls)
+
+    with profiler if profiler is not None else nullcontext():
+        if args.compare_tracking:
+            compare_tracking(args.particles, args.seed, args.e_min, provider)
+        else:
+            simulate(args.particles, args.seed, args.e_min, plot=args.plot,
+                     verbose=args.verbose, weighted=args.weighted,
+                     hybrid_threshold=args.hybrid_threshold,
+                     processes=args.processes,
+                     majorant_file=args.majorant_file,
+                     mesh_dimension=args.mesh,
+                     energy_groups=args.energy_groups, batches=args.batches,
+                     target_rel_err=args.target_rel_err,
+                     time_limit=args.time_limit, batch_size=args.batch_size,
+                     checkpoint=args.checkpoint,
+                     checkpoint_interval=args.checkpoint_interval,
+                     restart=args.restart, provider=provider,
+                     progress_every=args.progress_every,
+                     progress_interval=args.progress_interval,
+                     history_file=args.history_file, track_file=args.tracks,
+                     track_every=args.track_every,
+                     majorant_memory=args.majorant_memory,
+                     single_precision=args.single_precision)
+
+    if profiler is not None:
+        print(profiler.summary())
+        profiler.to_json(args.profile + '.json')
+        profiler.to_chrome_trace(args.profile + '.trace.json')
@@ -0,0 +1,10 @@
+import pytest
+
+from igmc import checkvalue as cv
+
+
+@pytest.fixture(autouse=True)
+def full_validation():
+    # tests run with every check regardless of IGMC_VALIDATION
+    with cv.validation_level('full'):
+        yield
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from igmc.bank import ParticleBank
+from igmc.interpolate import interpolate, interpolate_sorted
+from igmc.majorant import Majorant
+from igmc.xs import CEXS
+
+
+@pytest.mark.parametrize('n_values', [5, 1000])
+def test_interpolate_sorted(n_values):
+    # repeated point and values outside the data range
+    x = np.array([1.0, 2.0, 2.0, 4.0, 8.0])
+    y = np.array([1.0, 3.0, 5.0, 2.0, 0.0])
+    e = np.sort(np.random.default_rng(1).uniform(0.0, 10.0, n_values))
+    e[:3] = [0.5, 2.0, 2.0]
+    e.sort()
+
+    assert np.array_equal(interpolate_sorted(x, y, e), interpolate(x, y, e))
+
+
+def test_bank_lookup():
+    rng = np.random.default_rng(0)
+    e_grid = np.logspace(-5, 7, 200)
+    tables = [CEXS(e_grid, rng.uniform(1.0, 10.0, 200)) for _ in range(3)]
+    majorant = Majorant()
+    for xs in tables:
+        majorant.update(e_grid, xs.xs_vals)
+
+    e = 10.0**rng.uniform(-5, 7, 500)
+    material = rng.integers(0, 3, 500)
+    bank = ParticleBank(e, material, sort_every=2, index=np.arange(500))
+    maj_xs = bank.majorant_xs(majorant)
+    xs = bank.material_xs(tables)
+
+    bank.end_event()
+    assert not bank.is_sorted
+    bank.end_event()
+    assert bank.is_sorted
+    assert np.all(np.diff(bank.material) >= 0)
+    for m, run in bank.segments():
+        assert np.all(bank.material[run] == m)
+        assert np.all(np.diff(bank.e[run]) >= 0.0)
+
+    # the same values, reordered with the bank
+    index = bank.arrays['index']
+    assert np.array_equal(bank.e, e[index])
+    assert np.array_equal(bank.majorant_xs(majorant), maj_xs[index])
+    assert np.array_equal(bank.material_xs(tables), xs[index])
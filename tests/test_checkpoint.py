@@ -0,0 +1,122 @@
+
+import numpy as np
+import pytest
+
+from igmc.checkpoint import Checkpoint
+from igmc.mixin import reset_auto_ids
+from igmc.particle import Particle
+from igmc.particle_gen import ParticleGenerator
+from igmc.results import HistoryBuffer
+from igmc.run_control import RunController
+from igmc.tally import Tally
+
+
+def make_run():
+    tally = Tally(name='flux')
+    controller = RunController(100, max_particles=600, tallies=[tally])
+
+    def run_batch(n):
+        leakage = (np.random.rand(n) < 0.3).astype(float)
+        for _ in range(n):
+            tally.score_collision((0.0, 0.0, 0.0), 1.0, np.random.rand())
+        tally.end_batch(n)
+        return leakage, np.random.poisson(20.0, n).astype(float)
+
+    return controller, tally, run_batch
+
+
+def test_restart(tmp_path):
+    settings = {'seed': 1, 'mesh_dimension': (2, 2, 1)}
+    path = str(tmp_path / 'checkpoint.h5')
+
+    np.random.seed(1)
+    controller, tally, run_batch = make_run()
+    leakage, events = controller.run(run_batch)
+
+    # interrupt a second run after three batches
+    class Interrupt(Exception):
+        pass
+
+    def write(controller):
+        Checkpoint.from_run(settings, 'abc', controller, [tally_b]).to_file(path)
+        if controller.n_batches == 3:
+            raise Interrupt
+
+    np.random.seed(1)
+    controller_b, tally_b, run_batch_b = make_run()
+    with pytest.raises(Interrupt):
+        controller_b.run(run_batch_b, write)
+
+    np.random.seed(2)
+    controller_c, tally_c, run_batch_c = make_run()
+    state = Checkpoint.from_file(path)
+    state.check({'seed': 1, 'mesh_dimension': [2, 2, 1]}, 'abc')
+    state.restore(controller_c, [tally_c])
+    leakage_c, events_c = controller_c.run(run_batch_c)
+
+    assert np.array_equal(leakage, leakage_c)
+    assert np.array_equal(events, events_c)
+    assert tally_c.n_batches == tally.n_batches == 6
+    assert np.array_equal(tally_c.sum, tally.sum)
+    assert np.array_equal(tally_c.sum_sq, tally.sum_sq)
+
+    with pytest.raises(ValueError):
+        state.check({'seed': 2, 'mesh_dimension': [2, 2, 1]}, 'abc')
+    with pytest.raises(ValueError):
+        state.check(settings, 'def')
+
+
+def test_restart_particle_ids(tmp_path):
+    path = str(tmp_path / 'checkpoint.h5')
+
+    def run(recorder, on_batch=None, checkpoint=None):
+        source = ParticleGenerator()
+        controller = RunController(100, max_particles=600)
+        if checkpoint is not None:
+            checkpoint.restore(controller)
+
+        def run_batch(n):
+            for _ in range(n):
+                p = source()
+                # e.g. secondaries created by splitting take IDs as well
+                if np.random.rand() < 0.5:
+                    Particle()
+                recorder.record(p)
+                recorder.end_history()
+            return np.zeros(n), np.ones(n)
+
+        controller.run(run_batch, on_batch)
+
+    reset_auto_ids()
+    np.random.seed(1)
+    recorder = HistoryBuffer()
+    run(recorder)
+    records = recorder.take()
+
+    # interrupt a second run after three batches
+    class Interrupt(Exception):
+        pass
+
+    def write(controller):
+        Checkpoint.from_run({}, 'abc', controller).to_file(path)
+        if controller.n_batches == 3:
+            raise Interrupt
+
+    reset_auto_ids()
+    np.random.seed(1)
+    recorder = HistoryBuffer()
+    with pytest.raises(Interrupt):
+        run(recorder, write)
+    records_b = recorder.take()
+
+    # resume in a fresh state, in which IDs are numbered from 1 again
+    reset_auto_ids()
+    state = Checkpoint.from_file(path)
+    recorder = HistoryBuffer(first_history=300)
+    run(recorder, checkpoint=state)
+    records_c = recorder.take()
+
+    restarted = np.concatenate((records_b, records_c))
+    assert np.array_equal(restarted['history'], records['history'])
+    assert np.array_equal(restarted['id'], records['id'])
+    assert np.array_equal(restarted['r'], records['r'])
@@ -0,0 +1,35 @@
+import pytest
+
+from igmc import checkvalue as cv
+from igmc.particle import Particle
+from igmc.tally import Tally
+
+
+def test_validation_levels(monkeypatch):
+    assert cv.get_validation_level() == 'full'
+
+    with pytest.raises(TypeError):
+        Particle(e='fast')
+
+    # internal checks are skipped, public entry points still validate
+    with cv.validation_level('boundary'):
+        assert not cv.full_checks
+        p = Particle(e='fast')
+        assert p.e == 'fast'
+        with pytest.raises(ValueError):
+            Tally(estimator='surface')
+
+    with cv.validation_level('off'):
+        Tally(estimator='surface')
+        cv.check_type('value', 1.0, str)
+
+    assert cv.get_validation_level() == 'full'
+    assert cv.full_checks
+    with pytest.raises(ValueError):
+        cv.set_validation_level('some')
+
+    monkeypatch.setenv('IGMC_VALIDATION', 'Boundary')
+    assert cv._level_from_env() == 'boundary'
+    monkeypatch.setenv('IGMC_VALIDATION', 'none')
+    with pytest.warns(UserWarning):
+        assert cv._level_from_env() == 'full'
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from igmc.csg import compile_geometry
+
+
+def test_compiled_geometry():
+    openmc = pytest.importorskip('openmc')
+
+    fuel = openmc.Material()
+    water = openmc.Material()
+    cyl = openmc.ZCylinder(r=1.0)
+    sphere = openmc.Sphere(x0=1.5, r=0.5)
+    boundary = openmc.Sphere(r=3.0)
+    top = openmc.ZPlane(z0=2.0)
+    cells = [openmc.Cell(fill=fuel, region=-cyl & -top),
+             # void bubble overlapping the fuel, which is found first
+             openmc.Cell(region=-sphere),
+             openmc.Cell(fill=water, region=~(-cyl & -top) & (-boundary | -top)),
+             ]
+    geometry = openmc.Geometry(cells)
+
+    compiled = compile_geometry(geometry)
+    assert compile_geometry(geometry) is compiled
+    assert len(compiled.surfaces) == 4
+
+    r = np.random.default_rng(0).uniform(-4.0, 4.0, (2000, 3))
+    expected = []
+    for point in r:
+        found = geometry.find(point)
+        expected.append(cells.index(found[-1]) if found else -1)
+    index = compiled.locate(r)
+    assert np.array_equal(index, expected)
+    assert set(index) == {-1, 0, 1, 2}
+
+    fills = compiled.fill_indices(r, [water, fuel])
+    assert np.array_equal(fills, np.choose(index + 1, [-1, 1, -1, 0]))
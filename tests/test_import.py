@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+import igmc
+
+
+def test_lazy_import():
+    # importing the package loads no submodule or heavy dependency
+    code = ("import sys, igmc; "
+            "print(sorted(m for m in sys.modules if m.startswith("
+            "('igmc.', 'openmc', 'matplotlib'))))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True).stdout
+    assert out.strip() == '[]'
+
+    # every exported name resolves to its defining submodule
+    for module, names in igmc._exports.items():
+        for name in names:
+            assert getattr(igmc, name) is getattr(
+                sys.modules['igmc.' + module], name)
+    assert set(igmc.__all__) <= set(dir(igmc))
+    with pytest.raises(AttributeError):
+        igmc.not_exported
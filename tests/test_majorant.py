@@ -1,8 +1,16 @@
 
+from collections import defaultdict
 import numpy as np
 from numpy.testing import assert_array_equal, assert_array_almost_equal
+import pytest
 
-from igmc.majorant import Max2D
+from igmc.majorant import (Max2D, Majorant, MaterialMajorant, MicroMajorant,
+                           TemperatureRangeMajorant, bracketing_temperatures,
+                           round_up)
+from igmc.majorant_funcs import MajorantBuilder, energy_windows, material_key
+from igmc.providers import SyntheticProvider, XSProvider
+from igmc.verify import verify_majorant
+from igmc.xs import CEXS
 
 
 def test_majorant():
@@ -24,10 +32,329 @@ def test_majorant():
 
     exp_majorant_e_grid = (1.0, 1.625, 1.75, 2.5, 2.794118,
                            2.9, 3.5, 3.75, 4.0, 4.5, 5.5,
-                           6.0, 7.0, 7.0)
+                           6.0, 7.0)
     exp_majorant_xs = (1.0, 1.0, 2.0, 2.0, 2.588235,
                        4.0, 4.0, 3.0, 3.0, 2.0,
-                       2.0, 3.0, 3.0, 3.0)
+                       2.0, 3.0, 3.0)
 
     assert_array_almost_equal(exp_majorant_e_grid, majorant.x_values)
     assert_array_almost_equal(exp_majorant_xs, majorant.y_values)
+
+
+def test_material_dedup():
+    openmc = pytest.importorskip('openmc')
+
+    def water(temperature=None):
+        mat = openmc.Material(temperature=temperature)
+        mat.set_density('g/cm3', 1.0)
+        mat.add_nuclide('H1', 2.0)
+        mat.add_nuclide('O16', 1.0)
+        return mat
+
+    water_a = water(300.0)
+    water_b = water(600.0)
+    fuel = openmc.Material(temperature=900.0)
+    fuel.set_density('g/cm3', 10.0)
+    fuel.add_nuclide('U238', 1.0)
+    fuel.add_nuclide('O16', 2.0)
+
+    # identical compositions share a key
+    assert material_key(water_a) == material_key(water_b)
+    assert material_key(water_a) != material_key(fuel)
+
+    water_b.set_density('g/cm3', 0.7)
+    assert material_key(water_a) != material_key(water_b)
+
+    # temperature requirements are unioned across materials
+    builder = MajorantBuilder([water_a, water_b, fuel])
+    nuclide_temps = builder._nuclide_temps()
+    assert nuclide_temps['O16'] == {300.0, 600.0, 900.0}
+    assert nuclide_temps['H1'] == {300.0, 600.0}
+    assert nuclide_temps['U238'] == {900.0}
+
+
+def test_builder_updates():
+    openmc = pytest.importorskip('openmc')
+
+    class CountingProvider(SyntheticProvider):
+        def __init__(self):
+            super().__init__(300)
+            self.calls = []
+
+        def nuclide_xs(self, nuclide, temperature):
+            self.calls.append((nuclide, temperature))
+            return super().nuclide_xs(nuclide, temperature)
+
+    def material(nuclides, density, temperature):
+        mat = openmc.Material(temperature=temperature)
+        mat.set_density('g/cm3', density)
+        for name, percent in nuclides:
+            mat.add_nuclide(name, percent)
+        return mat
+
+    def assert_same(builder, materials):
+        fresh = MajorantBuilder(materials, provider=SyntheticProvider(300))
+        assert_array_equal(builder.e_grid, fresh.e_grid)
+        assert_array_almost_equal(builder.majorant.y_values,
+                                  fresh.majorant.y_values)
+
+    water = material([('H1', 2.0), ('O16', 1.0)], 1.0, 600.0)
+    fuel = material([('U238', 1.0), ('O16', 2.0)], 10.0, 900.0)
+    provider = CountingProvider()
+    builder = MajorantBuilder([water, fuel], provider=provider)
+    assert_same(builder, [water, fuel])
+
+    # a density change re-evaluates the material without nuclear data
+    provider.calls.clear()
+    water.set_density('g/cm3', 0.7)
+    builder.update_material(water)
+    assert_same(builder, [water, fuel])
+    assert provider.calls == []
+
+    # a temperature change only recomputes the nuclides of the material
+    fuel.temperature = 1200.0
+    builder.update_material(fuel)
+    assert_same(builder, [water, fuel])
+    assert {name for name, _ in provider.calls} == {'O16', 'U238'}
+    assert ('U238', 1200.0) in provider.calls
+
+    # removing the fuel narrows the temperatures of O16 only
+    provider.calls.clear()
+    builder.remove_material(fuel)
+    assert_same(builder, [water])
+    assert provider.calls == [('O16', 600.0)]
+    assert set(builder.nuclide_majorants) == {'H1', 'O16'}
+
+    with pytest.raises(ValueError):
+        builder.update_material(fuel)
+
+    # editing one of two materials sharing a composition
+    other = material([('H1', 2.0), ('O16', 1.0)], 0.7, 600.0)
+    builder.add_material(other)
+    builder.majorant
+    water.set_density('g/cm3', 0.5)
+    builder.update_material(water)
+    assert_same(builder, [water, other])
+    assert {id(m.material) for m in builder.material_majorants} == \
+        {id(water), id(other)}
+
+
+def test_material_number_densities():
+    openmc = pytest.importorskip('openmc')
+
+    def water(percents, percent_type):
+        mat = openmc.Material()
+        mat.set_density('g/cm3', 1.0)
+        for name, percent in zip(('H1', 'O16'), percents):
+            mat.add_nuclide(name, percent, percent_type)
+        return mat
+
+    # atom densities (atom/b-cm), not atom fractions scaled by 10e-24
+    atoms = water((2.0, 1.0), 'ao')
+    total = openmc.data.AVOGADRO / atoms.average_molar_mass * 1E-24
+    densities = MaterialMajorant(atoms).number_densities
+    assert densities['H1'] == pytest.approx(2.0 / 3.0 * total)
+    assert densities['O16'] == pytest.approx(1.0 / 3.0 * total)
+
+    # weight percents are converted to atom densities
+    mass = openmc.data.atomic_mass
+    weights = water((2.0 * mass('H1'), mass('O16')), 'wo')
+    for name, density in MaterialMajorant(weights).number_densities.items():
+        assert density == pytest.approx(densities[name])
+
+
+def test_material_majorant_cache():
+    openmc = pytest.importorskip('openmc')
+
+    mat = openmc.Material()
+    mat.set_density('g/cm3', 1.0)
+    mat.add_nuclide('H1', 2.0)
+    mat.add_nuclide('O16', 1.0)
+
+    e_grid = np.array([1.0, 2.0, 3.0])
+    e_grid.flags.writeable = False
+    nuclide_majorants = defaultdict(MicroMajorant)
+    for name, values in (('H1', [1.0, 2.0, 3.0]), ('O16', [4.0, 4.0, 4.0])):
+        majorant = MicroMajorant.__new__(MicroMajorant)
+        Max2D.__init__(majorant)
+        majorant.update(e_grid, np.array(values))
+        nuclide_majorants[name] = majorant
+
+    mat_majorant = MaterialMajorant(mat, nuclide_majorants)
+    densities = mat_majorant.number_densities
+    expected = densities['H1'] * np.array([1.0, 2.0, 3.0]) + \
+        densities['O16'] * np.array([4.0, 4.0, 4.0])
+
+    xs = mat_majorant.xs(e_grid)
+    assert_array_almost_equal(xs, expected)
+    assert mat_majorant.xs(e_grid) is xs
+
+    # writable grids are evaluated on every call and not cached
+    assert mat_majorant.xs(e_grid.copy()) is not xs
+    assert_array_equal(mat_majorant.xs(list(e_grid)), xs)
+    assert len(mat_majorant._xs_cache) == 1
+
+    # off-grid evaluation interpolates the nuclide majorants
+    assert_array_almost_equal(mat_majorant.xs([1.5]), 0.5 * (expected[:1] + expected[1:2]))
+
+    # in-place changes to the material are applied by clearing the cache
+    mat.set_density('g/cm3', 2.0)
+    assert mat_majorant.xs(e_grid) is xs
+    mat_majorant.clear_cache()
+    assert_array_almost_equal(mat_majorant.xs(e_grid), 2.0 * expected)
+
+    # setting the material discards the cached values
+    mat.set_density('g/cm3', 1.0)
+    mat_majorant.material = mat
+    assert_array_almost_equal(mat_majorant.xs(e_grid), expected)
+
+    for _ in range(MaterialMajorant.cache_size + 2):
+        grid = np.random.rand(3).cumsum()
+        grid.flags.writeable = False
+        mat_majorant.xs(grid)
+    assert len(mat_majorant._xs_cache) == MaterialMajorant.cache_size
+
+
+def test_temperature_range_majorant():
+    library_temps = [250.0, 294.0, 600.0, 900.0, 1200.0]
+
+    assert bracketing_temperatures(library_temps, 300.0, 700.0) == [294.0, 600.0, 900.0]
+    assert bracketing_temperatures(library_temps, 600.0, 600.0) == [600.0]
+    assert bracketing_temperatures(library_temps, 100.0, 260.0) == [250.0, 294.0]
+    assert bracketing_temperatures(library_temps, 1000.0, 1500.0) == [900.0, 1200.0]
+
+    # cross sections that increase with temperature
+    calls = []
+    class Provider(XSProvider):
+        def nuclide_xs(self, nuclide, temperature):
+            calls.append(temperature)
+            return np.array([1.0, 2.0, 3.0]), np.full(3, temperature)
+    TemperatureRangeMajorant.clear_cache()
+
+    m = TemperatureRangeMajorant('U235', 300.0, 700.0, library_temps,
+                                 Provider())
+    assert calls == [294.0, 600.0, 900.0]
+    assert m.temperatures == [294.0, 600.0, 900.0]
+    assert_array_equal(m.xs[:3], [900.0, 900.0, 900.0])
+
+    # a shifted interval with the same bracketing temperatures is cached
+    m = TemperatureRangeMajorant('U235', 310.0, 650.0, library_temps,
+                                 Provider())
+    assert len(calls) == 3
+    assert_array_equal(m.xs[:3], [900.0, 900.0, 900.0])
+    # cached envelopes are shared and cannot be modified
+    with pytest.raises(ValueError):
+        m.xs[0] = 0.0
+
+    # the least recently used envelopes are discarded
+    cache_size = TemperatureRangeMajorant.cache_size
+    TemperatureRangeMajorant.cache_size = 2
+    for t in (250.0, 1200.0, 300.0):
+        TemperatureRangeMajorant('U235', t, t, library_temps, Provider())
+    assert len(TemperatureRangeMajorant._cache) == 2
+    n_calls = len(calls)
+    TemperatureRangeMajorant('U235', 300.0, 700.0, library_temps, Provider())
+    assert len(calls) == n_calls + 3
+    TemperatureRangeMajorant.cache_size = cache_size
+
+    TemperatureRangeMajorant.clear_cache()
+    assert not TemperatureRangeMajorant._cache
+
+
+def test_majorant_file(tmp_path):
+    pytest.importorskip('h5py')
+
+    majorant = Majorant()
+    majorant.update(np.linspace(1.0, 10.0, 100), np.linspace(5.0, 1.0, 100))
+
+    path = str(tmp_path / 'majorant.h5')
+    majorant.to_file(path, temperatures={'U235': [294.0, 600.0]})
+
+    loaded = Majorant.from_file(path)
+    assert isinstance(loaded, Majorant)
+    assert isinstance(loaded.x_values, np.memmap)
+    assert_array_equal(loaded.x_values, majorant.x_values)
+    assert_array_equal(loaded.y_values, majorant.y_values)
+    assert loaded.metadata['temperatures'] == {'U235': [294.0, 600.0]}
+
+    loaded = Max2D.from_file(path, mmap=False)
+    assert isinstance(loaded, Majorant)
+    assert not isinstance(loaded.x_values, np.memmap)
+
+    # a base class file cannot be loaded as a more specific class
+    Max2D.to_file(Max2D.from_others([majorant]), path)
+    with pytest.raises(IOError):
+        Majorant.from_file(path)
+
+
+def test_energy_windows():
+    grids = [np.linspace(1.0, 10.0, 50), np.linspace(2.0, 20.0, 80)]
+    bounds = energy_windows(grids, 20)
+    assert bounds[0] == 1.0 and bounds[-1] == 20.0
+    assert len(bounds) > 2
+    for e_low, e_high in zip(bounds[:-1], bounds[1:]):
+        assert e_low < e_high
+        assert sum(np.count_nonzero((g >= e_low) & (g <= e_high))
+                   for g in grids) <= 20
+
+    assert_array_equal(energy_windows(grids, 1000), [1.0, 20.0])
+    with pytest.raises(ValueError):
+        energy_windows(grids, 1)
+
+
+def test_windowed_majorant(tmp_path):
+    openmc = pytest.importorskip('openmc')
+    pytest.importorskip('h5py')
+
+    water = openmc.Material(temperature=600.0)
+    water.set_density('g/cm3', 1.0)
+    water.add_nuclide('H1', 2.0)
+    water.add_nuclide('O16', 1.0)
+    fuel = openmc.Material(temperature=900.0)
+    fuel.set_density('g/cm3', 10.0)
+    fuel.add_nuclide('U238', 1.0)
+    fuel.add_nuclide('O16', 2.0)
+
+    builder = MajorantBuilder([water, fuel], provider=SyntheticProvider(500))
+    majorant = builder.majorant
+
+    # windows give the values of the common grid and share boundaries
+    windowed = builder.windowed_majorant(20000)
+    assert_array_equal(windowed.x_values, majorant.x_values)
+    assert_array_equal(windowed.y_values, majorant.y_values)
+
+    path = str(tmp_path / 'majorant.h5')
+    loaded = builder.windowed_majorant(20000, path)
+    assert isinstance(loaded, Majorant)
+    assert_array_equal(loaded.x_values, majorant.x_values)
+    assert_array_equal(loaded.y_values, majorant.y_values)
+    assert loaded.metadata['temperatures']['O16'] == [600.0, 900.0]
+
+
+def test_round_up(tmp_path):
+    # points closer than float32 spacing merge, and the peak between them
+    # raises the nearer rounded point
+    x, y = round_up([1.0, 1.0 + 1E-10, 1.0 + 2E-10, 2.0, 2.0, 3.0],
+                    [1.0, 5.0, 1.0, 1.0, 3.0, 3.0])
+    assert x.dtype == y.dtype == np.float32
+    assert_array_equal(x, [1.0, 2.0, 3.0])
+    assert y[0] >= 5.0 and y[0] == pytest.approx(5.0)
+    assert_array_equal(y[1:], [3.0, 3.0])
+
+    rng = np.random.default_rng(3)
+    e_grid = np.sort(10.0**rng.uniform(-5.0, 7.0, 2000))
+    majorant = Majorant()
+    majorant.update(e_grid, rng.uniform(1.0, 100.0, 2000))
+    # tables rounded to nearest may lie above the majorant
+    tables = [CEXS(majorant.x_values, majorant.y_values).astype(np.float32)]
+
+    single = majorant.astype(np.float32, tables)
+    assert single.y_values.dtype == np.float32
+    assert verify_majorant(single, [majorant] + tables, rtol=0.0)
+    assert single.verified
+
+    path = str(tmp_path / 'majorant.h5')
+    single.to_file(path)
+    loaded = Majorant.from_file(path)
+    assert loaded.x_values.dtype == np.float32
+    assert_array_equal(loaded.y_values, single.y_values)
@@ -0,0 +1,61 @@
+
+import json
+
+import numpy as np
+
+from igmc import checkvalue as cv
+from igmc import profiling
+from igmc.majorant import Majorant
+from igmc.particle import Particle
+from igmc.transport import delta_tracking
+from igmc.xs import CEXS
+
+
+class Cell:
+    fill = 'medium'
+
+
+class InfiniteMedium:
+    def find(self, r):
+        return [Cell()]
+
+
+def test_profiler(tmp_path):
+    np.random.seed(1)
+    majorant = Majorant()
+    majorant.update(np.array([1E-05, 2E+07]), np.array([8.0, 8.0]))
+    xs_dict = {'medium': CEXS([1E-05, 2E+07], [2.0, 2.0])}
+
+    original = Majorant.calculate_xs, cv.check_type
+
+    with profiling.Profiler(trace_calls=True) as profiler:
+        assert profiling.active_profiler() is profiler
+        with profiling.timer('history'):
+            p = Particle()
+            delta_tracking(p, InfiniteMedium(), majorant, xs_dict)
+        profiling.count('particles')
+
+    assert profiling.active_profiler() is None
+    assert (Majorant.calculate_xs, cv.check_type) == original
+
+    assert profiler.calls['majorant.calculate_xs'] == p.n_advance_events
+    assert profiler.calls['particle.scatter'] == p.n_scatter_events
+    assert profiler.calls['rng'] > 0
+    assert profiler.counters['particles'] == 1
+    assert profiler.timers['history'] >= profiler.timers['particle.locate']
+
+    profiler.to_json(str(tmp_path / 'profile.json'))
+    profiler.to_chrome_trace(str(tmp_path / 'trace.json'))
+    with open(tmp_path / 'profile.json') as f:
+        data = json.load(f)
+    assert data['timers']['history']['calls'] == 1
+    with open(tmp_path / 'trace.json') as f:
+        trace = json.load(f)
+    names = {event['name'] for event in trace['traceEvents']}
+    assert {'history', 'majorant.calculate_xs', 'particles'} <= names
+
+    # disabled profiling records nothing
+    profiling.count('particles')
+    with profiling.timer('history'):
+        pass
+    assert profiler.counters['particles'] == 1
@@ -0,0 +1,46 @@
+from queue import Queue
+
+from igmc.particle import Particle, Termination
+from igmc.progress import ProgressReporter, QueueReporter
+
+
+def ended(reason, wgt=1.0):
+    p = Particle(wgt=wgt)
+    p.kill(reason)
+    return p
+
+
+def test_progress_reporter():
+    reports = []
+    reporter = ProgressReporter(total=10, every=4, interval=1E+06,
+                                callback=lambda r: reports.append(r.histories))
+    for i in range(10):
+        reporter.record(ended(Termination.LEAKAGE if i % 2 else
+                              Termination.ENERGY_CUTOFF, 0.5))
+        reporter.update()
+    reporter.close()
+
+    assert reports == [4, 8, 10]
+    assert reporter.particles == 10
+    assert reporter.terminations[Termination.LEAKAGE] == 5
+    assert reporter.leaked == 2.5
+    assert '10/10 histories' in reporter.summary()
+
+
+def test_queue_reporter():
+    queue = Queue()
+    reporter = ProgressReporter(interval=1E+06, callback=lambda r: None)
+    reporter.listen(queue)
+
+    workers = [QueueReporter(queue, every=3) for _ in range(2)]
+    for worker in workers:
+        for _ in range(5):
+            worker.record(ended(Termination.LEAKAGE))
+            worker.update()
+        worker.close()
+    reporter.close()
+
+    assert reporter.histories == 10
+    assert reporter.particles == 10
+    assert reporter.terminations[Termination.LEAKAGE] == 10
+    assert reporter.leaked == 10.0
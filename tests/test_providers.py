@@ -0,0 +1,64 @@
+import numpy as np
+from numpy.testing import assert_array_equal
+import pytest
+
+from igmc.majorant import MaterialMajorant
+from igmc.providers import SyntheticProvider, atom_densities
+
+
+def test_synthetic_provider():
+    provider = SyntheticProvider(n_points=2000, n_resonances=20)
+
+    # data is determined by the nuclide name and the seed
+    e_1, xs_1 = provider.nuclide_xs('U238', 294.0)
+    e_2, xs_2 = SyntheticProvider(2000, 20).nuclide_xs('U238', 294.0)
+    assert_array_equal(e_1, e_2)
+    assert_array_equal(xs_1, xs_2)
+    assert abs(e_1.size - 2000) < 100
+    assert np.all(np.diff(e_1) > 0.0)
+    assert np.all(xs_1 > 0.0)
+
+    e_3, xs_3 = provider.nuclide_xs('O16', 294.0)
+    assert not np.array_equal(xs_1, xs_3)
+    e_4, xs_4 = SyntheticProvider(2000, 20, seed=1).nuclide_xs('U238', 294.0)
+    assert not np.array_equal(xs_1, xs_4)
+    assert provider.fingerprint() != SyntheticProvider(2000, 20, seed=1).fingerprint()
+
+    # Doppler broadening lowers the resonance peaks
+    e_hot, xs_hot = provider.nuclide_xs('U238', 1200.0)
+    assert_array_equal(e_1, e_hot)
+    resonances = e_1 > 1.0
+    assert xs_hot[resonances].max() < xs_1[resonances].max()
+
+    assert provider.temperatures('U238') == [294.0, 600.0, 900.0, 1200.0]
+
+    with pytest.raises(ValueError):
+        SyntheticProvider(n_points=1)
+
+
+def test_atom_densities():
+    openmc = pytest.importorskip('openmc')
+
+    class TupleMaterial(openmc.Material):
+        # OpenMC before 0.13.1 gives (nuclide, density) tuples
+        def get_nuclide_atom_densities(self):
+            return {name: density if isinstance(density, tuple) else (name, density)
+                    for name, density in super().get_nuclide_atom_densities().items()}
+
+    densities = []
+    xs = []
+    for cls in (openmc.Material, TupleMaterial):
+        mat = cls()
+        mat.set_density('g/cm3', 1.0)
+        mat.add_nuclide('H1', 2.0)
+        mat.add_nuclide('O16', 1.0)
+        densities.append(atom_densities(mat))
+        assert MaterialMajorant(mat).number_densities == densities[-1]
+        xs.append(SyntheticProvider(500).material_xs(mat))
+
+    assert densities[0] == densities[1]
+    for a, b in zip(*xs):
+        assert_array_equal(a, b)
+    assert set(densities[0]) == {'H1', 'O16'}
+    assert all(isinstance(d, float) for d in densities[0].values())
+    assert densities[0]['H1'] == pytest.approx(2.0 * densities[0]['O16'])
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from igmc.particle import Particle, Termination
+from igmc.results import (HISTORY_DTYPE, HistoryBuffer, HistoryWriter,
+                          read_histories)
+
+
+def ended(e, reason=Termination.LEAKAGE):
+    p = Particle(r=[1.0, 2.0, 3.0], e=e)
+    p.distance_traveled = 2.0 * e
+    p.kill(reason)
+    return p
+
+
+@pytest.mark.parametrize('suffix', ['.npy', '.h5'])
+def test_history_writer(tmp_path, suffix):
+    path = str(tmp_path / ('histories' + suffix))
+    # a small buffer so that records are written in several chunks
+    with HistoryWriter(path, buffer_size=3) as writer:
+        for i in range(10):
+            writer.record(ended(i + 1.0))
+            if i % 2:
+                writer.record(ended(0.5, Termination.ROULETTE))
+            writer.end_history()
+
+    records = read_histories(path)
+    assert records.dtype == HISTORY_DTYPE
+    assert len(records) == writer.n_records == 15
+    assert np.all(np.diff(records['history']) >= 0)
+    assert records['history'][-1] == 9
+    leaked = records['termination'] == Termination.LEAKAGE
+    assert np.array_equal(records['e'][leaked], np.arange(1.0, 11.0))
+    assert np.array_equal(records['distance'][leaked], 2.0 * np.arange(1.0, 11.0))
+    assert np.all(records['r'] == [1.0, 2.0, 3.0])
+    assert np.count_nonzero(records['termination'] == Termination.ROULETTE) == 5
+
+
+def test_npy_memory_mapped(tmp_path):
+    path = str(tmp_path / 'histories.npy')
+    with HistoryWriter(path) as writer:
+        writer.record(ended(1.0))
+        writer.end_history()
+
+    records = read_histories(path)
+    assert isinstance(records, np.memmap)
+    assert np.array_equal(np.load(path), records)
+
+
+def test_append_worker_records(tmp_path):
+    chunks = []
+    for n in (2, 3):
+        buffer = HistoryBuffer(capacity=1)
+        for i in range(n):
+            buffer.record(ended(i + 1.0))
+            buffer.end_history()
+        chunks.append((buffer.take(), n))
+        assert len(buffer) == 0
+
+    path = str(tmp_path / 'histories.npy')
+    with HistoryWriter(path, first_history=10) as writer:
+        writer.record(ended(5.0))
+        writer.end_history()
+        for records, n in chunks:
+            writer.append(records, n)
+
+    records = read_histories(path)
+    assert list(records['history']) == [10, 11, 12, 13, 14, 15]
+    assert list(records['e']) == [5.0, 1.0, 2.0, 1.0, 2.0, 3.0]
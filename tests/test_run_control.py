@@ -0,0 +1,46 @@
+
+import time
+
+import numpy as np
+import pytest
+
+from igmc.run_control import RunController, StopReason
+
+
+def fake_batch(n):
+    leakage = (np.random.rand(n) < 0.3).astype(float)
+    events = np.random.poisson(20.0, n).astype(float)
+    return leakage, events
+
+
+def test_target_rel_err():
+    np.random.seed(1)
+    controller = RunController(1000, target_rel_err=0.02, max_particles=10**6)
+    leakage, events = controller.run(fake_batch)
+
+    assert controller.stop_reason == StopReason.TARGET_REACHED
+    assert controller.rel_errs['leakage'] <= 0.02
+    assert controller.n_batches >= controller.min_batches
+    assert len(leakage) == len(events) == controller.n_particles
+    assert controller.n_particles < 10**6
+
+
+def test_particle_and_time_limits():
+    np.random.seed(1)
+    controller = RunController(300, target_rel_err=1E-06, max_particles=1000)
+    leakage, _ = controller.run(fake_batch)
+    assert controller.stop_reason == StopReason.PARTICLE_LIMIT
+    assert len(leakage) == 1000
+
+    def slow_batch(n):
+        time.sleep(0.05)
+        return fake_batch(n)
+
+    controller = RunController(10, time_limit=0.2, quantities=('events',))
+    controller.run(slow_batch)
+    assert controller.stop_reason == StopReason.TIME_LIMIT
+    assert controller.elapsed < 0.3
+    assert 'leakage' not in controller.rel_errs
+
+    with pytest.raises(ValueError):
+        RunController(10)
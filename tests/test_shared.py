@@ -0,0 +1,49 @@
+
+from multiprocessing import get_context
+import signal
+
+import numpy as np
+from numpy.testing import assert_array_equal
+import pytest
+
+from igmc.majorant import Majorant
+from igmc.shared import SharedTables, attach
+from igmc.xs import CEXS
+
+
+def tables():
+    majorant = Majorant()
+    majorant.update(np.linspace(1.0, 10.0, 100), np.linspace(5.0, 1.0, 100))
+    xs = CEXS(np.linspace(1.0, 10.0, 50), np.linspace(2.0, 0.5, 50))
+    return {'majorant': majorant, 'xs': xs}
+
+
+def _sum_tables(handle):
+    t = attach(handle)
+    return np.sum(t['majorant'].y_values) + np.sum(t['xs'].xs_vals)
+
+
+@pytest.mark.parametrize('backend', ['shm', 'mmap'])
+def test_shared_tables(backend):
+    data = tables()
+    sigterm = signal.getsignal(signal.SIGTERM)
+
+    with SharedTables(backend) as shared:
+        # process-wide signal handling is left alone
+        assert signal.getsignal(signal.SIGTERM) is sigterm
+        handle = shared.share(data)
+        attached = attach(handle)
+
+        assert_array_equal(attached['majorant'].x_values, data['majorant'].x_values)
+        assert_array_equal(attached['xs'].xs_vals, data['xs'].xs_vals)
+
+        # attached arrays are read-only views
+        with pytest.raises(ValueError):
+            attached['majorant'].y_values[0] = 0.0
+
+        expected = _sum_tables(handle)
+        with get_context('fork').Pool(2) as pool:
+            assert pool.map(_sum_tables, [handle, handle]) == [expected, expected]
+
+    with pytest.raises(RuntimeError):
+        shared.share(data)
@@ -0,0 +1,48 @@
+
+import numpy as np
+import pytest
+
+from igmc.surface import distance_to_surface, quadric_coeffs
+
+
+class Quadric:
+    """Surface defined by the coefficients openmc provides: the 10
+    quadric coefficients, or (a, b, c, d) with ax + by + cz = d for planes"""
+    def __init__(self, *coeffs):
+        self.coeffs = coeffs
+
+    def _get_base_coeffs(self):
+        return self.coeffs
+
+
+def z_cylinder(r):
+    return Quadric(1.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, -r*r)
+
+
+def x_plane(x0):
+    return Quadric(1.0, 0.0, 0.0, x0)
+
+
+def test_distance_to_surface():
+    cyl = z_cylinder(2.0)
+
+    # from inside the cylinder
+    assert distance_to_surface(cyl, (0.0, 0.0, 0.0), (1.0, 0.0, 0.0)) == pytest.approx(2.0)
+    assert distance_to_surface(cyl, (1.0, 0.0, 5.0), (-1.0, 0.0, 0.0)) == pytest.approx(3.0)
+    # parallel to the cylinder axis
+    assert distance_to_surface(cyl, (0.0, 0.0, 0.0), (0.0, 0.0, 1.0)) == np.inf
+    # from outside, pointing away
+    assert distance_to_surface(cyl, (3.0, 0.0, 0.0), (1.0, 0.0, 0.0)) == np.inf
+    # from outside, pointing towards
+    assert distance_to_surface(cyl, (3.0, 0.0, 0.0), (-1.0, 0.0, 0.0)) == pytest.approx(1.0)
+
+    plane = x_plane(1.0)
+    assert distance_to_surface(plane, (0.0, 0.0, 0.0), (1.0, 0.0, 0.0)) == pytest.approx(1.0)
+    assert distance_to_surface(plane, (0.0, 0.0, 0.0), (-1.0, 0.0, 0.0)) == np.inf
+    assert distance_to_surface(plane, (0.0, 0.0, 0.0), (0.0, 1.0, 0.0)) == np.inf
+
+
+def test_quadric_coeffs():
+    assert quadric_coeffs(x_plane(1.5)) == \
+        (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, -1.5)
+    assert quadric_coeffs(z_cylinder(2.0)) == z_cylinder(2.0).coeffs
@@ -0,0 +1,94 @@
+
+import pickle
+
+import numpy as np
+import pytest
+
+from igmc.majorant import Majorant
+from igmc.particle import Particle
+from igmc.tally import RegularMesh, EnergyFilter, Tally, reduce_tallies
+from igmc.transport import delta_tracking
+from igmc.xs import CEXS
+
+
+class Cell:
+    fill = 'medium'
+
+
+class InfiniteMedium:
+    def find(self, r):
+        return [Cell()]
+
+
+def test_mesh():
+    mesh = RegularMesh((0.0, 0.0, 0.0), (4.0, 2.0, 1.0), (4, 2, 1))
+    assert mesh.n_bins == 8
+    assert mesh.volume == pytest.approx(1.0)
+
+    r = np.array([[0.5, 0.5, 0.5], [3.5, 1.5, 0.5], [5.0, 0.5, 0.5]])
+    assert mesh.get_indices(r).tolist() == [0, 7, -1]
+
+    # segment crossing the mesh diagonally, starting and ending outside
+    r0 = np.array([[-1.0, 0.5, 0.5], [0.0, 0.0, 0.0]])
+    r1 = np.array([[5.0, 0.5, 0.5], [4.0, 2.0, 1.0]])
+    seg, bins, lengths = mesh.track_lengths(r0, r1)
+    assert lengths[seg == 0].sum() == pytest.approx(4.0)
+    assert sorted(bins[seg == 0].tolist()) == [0, 2, 4, 6]
+    assert lengths[seg == 1].sum() == pytest.approx(np.sqrt(21.0))
+
+
+def test_energy_filter():
+    f = EnergyFilter([1.0, 10.0, 100.0])
+    idx = f.get_indices(np.array([0.5, 1.0, 50.0, 100.0, 200.0]))
+    assert idx.tolist() == [-1, 0, 1, 1, -1]
+
+
+def test_tally_batches():
+    mesh = RegularMesh((0.0, 0.0, 0.0), (2.0, 1.0, 1.0), (2, 1, 1))
+    tally = Tally(mesh, EnergyFilter([0.0, 1.0, 2.0]), buffer_size=3)
+
+    for score in (1.0, 3.0):
+        for _ in range(5):
+            tally.score_collision((0.5, 0.5, 0.5), 0.5, score)
+        tally.score_collision((1.5, 0.5, 0.5), 1.5, score)
+        tally.end_batch(2)
+
+    assert tally.n_batches == 2
+    assert tally.mean[0, 0] == pytest.approx(5.0)
+    assert tally.mean[1, 1] == pytest.approx(1.0)
+    assert tally.mean[0, 1] == 0.0
+    assert tally.rel_err[0, 0] == pytest.approx(0.5)
+    assert tally.rel_err[0, 1] == np.inf
+
+    # track scores are ignored by collision tallies
+    tally.score_track((0.5, 0.5, 0.5), (1.5, 0.5, 0.5), 0.5, 1.0)
+    assert tally._n == 0
+
+    copy = pickle.loads(pickle.dumps(tally))
+    assert copy._n == 0 and copy._r0.shape == (3, 3)
+    total = reduce_tallies([tally, copy])
+    assert total.n_batches == 4
+    assert total.mean == pytest.approx(tally.mean)
+
+
+def test_estimators_agree():
+    np.random.seed(3)
+
+    majorant = Majorant()
+    majorant.update(np.array([1E-05, 2E+07]), np.array([5.0, 5.0]))
+    xs_dict = {'medium': CEXS([1E-05, 2E+07], [2.0, 2.0])}
+    tallies = [Tally(estimator='collision'), Tally(estimator='track-length')]
+
+    distance = 0.0
+    for _ in range(20):
+        for _ in range(50):
+            p = Particle()
+            delta_tracking(p, InfiniteMedium(), majorant, xs_dict,
+                           e_min=1.0, tallies=tallies)
+            distance += p.distance_traveled
+        for tally in tallies:
+            tally.end_batch(50)
+
+    collision, track = (t.mean[0, 0] for t in tallies)
+    assert track == pytest.approx(distance / 1000)
+    assert collision == pytest.approx(track, rel=0.1)
@@ -0,0 +1,71 @@
+import numpy as np
+
+from igmc.majorant import Majorant
+from igmc.particle import Particle
+from igmc.tracks import TRACK_DTYPE, TrackEvent, TrackRecorder, read_tracks
+from igmc.transport import delta_tracking
+from igmc.xs import CEXS
+
+
+class Cell:
+    fill = 'medium'
+
+
+class InfiniteMedium:
+    """Geometry in which every point is inside a single cell"""
+    def find(self, r):
+        return [Cell()]
+
+
+e_grid = [1E-05, 2E+07]
+
+
+def flat_majorant(value):
+    majorant = Majorant()
+    majorant.update(np.array(e_grid), np.array([value, value]))
+    return majorant
+
+
+def high_energy(p):
+    return p.e > 1.0
+
+
+def test_delta_tracking_events(tmp_path):
+    np.random.seed(1)
+    xs_dict = {'medium': CEXS(e_grid, [2.0, 2.0])}
+    path = str(tmp_path / 'tracks.npy')
+
+    # a small buffer so that events are flushed several times
+    with TrackRecorder(path, capacity=4) as tracks:
+        p = Particle()
+        assert tracks.start_history(p)
+        delta_tracking(p, InfiniteMedium(), flat_majorant(8.0), xs_dict,
+                       tracks=tracks)
+        tracks.end_history()
+
+    events = read_tracks(path)
+    assert events.dtype == TRACK_DTYPE
+    assert len(events) == tracks.n_events == p.n_advance_events
+    real = events['event'] == TrackEvent.REAL
+    assert np.count_nonzero(real) == p.n_scatter_events
+    assert np.all(events['sigma_t'] == 2.0)
+    assert np.all(events['sigma_maj'] == 8.0)
+    assert np.all(events['history'] == 0)
+    # energy only changes in real collisions
+    assert np.all(np.diff(events['e'])[~real[:-1]] == 0.0)
+
+
+def test_sampling():
+    tracks = TrackRecorder(every=3, select=high_energy, first_history=1)
+    sampled = []
+    for e in [10.0, 10.0, 0.5, 10.0, 10.0, 10.0, 10.0]:
+        if tracks.start_history(Particle(e=e)):
+            sampled.append(tracks.histories)
+            tracks.record(Particle(e=e), TrackEvent.VIRTUAL, 1.0, 2.0)
+        tracks.end_history()
+
+    # history 3 is skipped by the predicate
+    assert sampled == [6]
+    events = tracks.take()
+    assert list(events['history']) == [6]
+    assert len(tracks.take()) == 0
@@ -0,0 +1,180 @@
+
+from collections import Counter, defaultdict
+
+import numpy as np
+import pytest
+
+from igmc.majorant import Majorant
+from igmc.particle import Particle, Termination
+from igmc.surface import TINY_BIT
+from igmc.transport import (delta_tracking, weighted_delta_tracking,
+                            russian_roulette, split, majorant_ratios,
+                            surface_tracking_cells, hybrid_tracking)
+from igmc.xs import CEXS
+
+
+class Cell:
+    fill = 'medium'
+
+
+class InfiniteMedium:
+    """Geometry in which every point is inside a single cell"""
+    def find(self, r):
+        return [Cell()]
+
+
+class Vacuum:
+    """Geometry in which every point is outside of the geometry"""
+    def find(self, r):
+        return []
+
+
+class XPlane:
+    """Plane x = x0 given by its quadric coefficients"""
+    def __init__(self, x0):
+        self.x0 = x0
+
+    def _get_base_coeffs(self):
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, -self.x0)
+
+
+class Slab:
+    """Region between two planes of constant x"""
+    def __init__(self, x_min, x_max):
+        self.x_min, self.x_max = x_min, x_max
+        self.surfaces = {1: XPlane(x_min), 2: XPlane(x_max)}
+
+    def get_surfaces(self):
+        return self.surfaces
+
+
+class SlabCell:
+    def __init__(self, cell_id, fill, x_min, x_max):
+        self.id = cell_id
+        self.fill = fill
+        self.region = Slab(x_min, x_max)
+
+
+class TwoSlabs:
+    """Geometry of adjacent slabs in -2 <= x < 0 and 0 <= x < 2"""
+    def __init__(self):
+        self.cells = [SlabCell(1, 'dense', -2.0, 0.0),
+                      SlabCell(2, 'void', 0.0, 2.0)]
+
+    def find(self, r):
+        return [cell for cell in self.cells
+                if cell.region.x_min <= r[0] < cell.region.x_max]
+
+    def get_all_cells(self):
+        return {cell.id: cell for cell in self.cells}
+
+
+e_grid = [1E-05, 2E+07]
+
+
+def flat_majorant(value):
+    majorant = Majorant()
+    majorant.update(np.array(e_grid), np.array([value, value]))
+    return majorant
+
+
+def test_delta_tracking():
+    np.random.seed(1)
+    xs_dict = {'medium': CEXS(e_grid, [2.0, 2.0])}
+
+    p = Particle()
+    secondaries = delta_tracking(p, InfiniteMedium(), flat_majorant(8.0), xs_dict)
+
+    assert not secondaries
+    assert p.termination == Termination.ENERGY_CUTOFF
+    assert p.e <= 1E-03
+    assert p.wgt == 1.0
+
+    p = Particle()
+    delta_tracking(p, Vacuum(), flat_majorant(8.0), xs_dict)
+    assert p.termination == Termination.LEAKAGE
+    assert p.n_scatter_events == 0
+
+
+def test_weighted_delta_tracking():
+    np.random.seed(1)
+    xs_dict = {'medium': CEXS(e_grid, [4.0, 4.0])}
+
+    # with xs / majorant equal to the collision probability
+    # the weight is unchanged at every event
+    p = Particle()
+    secondaries = weighted_delta_tracking(p, InfiniteMedium(), flat_majorant(8.0),
+                                          xs_dict, collision_prob=0.5)
+
+    assert not secondaries
+    assert p.termination == Termination.ENERGY_CUTOFF
+    assert p.wgt == 1.0
+
+
+def test_hybrid_tracking():
+    np.random.seed(1)
+    geometry = TwoSlabs()
+    majorant = flat_majorant(10.0)
+    xs_dict = {'dense': CEXS(e_grid, [8.0, 8.0]),
+               'void': CEXS(e_grid, [0.0, 0.0])}
+
+    # only the poorly majorized cell uses surface tracking
+    ratios = majorant_ratios(geometry, majorant, xs_dict)
+    assert ratios == pytest.approx({1: 0.8, 2: 0.0})
+    assert surface_tracking_cells(ratios, 0.1) == {2}
+    assert surface_tracking_cells(ratios, {1: 0.9}) == {1}
+    surface_cells = surface_tracking_cells(ratios, 0.1)
+
+    # a particle crossing the void leaks after two boundary crossings
+    counts = defaultdict(Counter)
+    p = Particle(r=(0.5, 0.0, 0.0), u=(1.0, 0.0, 0.0))
+    hybrid_tracking(p, geometry, majorant, xs_dict,
+                    surface_cells=surface_cells, counts=counts)
+    assert p.termination == Termination.LEAKAGE
+    assert p.r[0] == pytest.approx(2.0 + TINY_BIT)
+    assert counts == {2: Counter(crossing=1)}
+
+    # entering the dense slab from the void continues with delta tracking
+    counts = defaultdict(Counter)
+    p = Particle(r=(1.0, 0.0, 0.0), u=(-1.0, 0.0, 0.0))
+    hybrid_tracking(p, geometry, majorant, xs_dict,
+                    surface_cells=surface_cells, counts=counts)
+    assert p.termination in (Termination.LEAKAGE, Termination.ENERGY_CUTOFF)
+    assert counts[2]['crossing'] >= 1
+    assert counts[1]['real'] + counts[1]['virtual'] >= 1
+
+    # events are counted in the cell they occur in. Delta tracking flights
+    # from the dense slab may end in the void as virtual collisions.
+    for _ in range(100):
+        p = Particle(r=(-1.0, 0.0, 0.0), u=(1.0, 0.0, 0.0))
+        hybrid_tracking(p, geometry, majorant, xs_dict,
+                        surface_cells=surface_cells, counts=counts)
+        assert p.termination in (Termination.LEAKAGE, Termination.ENERGY_CUTOFF)
+    assert set(counts) == {1, 2}
+    assert set(counts[1]) == {'real', 'virtual'}
+    assert set(counts[2]) <= {'crossing', 'virtual'}
+    assert counts[1]['real'] > counts[1]['virtual'] > 0
+    assert counts[2]['crossing'] > 0
+
+
+def test_roulette_and_split():
+    np.random.seed(1)
+
+    survived = 0
+    for _ in range(1000):
+        p = Particle(wgt=0.1)
+        russian_roulette(p, survival_weight=1.0)
+        if p.alive:
+            survived += 1
+            assert p.wgt == 1.0
+        else:
+            assert p.termination == Termination.ROULETTE
+    assert survived == pytest.approx(100, abs=30)
+
+    p = Particle(wgt=3.5)
+    copies = split(p, survival_weight=1.0)
+    assert len(copies) == 3
+    assert sum(c.wgt for c in copies) + p.wgt == pytest.approx(3.5)
+
+    # an explicit zero weight is kept rather than replaced by the default
+    assert Particle(wgt=0.0).wgt == 0.0
@@ -0,0 +1,41 @@
+import numpy as np
+
+from igmc.majorant import Majorant
+from igmc.verify import is_verified, verify_majorant
+from igmc.xs import CEXS
+
+
+def test_verify_majorant():
+    tables = {'a': CEXS([1.0, 2.0, 4.0], [1.0, 3.0, 1.0]),
+              'b': CEXS([1.0, 3.0, 4.0], [2.0, 1.0, 0.5])}
+    majorant = Majorant()
+    for xs in tables.values():
+        majorant.update(xs.e_grid, xs.xs_vals)
+
+    result = verify_majorant(majorant, tables)
+    assert result.passed and majorant.verified
+    assert result.n_violations == 0
+    assert result.worst_excess < 1E-12
+    # both data sets end at the same energy; the lower value must not be
+    # appended after the upper one
+    assert majorant.calculate_xs(4.0) == 1.0
+    assert majorant.metadata['verification']['passed']
+    assert is_verified(majorant, tables)
+
+    # a table rising above the majorant between its points
+    tables['c'] = CEXS([1.0, 2.5, 4.0], [0.5, 4.0, 0.5])
+    assert not is_verified(majorant, tables)
+    result = verify_majorant(majorant, tables)
+    assert not result and not majorant.verified
+    assert result.table == 'c'
+    assert result.energy == 2.5
+    assert np.isclose(result.worst_excess, 4.0 / 2.5 - 1.0)
+
+
+def test_update_resets_verified():
+    majorant = Majorant()
+    majorant.update([1.0, 2.0], [1.0, 1.0])
+    verify_majorant(majorant, [CEXS([1.0, 2.0], [0.5, 0.5])])
+    assert majorant.verified
+    majorant.update([1.0, 2.0], [2.0, 2.0])
+    assert not majorant.verified
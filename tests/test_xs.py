@@ -0,0 +1,68 @@
+
+import numpy as np
+import pytest
+
+from igmc.majorant import Majorant
+from igmc.xs import CEXS
+
+
+def test_calculate_xs():
+    xs = CEXS([1.0, 2.0, 4.0], [10.0, 20.0, 0.0])
+
+    assert xs.calculate_xs(1.5) == pytest.approx(15.0)
+    assert xs.calculate_xs(3.0) == pytest.approx(10.0)
+
+    # values outside of the grid are held at the end points
+    assert xs.calculate_xs(0.5) == 10.0
+    assert xs.calculate_xs(5.0) == 0.0
+
+    e = np.array([0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0])
+    expected = [10.0, 10.0, 15.0, 20.0, 10.0, 0.0, 0.0]
+    assert xs.calculate_xs(e) == pytest.approx(expected)
+    assert [xs.calculate_xs(val) for val in e] == pytest.approx(expected)
+
+    out = np.empty_like(e)
+    assert xs.calculate_xs(e, out=out) is out
+    assert out == pytest.approx(expected)
+
+    flat = CEXS([1.0], [3.0])
+    assert flat.calculate_xs(2.0) == 3.0
+    assert flat.calculate_xs(e) == pytest.approx(np.full_like(e, 3.0))
+
+
+def test_majorant_calculate_xs():
+    # repeated points from a discontinuity in the merged data
+    majorant = Majorant()
+    majorant.update(np.array([1.0, 2.0, 2.0, 3.0, 3.0]),
+                    np.array([1.0, 2.0, 5.0, 6.0, 6.0]))
+
+    e = np.linspace(0.0, 4.0, 41)
+    vectorized = majorant.calculate_xs(e)
+    scalar = [majorant.calculate_xs(val) for val in e]
+    assert vectorized == pytest.approx(scalar)
+
+    assert majorant.calculate_xs(1.5) == pytest.approx(1.5)
+    assert majorant.calculate_xs(2.0) == pytest.approx(5.0)
+    assert majorant.calculate_xs(2.5) == pytest.approx(5.5)
+    assert majorant.calculate_xs(np.array([2.0, 3.0, 4.0])) == pytest.approx([5.0, 6.0, 6.0])
+
+
+def test_single_precision_lookup():
+    rng = np.random.default_rng(2)
+    e_grid = np.sort(10.0**rng.uniform(-5.0, 7.0, 200))
+    xs = CEXS(e_grid, rng.uniform(1.0, 10.0, 200)).astype(np.float32)
+    assert xs.e_grid.dtype == xs.xs_vals.dtype == np.float32
+    exact = CEXS(xs.e_grid, xs.xs_vals)
+
+    # values on and next to the float32 energies, which round onto them
+    e = np.concatenate((xs.e_grid, np.nextafter(xs.e_grid, 0.0),
+                        np.nextafter(xs.e_grid, np.inf),
+                        10.0**rng.uniform(-6.0, 8.0, 1000)))
+    e.sort()
+    expected = exact.calculate_xs(e)
+    assert np.array_equal(xs.calculate_xs(e), expected)
+    assert np.array_equal(xs.calculate_xs(e, assume_sorted=True), expected)
+    assert np.array_equal(xs.calculate_xs(e[::200], assume_sorted=True),
+                          expected[::200])
+    assert [xs.calculate_xs(val) for val in e[::50]] == \
+        pytest.approx(expected[::50], rel=1E-15)